@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from qatrack.api.serializers import SparseFieldsSerializerMixin
 from qatrack.faults import models
 
 
-class FaultSerializer(serializers.HyperlinkedModelSerializer):
+class FaultSerializer(SparseFieldsSerializerMixin, serializers.HyperlinkedModelSerializer):
 
     class Meta:
         model = models.Fault
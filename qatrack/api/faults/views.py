@@ -3,14 +3,18 @@ from rest_framework.filters import OrderingFilter
 from rest_framework_filters import backends
 
 from qatrack.api.faults import filters, serializers
+from qatrack.api.serializers import SparseFieldsViewSetMixin
+from qatrack.api.viewsets import KeysetPagination
 from qatrack.faults import models
 
 
-class FaultViewSet(viewsets.ModelViewSet):
+class FaultViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = models.Fault.objects.prefetch_related("fault_types").all()
     serializer_class = serializers.FaultSerializer
     filterset_class = filters.FaultFilter
     filter_backends = (backends.RestFrameworkFilterBackend, OrderingFilter,)
+    pagination_class = KeysetPagination
+    keyset_field = "occurred"
 
 
 class FaultTypeViewSet(viewsets.ModelViewSet):
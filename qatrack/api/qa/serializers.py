@@ -17,9 +17,10 @@ from rest_framework.reverse import reverse
 
 from qatrack.api.attachments.serializers import AttachmentSerializer
 from qatrack.api.comments.serializers import CommentSerializer
+from qatrack.api.serializers import SparseFieldsSerializerMixin
 from qatrack.attachments.models import Attachment
 from qatrack.qa import models, signals
-from qatrack.qa.views.perform import CompositePerformer, UploadHandler
+from qatrack.qa.views.perform import UploadHandler, calculate_composites
 from qatrack.qatrack_core.dates import parse_date, parse_datetime
 from qatrack.qatrack_core.serializers import QATrackJSONEncoder
 from qatrack.service_log import models as sl_models
@@ -139,7 +140,7 @@ class UnitTestCollectionSerializer(serializers.HyperlinkedModelSerializer):
         return next_day
 
 
-class TestInstanceSerializer(serializers.HyperlinkedModelSerializer):
+class TestInstanceSerializer(SparseFieldsSerializerMixin, serializers.HyperlinkedModelSerializer):
     attachments = AttachmentSerializer(many=True, source="attachment_set", required=False)
 
     class Meta:
@@ -153,7 +154,7 @@ class TestInstanceCreator(serializers.HyperlinkedModelSerializer):
         fields = ["value", "string_value", "date_value", "datetime_value", "skipped", "comment", "macro"]
 
 
-class TestListInstanceSerializer(serializers.HyperlinkedModelSerializer):
+class TestListInstanceSerializer(SparseFieldsSerializerMixin, serializers.HyperlinkedModelSerializer):
 
     attachments = AttachmentSerializer(many=True, source="attachment_set", required=False)
     comments = CommentSerializer(many=True, required=False)
@@ -295,6 +296,27 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
         for key in ["work_completed", "work_started", "in_progress", "include_for_scheduling", "user_key"]:
             data[key] = data.get(key, getattr(self.instance, key))
 
+    def shared_lookup(self, key, calculate):
+        """Return calculate() or, when creating many test list instances in one
+        request, the result of an earlier identical lookup"""
+
+        lookups = self.context.get("lookups")
+        if lookups is None:
+            return calculate()
+
+        if key not in lookups:
+            lookups[key] = calculate()
+        return lookups[key]
+
+    def get_test_data(self):
+        """Return (id, slug, type, constant_value, calculation_procedure) for all tests in self.tl"""
+        return self.shared_lookup(
+            ("tests", self.tl.pk),
+            lambda: list(
+                self.tl.all_tests().values_list("id", "slug", "type", "constant_value", "calculation_procedure")
+            ),
+        )
+
     def validate(self, data):
         post_data = copy.deepcopy(data)
 
@@ -305,15 +327,13 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
 
         validated_data = self.preprocess(validated_data)
 
-        test_qs = self.tl.all_tests().values_list("slug", "type", "calculation_procedure")
-
         missing = []
         wrong_types = []
         invalid_autos = []
         msgs = []
         auto_types = [models.CONSTANT] + list(models.CALCULATED_TYPES)
 
-        for slug, type_, procedure in test_qs:
+        for __, slug, type_, __, procedure in self.get_test_data():
 
             if slug not in validated_data['tests']:
                 missing.append(slug)
@@ -410,20 +430,22 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
             except TypeError:
                 raise serializers.ValidationError("The 'day' key must be an integer")
 
-            min_day, max_day = 0, len(self.utc.tests_object) - 1
+            ntests = self.shared_lookup(("ntests", self.utc.pk), lambda: len(self.utc.tests_object))
+            min_day, max_day = 0, ntests - 1
             if not (min_day <= self.day <= max_day):
                 raise serializers.ValidationError(
                     "'%s' is not a valid day for this Test Collection.  "
                     "Day must be between %s & %s" % (self.day, min_day, max_day)
                 )
 
-            self.day, self.tl = self.utc.get_list(day=self.day)
-
-        test_qs = self.tl.all_tests().values_list("id", "slug", "type", "constant_value")
+            self.day, self.tl = self.shared_lookup(
+                ("list", self.utc.pk, self.day),
+                lambda: self.utc.get_list(day=self.day),
+            )
 
         has_composite = False
         uploads = []
-        for pk, slug, type_, cv in test_qs:
+        for pk, slug, type_, cv, __ in self.get_test_data():
 
             if type_ == models.CONSTANT:
                 # here we get data for the test (comments etc) and make sure the constant value
@@ -484,7 +506,7 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
                 comp_calc_data.pop('test_id', None)
 
             if has_composite:
-                results = CompositePerformer(user, comp_calc_data).calculate()
+                results = calculate_composites(user, comp_calc_data)
                 if not results['success']:  # pragma: no cover
                     raise serializers.ValidationError(', '.join(results.get("errors", [])))
 
@@ -522,6 +544,14 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
 
     @atomic
     def create(self, validated_data):
+        tli, test_instances = self.build(validated_data)
+        models.TestInstance.objects.bulk_create(test_instances)
+        self.finish(tli)
+        return tli
+
+    def build(self, validated_data):
+        """Save the test list instance and return it along with its unsaved
+        test instances"""
 
         utc = validated_data['unit_test_collection']
         user = validated_data['created_by']
@@ -540,7 +570,7 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
             raise serializers.ValidationError("No test instance status available")
 
         # related return to service
-        rtsqa = validated_data.pop('return_to_service_qa', None)
+        self.rtsqa = validated_data.pop('return_to_service_qa', None)
 
         # attachments for test list instance
         attachments = validated_data.pop('attachments', [])
@@ -557,21 +587,7 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
         if self.comment:
             self.create_comment(self.comment, tli)
 
-        tests = tl.ordered_tests()
-        utis = models.UnitTestInfo.objects.filter(
-            unit=utc.unit,
-            test__in=tests,
-            active=True,
-        ).select_related(
-            "reference",
-            "test__category",
-            "tolerance",
-            "unit",
-        )
-
-        # make sure utis are correctly ordered
-        uti_tests = [x.test for x in utis]
-        ordered_utis = [utis[uti_tests.index(test)] for test in tests]
+        ordered_utis = self.shared_lookup(("utis", utc.unit_id, tl.pk), lambda: self.get_ordered_utis(utc, tl))
         to_save = []
         for order, uti in enumerate(ordered_utis):
             data = test_instance_data[uti.test.slug]
@@ -602,17 +618,45 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
 
             to_save.append(ti)
 
-        models.TestInstance.objects.bulk_create(to_save)
+        return tli, to_save
+
+    def get_ordered_utis(self, utc, tl):
+        """Return the active UnitTestInfo objects for utc's unit in the order tests appear in tl"""
+
+        tests = tl.ordered_tests()
+        utis = models.UnitTestInfo.objects.filter(
+            unit=utc.unit,
+            test__in=tests,
+            active=True,
+        ).select_related(
+            "reference",
+            "test__category",
+            "tolerance",
+            "unit",
+        )
+
+        # make sure utis are correctly ordered
+        uti_tests = [x.test for x in utis]
+        return [utis[uti_tests.index(test)] for test in tests]
+
+    def finish(self, tli):
+        """Link attachments & return to service QA, update due dates &
+        review status and fire the testlist_complete signal for a test list
+        instance whose test instances have been saved"""
 
         for slug, attachment_ids in self.ti_attachments.items():
             for a in Attachment.objects.filter(id__in=attachment_ids):
                 a.testinstance = tli.testinstance_set.get(unit_test_info__test__slug=slug)
                 a.save()
 
-        # set due date to account for any non default statuses
-        tli.unit_test_collection.set_due_date()
+        # set due date to account for any non default statuses (when
+        # creating in bulk this is done once per unit test collection after
+        # all test list instances have been created)
+        if "lookups" not in self.context:
+            tli.unit_test_collection.set_due_date()
 
         # is there an existing rtsqa being linked?
+        rtsqa = self.rtsqa
         if rtsqa:
             rtsqa.test_list_instance = tli
             rtsqa.save()
@@ -631,8 +675,6 @@ class TestListInstanceCreator(serializers.HyperlinkedModelSerializer):
             except:  # pragma: no cover, # noqa: E722
                 pass
 
-        return tli
-
     @atomic
     def update(self, instance, validated_data):
 
@@ -1,11 +1,14 @@
 import base64
+import copy
 import datetime
 import json
 import os
 import time
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
+from django.db import IntegrityError
 from django.urls import reverse
 from django.utils import timezone
 import pytest
@@ -13,8 +16,9 @@ import pytz
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from qatrack.api.qa import serializers
 from qatrack.attachments.models import Attachment
-from qatrack.qa import models
+from qatrack.qa import models, signals
 from qatrack.qa.tests import utils
 from qatrack.service_log.tests import utils as sl_utils
 
@@ -1093,6 +1097,80 @@ class TestTestListInstanceAPI(APITestCase):
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "test list instance with this user key already exists." in response.json()['user_key']
 
+    def test_bulk_create(self):
+        data2 = copy.deepcopy(self.data)
+        data2['work_started'] = '2019-07-26 10:49:00'
+        data2['work_completed'] = '2019-07-26 10:49:47'
+        with mock.patch.object(signals, "bulk_set_due_dates", wraps=signals.bulk_set_due_dates) as set_due_dates:
+            response = self.client.post(reverse("testlistinstance-bulk"), [self.data, data2])
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()['results']
+        assert [r['status'] for r in results] == ["created", "created"]
+        assert models.TestListInstance.objects.count() == 2
+        assert models.TestInstance.objects.count() == 2 * self.ntests
+        self.utc.refresh_from_db()
+        assert self.utc.last_instance_id == results[1]['id']
+        assert self.utc.due_date is not None
+        # due dates are calculated once for all unit test collections
+        assert set_due_dates.call_count == 1
+
+    def test_bulk_create_wrapped(self):
+        response = self.client.post(reverse("testlistinstance-bulk"), {'testlistinstances': [self.data]})
+        assert response.json()['results'][0]['status'] == "created"
+
+    def test_bulk_create_not_list(self):
+        response = self.client.post(reverse("testlistinstance-bulk"), self.data)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bulk_create_invalid_item(self):
+        invalid = copy.deepcopy(self.data)
+        invalid['tests'].pop("test1")
+        response = self.client.post(reverse("testlistinstance-bulk"), [invalid, self.data])
+        results = response.json()['results']
+        assert results[0]['status'] == "invalid"
+        assert "test1" in results[0]['errors']['non_field_errors'][0]
+        assert results[1]['status'] == "created"
+        assert models.TestListInstance.objects.count() == 1
+
+    def test_bulk_create_user_key_exists(self):
+        self.data['user_key'] = "1234"
+        self.client.post(self.create_url, self.data)
+        tli = models.TestListInstance.objects.get()
+
+        response = self.client.post(reverse("testlistinstance-bulk"), [self.data])
+        result = response.json()['results'][0]
+        assert result['status'] == "exists"
+        assert result['id'] == tli.pk
+        assert models.TestListInstance.objects.count() == 1
+
+    def test_bulk_create_item_error(self):
+        data2 = copy.deepcopy(self.data)
+        data2['work_completed'] = '2019-07-26 10:49:47'
+        orig_finish = serializers.TestListInstanceCreator.finish
+        finished = []
+
+        def finish(serializer, tli):
+            # first item fails after its test instances have been created
+            finished.append(tli)
+            if len(finished) == 1:
+                raise IntegrityError("failed")
+            return orig_finish(serializer, tli)
+
+        with mock.patch.object(serializers.TestListInstanceCreator, "finish", autospec=True, side_effect=finish):
+            response = self.client.post(reverse("testlistinstance-bulk"), [self.data, data2])
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()['results']
+        assert [r['status'] for r in results] == ["error", "created"]
+        assert models.TestListInstance.objects.get().pk == results[1]['id']
+        assert models.TestInstance.objects.count() == self.ntests
+
+    def test_bulk_create_user_key_duplicated(self):
+        self.data['user_key'] = "1234"
+        response = self.client.post(reverse("testlistinstance-bulk"), [self.data, self.data])
+        results = response.json()['results']
+        assert [r['status'] for r in results] == ["created", "invalid"]
+        assert models.TestListInstance.objects.count() == 1
+
 
 class TestPerformTestListCycleAPI(APITestCase):
 
@@ -1169,3 +1247,56 @@ class TestPerformTestListCycleAPI(APITestCase):
         self.day1_data['day'] = -1
         response = self.client.post(self.create_url, self.day1_data)
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestTestInstanceListAPI(APITestCase):
+
+    def setUp(self):
+
+        self.tli = utils.create_test_list_instance()
+        self.client.login(username="user", password="password")
+        now = timezone.now()
+
+        # three instances share a work_completed to ensure ties are paged correctly
+        dates = [now - timezone.timedelta(days=d) for d in (3, 2, 2, 2, 1)]
+        self.tis = [utils.create_test_instance(self.tli, work_completed=wc) for wc in dates]
+        self.url = reverse("testinstance-list")
+
+    def test_limit_offset_by_default(self):
+        resp = self.client.get(self.url).json()
+        assert resp['count'] == len(self.tis)
+
+    def test_keyset_pages(self):
+        seen = []
+        url = self.url + "?cursor=&limit=2"
+        while url:
+            resp = self.client.get(url).json()
+            assert 'count' not in resp
+            seen.extend(int(ti['url'].strip("/").split("/")[-1]) for ti in resp['results'])
+            url = resp['next']
+
+        expected = sorted(self.tis, key=lambda ti: (ti.work_completed, ti.pk))
+        assert seen == [ti.pk for ti in expected]
+
+    def test_invalid_cursor(self):
+        resp = self.client.get(self.url + "?cursor=foo")
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_fields(self):
+        resp = self.client.get(self.url + "?fields=value,work_completed").json()
+        assert set(resp['results'][0]) == {"value", "work_completed"}
+
+    def test_fields_with_related(self):
+        resp = self.client.get(self.url + "?fields=url,unit_test_info,attachments").json()
+        assert set(resp['results'][0]) == {"url", "unit_test_info", "attachments"}
+
+    def test_export(self):
+        resp = self.client.get(reverse("testinstance-export") + "?export_format=csv")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp['Content-Type'] == "text/csv"
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        assert len(lines) == len(self.tis) + 1
+
+    def test_export_invalid_format(self):
+        resp = self.client.get(reverse("testinstance-export") + "?export_format=xls")
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,17 +1,33 @@
+import logging
+
+from django.db import DatabaseError
 from django.db.models import Q
-from django.http import JsonResponse
+from django.db.transaction import atomic
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import status, views, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework_filters import backends
 
 from qatrack.api.qa import filters, serializers
-from qatrack.api.serializers import MultiSerializerMixin
-from qatrack.api.viewsets import limit_offset_pagination_factory
-from qatrack.qa import models
+from qatrack.api.serializers import (
+    MultiSerializerMixin,
+    SparseFieldsViewSetMixin,
+)
+from qatrack.api.viewsets import (
+    KeysetPagination,
+    keyset_pagination_factory,
+    limit_offset_pagination_factory,
+)
+from qatrack.qa import export, models, signals
 from qatrack.qa.views import perform
 
+logger = logging.getLogger('qatrack')
+
 
 class CompositeCalculation(perform.CompositeCalculation, views.APIView):
     permission_classes = []
@@ -122,14 +138,41 @@ class UnitTestCollectionViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = limit_offset_pagination_factory(page_size=10)
 
 
-class TestInstanceViewSet(viewsets.ReadOnlyModelViewSet):
+class TestInstanceViewSet(SparseFieldsViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = models.TestInstance.objects.prefetch_related("attachment_set").all()
     serializer_class = serializers.TestInstanceSerializer
     filterset_class = filters.TestInstanceFilter
     filter_backends = (backends.RestFrameworkFilterBackend, OrderingFilter,)
-
-
-class TestListInstanceViewSet(MultiSerializerMixin, viewsets.ModelViewSet):
+    pagination_class = KeysetPagination
+    keyset_field = "work_completed"
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """Stream all test instances matching the `unit`, `test` & `status`
+        (ids) and `start` & `end` (work completed dates) query parameters in
+        `export_format` (ndjson, csv, arrow or parquet) format."""
+
+        params = request.query_params
+        file_format = params.get("export_format", export.NDJSON)
+        try:
+            qs = export.export_queryset_from_args(
+                units=params.getlist("unit"),
+                tests=params.getlist("test"),
+                statuses=params.getlist("status"),
+                start=params.get("start"),
+                end=params.get("end"),
+            )
+            chunks = export.export_chunks(qs, file_format)
+        except export.ExportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(chunks, content_type=export.CONTENT_TYPES[file_format])
+        filename = "test-instances.%s" % export.EXTENSIONS[file_format]
+        response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+        return response
+
+
+class TestListInstanceViewSet(SparseFieldsViewSetMixin, MultiSerializerMixin, viewsets.ModelViewSet):
     queryset = models.TestListInstance.objects.prefetch_related(
         "attachment_set",
         "testinstance_set",
@@ -139,9 +182,11 @@ class TestListInstanceViewSet(MultiSerializerMixin, viewsets.ModelViewSet):
     serializer_class = serializers.TestListInstanceSerializer
     filterset_class = filters.TestListInstanceFilter
     filter_backends = (backends.RestFrameworkFilterBackend, OrderingFilter,)
-    pagination_class = limit_offset_pagination_factory(page_size=10)
+    pagination_class = keyset_pagination_factory(page_size=10)
+    keyset_field = "work_completed"
     action_serializers = {
         'create': serializers.TestListInstanceCreator,
+        'bulk': serializers.TestListInstanceCreator,
         'partial_update': serializers.TestListInstanceCreator,
     }
     http_method_names = ['get', 'post', 'patch']
@@ -156,19 +201,107 @@ class TestListInstanceViewSet(MultiSerializerMixin, viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
+        serializer.save(**self.get_extra_create_data(serializer))
+
+    def get_extra_create_data(self, serializer):
+        """Data not provided by the client required to create a test list instance"""
+
         utc = serializer.validated_data['unit_test_collection']
-        day = serializer.validated_data.get('day', 0)
-        day, tl = utc.get_list(day=day)
 
-        extra = {
+        return {
             'created_by': self.request.user,
             'modified_by': self.request.user,
             'modified': timezone.now(),
             'due_date': utc.due_date,
-            'test_list': tl,
-            'day': day,
+            # test list & day were determined from the utc & requested day during validation
+            'test_list': serializer.tl,
+            'day': serializer.day,
+        }
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        """Create many test list instances in one request.  Post either a list
+        of test list instances or {"testlistinstances": [...]} where each item
+        has the same format as when creating a single test list instance.
+
+        Items are validated independently and a result is returned for each
+        of them. Items with a `user_key` that already exists are not created
+        again, so a failed upload can safely be retried.  Items which can't
+        be saved are reported with an "error" status without affecting the
+        other items.  Unit test collection lookups are shared between items,
+        the test instances for each item are created in a single query and due
+        dates are updated once per unit test collection.
+        """
+
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get("testlistinstances")
+        if not isinstance(items, list):
+            msg = "Expected a list of test list instances or {\"testlistinstances\": [...]}"
+            return Response({"detail": msg}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_keys = [item.get("user_key") for item in items if isinstance(item, dict) and item.get("user_key")]
+        existing = models.TestListInstance.objects.filter(user_key__in=user_keys).in_bulk(field_name="user_key")
+
+        # shared by all serializers so that utc/test list lookups are only done once
+        context = self.get_serializer_context()
+        context['lookups'] = {}
+
+        results = []
+        to_create = []
+        seen_keys = set()
+        for index, item in enumerate(items):
+            user_key = item.get("user_key") if isinstance(item, dict) else None
+            if not isinstance(item, dict):
+                errors = {"non_field_errors": ["Test list instance data must be a dictionary"]}
+            elif user_key in existing:
+                results.append(self.bulk_result(index, "exists", existing[user_key]))
+                continue
+            elif user_key and user_key in seen_keys:
+                errors = {"user_key": ["user_key is duplicated within this request"]}
+            else:
+                seen_keys.add(user_key)
+                serializer = serializers.TestListInstanceCreator(data=dict(item), context=context)
+                if serializer.is_valid():
+                    to_create.append((index, serializer))
+                    results.append(None)
+                    continue
+                errors = serializer.errors
+
+            results.append({"index": index, "status": "invalid", "errors": errors})
+
+        with atomic(), signals.defer_last_instance_updates():
+            for index, serializer in to_create:
+                validated_data = dict(serializer.validated_data, **self.get_extra_create_data(serializer))
+                try:
+                    # each item gets its own savepoint so that one failing
+                    # (e.g. a user_key created concurrently) doesn't prevent
+                    # the others from being created
+                    with atomic():
+                        tli, tis = serializer.build(validated_data)
+                        models.TestInstance.objects.bulk_create(tis)
+                        serializer.finish(tli)
+                except ValidationError as e:
+                    errors = e.detail if isinstance(e.detail, dict) else {"non_field_errors": e.detail}
+                    results[index] = {"index": index, "status": "invalid", "errors": errors}
+                except DatabaseError:
+                    logger.exception("Error creating test list instance %d of bulk upload" % index)
+                    errors = {"non_field_errors": ["Unable to create test list instance"]}
+                    results[index] = {"index": index, "status": "error", "errors": errors}
+                else:
+                    results[index] = self.bulk_result(index, "created", tli)
+
+        return Response({"results": results})
+
+    def bulk_result(self, index, result, tli):
+        return {
+            "index": index,
+            "status": result,
+            "id": tli.pk,
+            "url": reverse("testlistinstance-detail", kwargs={'pk': tli.pk}, request=self.request),
+            "site_url": reverse("view_test_list_instance", kwargs={'pk': tli.pk}, request=self.request),
+            "user_key": tli.user_key,
         }
-        serializer.save(**extra)
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -5,3 +5,61 @@ class MultiSerializerMixin:
     def get_serializer_class(self):
         default = super(MultiSerializerMixin, self).get_serializer_class()
         return self.action_serializers.get(self.action, default)
+
+
+def requested_fields(request):
+    """Return the set of field names requested via the comma separated
+    `fields` query parameter of a GET request (or None if all fields should be
+    included)"""
+
+    if request is None or request.method != "GET":
+        return None
+
+    fields = request.query_params.get("fields")
+    if not fields:
+        return None
+
+    return {f.strip() for f in fields.split(",") if f.strip()}
+
+
+class SparseFieldsSerializerMixin:
+    """Serializer mixin which only includes the fields requested via the
+    `fields` query parameter"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        fields = requested_fields(self.context.get("request"))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class SparseFieldsViewSetMixin:
+    """ViewSet mixin which, when the `fields` query parameter is used, only
+    loads the model fields and prefetches required to render the requested
+    fields. Must be used along with a SparseFieldsSerializerMixin serializer."""
+
+    def get_queryset(self):
+
+        queryset = super().get_queryset()
+
+        if requested_fields(self.request) is None:
+            return queryset
+
+        serializer = self.get_serializer()
+        sources = {f.source.split(".")[0] for f in serializer.fields.values()}
+
+        opts = queryset.model._meta
+        concrete = {f.name for f in opts.concrete_fields}
+        only = {opts.pk.name} | (sources & concrete)
+        keyset_field = getattr(self, "keyset_field", None)
+        if keyset_field:
+            only.add(keyset_field)
+
+        prefetches = [
+            p for p in queryset._prefetch_related_lookups
+            if isinstance(p, str) and p.split("__")[0] in sources
+        ]
+
+        return queryset.select_related(None).prefetch_related(None).prefetch_related(*prefetches).only(*only)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from qatrack.api.serializers import SparseFieldsSerializerMixin
 from qatrack.service_log import models
 
 
@@ -31,7 +32,7 @@ class ServiceEventStatusSerializer(serializers.HyperlinkedModelSerializer):
         fields = "__all__"
 
 
-class ServiceEventSerializer(serializers.HyperlinkedModelSerializer):
+class ServiceEventSerializer(SparseFieldsSerializerMixin, serializers.HyperlinkedModelSerializer):
 
     class Meta:
         model = models.ServiceEvent
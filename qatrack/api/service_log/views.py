@@ -4,7 +4,9 @@ from rest_framework import viewsets
 from rest_framework.filters import OrderingFilter
 from rest_framework_filters import backends
 
+from qatrack.api.serializers import SparseFieldsViewSetMixin
 from qatrack.api.service_log import filters, serializers
+from qatrack.api.viewsets import KeysetPagination
 from qatrack.qatrack_core.dates import format_datetime
 from qatrack.service_log import models
 
@@ -37,11 +39,13 @@ class ServiceEventStatusViewSet(viewsets.ModelViewSet):
     filter_backends = (backends.RestFrameworkFilterBackend, OrderingFilter,)
 
 
-class ServiceEventViewSet(viewsets.ModelViewSet):
+class ServiceEventViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = models.ServiceEvent.objects.prefetch_related("service_event_related").all()
     serializer_class = serializers.ServiceEventSerializer
     filterset_class = filters.ServiceEventFilter
     filter_backends = (backends.RestFrameworkFilterBackend, OrderingFilter,)
+    pagination_class = KeysetPagination
+    keyset_field = "datetime_service"
 
 
 class ServiceEventTemplateViewSet(viewsets.ModelViewSet):
@@ -1,6 +1,14 @@
-from rest_framework import viewsets
-from rest_framework import mixins
+import base64
+from collections import OrderedDict
+import json
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework import mixins, viewsets
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 def limit_offset_pagination_factory(page_size=10):
@@ -12,6 +20,99 @@ def limit_offset_pagination_factory(page_size=10):
     return CustomPageSizePagination
 
 
+class KeysetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination which switches to keyset pagination when the
+    `cursor` query parameter is included in the request (use an empty cursor to
+    request the first page).  Keyset pages are ordered by (<view.keyset_field>,
+    id) and each page is found by filtering on the last row of the previous
+    page rather than using an OFFSET, so requesting a page takes the same amount
+    of time no matter how deep into the results it is.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        self.field = view.keyset_field
+        self.limit = self.get_limit(request) or self.default_limit
+
+        queryset = queryset.order_by(F(self.field).asc(nulls_first=True), "pk")
+
+        position = self.decode_cursor(request)
+        if position:
+            value, pk = position
+            if value is None:
+                queryset = queryset.filter(Q(**{"%s__isnull" % self.field: False}) | Q(pk__gt=pk))
+            else:
+                queryset = queryset.filter(Q(**{"%s__gt" % self.field: value}) | Q(**{self.field: value, "pk__gt": pk}))
+
+        page = list(queryset[:self.limit + 1])
+        self.next_position = None
+        if len(page) > self.limit:
+            page = page[:self.limit]
+            last = page[-1]
+            self.next_position = (getattr(last, self.field), last.pk)
+
+        return page
+
+    def decode_cursor(self, request):
+        """Return the (value, id) position encoded in the cursor query parameter"""
+
+        cursor = request.query_params[self.cursor_query_param]
+        if not cursor:
+            return None
+
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            if value is not None:
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError
+            return value, int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        value, pk = position
+        value = value.isoformat() if value is not None else None
+        return base64.urlsafe_b64encode(json.dumps([value, pk]).encode()).decode()
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+
+        if self.next_position is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+def keyset_pagination_factory(page_size=10):
+    """Factory function for creating KeysetPagination classes with custom page sizes"""
+
+    class CustomPageSizePagination(KeysetPagination):
+        default_limit = page_size
+
+    return CustomPageSizePagination
+
+
 class CreateListRetrieveViewSet(mixins.CreateModelMixin,
                                 mixins.ListModelMixin,
                                 mixins.RetrieveModelMixin,
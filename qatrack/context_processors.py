@@ -6,13 +6,26 @@ from django.contrib.auth.models import Group, User
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.cache import cache
 from django.db.models import ObjectDoesNotExist
-from django.db.models.signals import post_delete, post_save, pre_delete
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
 from django.dispatch import receiver
 from django.utils.formats import get_format
 
 from qatrack.faults.models import Fault
 from qatrack.parts.models import PartStorageCollection, PartUsed
-from qatrack.qa.models import TestListInstance, UnitTestCollection, set_active_unit_test_collections_for_unit_cache
+from qatrack.qa.models import (
+    TestListInstance,
+    UnitTestCollection,
+    clear_group_count_caches,
+    clear_user_count_caches,
+    count_cache_key,
+    get_cached_count,
+    set_active_unit_test_collections_for_unit_cache,
+)
 from qatrack.service_log.models import (
     ReturnToServiceQA,
     ServiceEvent,
@@ -21,13 +34,11 @@ from qatrack.service_log.models import (
 from qatrack.units.models import Unit
 
 cache.delete(settings.CACHE_UNREVIEWED_FAULT_COUNT)
-cache.delete(settings.CACHE_UNREVIEWED_COUNT)
-cache.delete(settings.CACHE_UNREVIEWED_COUNT_USER)
+cache.delete(count_cache_key(settings.CACHE_UNREVIEWED_COUNT_))
 cache.delete(settings.CACHE_RTS_QA_COUNT)
 cache.delete(settings.CACHE_RTS_INCOMPLETE_QA_COUNT)
 cache.delete(settings.CACHE_DEFAULT_SE_STATUS)
 cache.delete(settings.CACHE_SE_NEEDING_REVIEW_COUNT)
-cache.delete(settings.CACHE_IN_PROGRESS_COUNT_USER)
 cache.delete(settings.CACHE_SERVICE_STATUS_COLOURS)
 cache.delete(settings.CACHE_SL_NOTIFICATION_TOTAL)
 
@@ -58,18 +69,69 @@ def update_part_quantity(*args, **kwargs):
 
 @receiver(post_save, sender=TestListInstance)
 @receiver(post_delete, sender=TestListInstance)
-@receiver(post_save, sender=User)
-@receiver(post_save, sender=Group)
 def update_unreviewed_cache(*args, **kwargs):
-    """When a test list is completed invalidate the unreviewed counts"""
-    cache.delete(settings.CACHE_UNREVIEWED_COUNT)
-    cache.delete(settings.CACHE_UNREVIEWED_COUNT_USER)
+    """When a test list is completed or reviewed adjust the unreviewed & in progress counts"""
+    tli = kwargs['instance']
+    if kwargs.get('created'):
+        tli._count_state = None
+    tli.update_counts(deleted=kwargs['signal'] is post_delete)
+
     cache.delete(settings.CACHE_RTS_QA_COUNT)
     cache.delete(settings.CACHE_RTS_INCOMPLETE_QA_COUNT)
-    cache.delete(settings.CACHE_IN_PROGRESS_COUNT_USER)
     cache.delete(settings.CACHE_SL_NOTIFICATION_TOTAL)
 
 
+@receiver(post_save, sender=User)
+def update_user_count_cache(*args, **kwargs):
+    """User was modified so their counts need to be recalculated"""
+    clear_user_count_caches([kwargs['instance'].pk])
+    cache.delete(settings.CACHE_SL_NOTIFICATION_TOTAL)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def update_group_count_cache(*args, **kwargs):
+    """Group was modified so counts for all its members need to be recalculated"""
+    clear_group_count_caches([kwargs['instance'].pk])
+    cache.delete(settings.CACHE_SL_NOTIFICATION_TOTAL)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def update_group_membership_count_cache(*args, **kwargs):
+    """Group membership changed so counts for the affected users need to be recalculated"""
+
+    action, instance, pk_set = kwargs['action'], kwargs['instance'], kwargs['pk_set']
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not kwargs['reverse']:
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        user_ids = instance.user_set.values_list("pk", flat=True)
+    else:
+        user_ids = pk_set
+
+    clear_user_count_caches(user_ids)
+
+
+@receiver(m2m_changed, sender=UnitTestCollection.visible_to.through)
+def update_visible_to_count_cache(*args, **kwargs):
+    """Visibility of a UnitTestCollection changed so counts for the affected users need to be recalculated"""
+
+    action, instance, pk_set = kwargs['action'], kwargs['instance'], kwargs['pk_set']
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if kwargs['reverse']:
+        group_ids = [instance.pk]
+    elif action == "pre_clear":
+        group_ids = instance.visible_to.values_list("pk", flat=True)
+    else:
+        group_ids = pk_set
+
+    clear_group_count_caches(group_ids)
+
+
 @receiver(post_save, sender=ReturnToServiceQA)
 @receiver(post_delete, sender=ReturnToServiceQA)
 def update_rts_cache(*args, **kwargs):
@@ -148,14 +210,14 @@ def site(request):
     cur_site = get_current_site(request)
     context.update({'SITE_NAME': cur_site.name, 'SITE_URL': cur_site.domain})
 
-    context['UNREVIEWED'] = cache.get_or_set(
-        settings.CACHE_UNREVIEWED_COUNT,
+    context['UNREVIEWED'] = get_cached_count(
+        settings.CACHE_UNREVIEWED_COUNT_,
         TestListInstance.objects.unreviewed_count,
     )
 
     context['USERS_UNREVIEWED'] = get_user_count(
         request,
-        settings.CACHE_UNREVIEWED_COUNT_USER,
+        settings.CACHE_UNREVIEWED_COUNT_USER_,
         TestListInstance.objects.your_unreviewed_count,
     )
 
@@ -198,7 +260,7 @@ def site(request):
 
     context['USERS_IN_PROGRESS'] = get_user_count(
         request,
-        settings.CACHE_IN_PROGRESS_COUNT_USER,
+        settings.CACHE_IN_PROGRESS_COUNT_USER_,
         TestListInstance.objects.your_in_progress_count,
     )
 
@@ -212,22 +274,11 @@ def site(request):
 
 def get_user_count(request, key, manager_method):
 
-    counts = cache.get(key)
-    if counts is None and hasattr(request, "user"):
-        user_count = manager_method(request.user)
-        counts = {request.user.pk: user_count}
-        cache.set(key, counts)
-    else:
-        try:
-            user_count = counts[request.user.pk]
-        except KeyError:
-            user_count = manager_method(request.user)
-            counts[request.user.pk] = user_count
-            cache.set(key, counts)
-        except Exception:
-            user_count = 0
-
-    return user_count
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return 0
+
+    return get_cached_count(key, lambda: manager_method(user), user.pk)
 
 
 def get_sl_notification_total(request, se_unreviewed, rts_incomplete, rts_unreviewed):
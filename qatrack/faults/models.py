@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _l
 from django_comments.models import Comment
 
+from qatrack.qatrack_core.search import AutocompleteIndex
 from qatrack.qatrack_core.utils import unique_slug_generator
 from qatrack.service_log import models as sl_models
 from qatrack.units import models as u_models
@@ -60,6 +61,9 @@ class FaultType(models.Model):
         return self.code
 
 
+fault_type_search = AutocompleteIndex(FaultType, ("code",), order_by="code")
+
+
 class FaultManager(models.Manager):
 
     def unreviewed(self):
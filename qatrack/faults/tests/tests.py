@@ -909,6 +909,13 @@ class TestFaultTypeAutocomplete(TestCase):
         expected = {'id': '%snew' % forms.NEW_FAULT_TYPE_MARKER, 'text': "*new*", 'code': 'new', 'description': ''}
         assert results[0] == expected
 
+    def test_deleted_fault_type_skipped(self):
+        """Fault types deleted after the search index was built are ignored"""
+        ft = FaultType.objects.create(code="ft 1")
+        with mock.patch.object(views.models.fault_type_search, "search", return_value=[ft.pk, ft.pk + 1]):
+            results = self.client.get(self.url, {'q': 'ft'}).json()['results']
+        assert [r['code'] for r in results if r['code'] != 'ft'] == ["ft 1"]
+
     def test_query_exact_match_only(self):
         """If query matches a fault types exactly, and is not a match for any
         others, then only the exact match should be returned"""
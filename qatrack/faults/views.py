@@ -3,7 +3,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.context_processors import PermWrapper
 from django.contrib.sites.shortcuts import get_current_site
-from django.db.models import Count, Max, Q
+from django.db.models import Count, Max
 from django.db.transaction import atomic
 from django.http import HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404
@@ -479,18 +479,18 @@ def fault_type_autocomplete(request):
     created when they submit the form."""
 
     q = request.GET.get('q', '').replace(forms.NEW_FAULT_TYPE_MARKER, "").lower()
-    qs = models.FaultType.objects.filter(
-        Q(code__icontains=q) | Q(code__icontains=q.strip()),
-    ).order_by("code")
-
-    qs = qs.values_list("id", "code", "description")
+    ft_ids = models.fault_type_search.search(q)
+    fault_types = models.FaultType.objects.in_bulk(ft_ids)
 
     results = []
 
     exact_match = None
-    for ft_id, code, description in qs:
-        code = code
-        description = description or ''
+    for ft_id in ft_ids:
+        if ft_id not in fault_types:
+            # deleted since the search index was built
+            continue
+        code = fault_types[ft_id].code
+        description = fault_types[ft_id].description or ''
         text = "%s: %s" % (code, truncatechars(description, 80)) if description else code
         if code.lower() == q.strip():
             exact_match = {'id': code, 'code': code, 'text': text, 'description': description}
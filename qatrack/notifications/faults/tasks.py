@@ -0,0 +1,49 @@
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from qatrack.faults.models import Fault, FaultType
+from qatrack.notifications import outbox
+
+logger = logging.getLogger('qatrack')
+
+
+def send_fault_email(fault_id, fault_type_ids):
+    """Task to send the fault logged notices for a fault"""
+
+    from qatrack.notifications.faults.handlers import get_notices
+
+    fault = Fault.objects.select_related("unit").filter(pk=fault_id).first()
+    if not fault:
+        return
+
+    recipients = outbox.recipients_for(get_notices(fault))
+    if not recipients:
+        return
+
+    fts = ', '.join(
+        FaultType.objects.filter(pk__in=fault_type_ids).order_by("code").values_list("code", flat=True)
+    )
+    context = {'fault': fault, 'fault_types': fts}
+
+    try:
+        outbox.send(
+            recipients,
+            "faults/email.html",
+            context=context,
+            subject_template="faults/subject.txt",
+            text_template="faults/email.txt",
+        )
+        logger.info(
+            "Sent Fault Notice for fault id %d at %s" % (fault.id, timezone.now())
+        )
+    except:  # noqa: E722  # pragma: nocover
+        logger.exception(
+            "Error sending Fault Logged Notice for fault id %d at %s." %
+            (fault.id, timezone.now())
+        )
+
+        fail_silently = getattr(settings, "EMAIL_FAIL_SILENTLY", True)
+        if not fail_silently:
+            raise
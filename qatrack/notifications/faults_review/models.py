@@ -8,10 +8,10 @@ from recurrence.fields import RecurrenceField
 
 from qatrack.faults.models import Fault
 from qatrack.notifications.common.models import RecipientGroup, UnitGroup
-from qatrack.qatrack_core.scheduling import RecurrenceFieldMixin
+from qatrack.qatrack_core.scheduling import NextRunMixin
 
 
-class FaultsReviewNotice(RecurrenceFieldMixin, models.Model):
+class FaultsReviewNotice(NextRunMixin, models.Model):
 
     UNREVIEWED = 0
 
@@ -66,6 +66,7 @@ class FaultsReviewNotice(RecurrenceFieldMixin, models.Model):
     )
 
     last_sent = models.DateTimeField(null=True, editable=False)
+    next_run = models.DateTimeField(null=True, editable=False, db_index=True)
 
     class Meta:
         verbose_name = _l("Fault Review Notice")
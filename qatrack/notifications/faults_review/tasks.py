@@ -18,8 +18,6 @@ def run_faults_review_notices():
         FaultsReviewNotice,
         "run_faults_review_notices",
         schedule_faultsreview_notice,
-        time_field="time",
-        recurrence_field="recurrences",
     )
 
 
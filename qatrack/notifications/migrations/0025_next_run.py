@@ -0,0 +1,57 @@
+# Generated by Django 2.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+from qatrack.qatrack_core.scheduling import calc_next_run
+
+scheduled_models = [
+    'faultsreviewnotice',
+    'qcreviewnotice',
+    'qcschedulingnotice',
+    'serviceeventreviewnotice',
+    'serviceeventschedulingnotice',
+]
+
+
+def set_next_run(apps, schema):
+
+    for model_name in scheduled_models:
+        Model = apps.get_model("notifications", model_name)
+        for notice in Model.objects.all():
+            Model.objects.filter(pk=notice.pk).update(next_run=calc_next_run(notice.recurrences, notice.time))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0024_serviceeventschedulingnotice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faultsreviewnotice',
+            name='next_run',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='qcreviewnotice',
+            name='next_run',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='qcschedulingnotice',
+            name='next_run',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='serviceeventreviewnotice',
+            name='next_run',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='serviceeventschedulingnotice',
+            name='next_run',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_next_run, reverse_code=lambda a, s: None),
+    ]
@@ -0,0 +1,143 @@
+"""
+Notification outbox.  Signal handlers call :func:`enqueue` with the dotted
+path of a task and the ids of the objects involved. When
+``settings.NOTIFICATIONS_ASYNC`` is True the task is run by a django-q worker
+once the current transaction has been committed, otherwise it is run
+immediately.  Tasks resolve their recipients, render their templates once and
+send via :func:`send` which reuses a single SMTP connection per worker.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+from django_q.tasks import async_task
+
+from qatrack.qatrack_core.email import send_email_to_users
+
+logger = logging.getLogger('qatrack')
+
+_connection = None
+
+# tracks whether the current thread is running a queued task in a django-q
+# worker, the only place the shared connection is used
+_worker = threading.local()
+
+
+def enqueue(func, *args):
+    """Run the task at dotted path func with args, either in a django-q worker
+    or immediately depending on settings.NOTIFICATIONS_ASYNC"""
+
+    if not settings.NOTIFICATIONS_ASYNC:
+        import_string(func)(*args)
+        return
+
+    def queue():
+        try:
+            async_task("qatrack.notifications.outbox.run_task", func, *args, group="notifications")
+        except Exception:  # pragma: nocover
+            logger.exception("Unable to queue %s. Sending immediately." % func)
+            import_string(func)(*args)
+
+    transaction.on_commit(queue)
+
+
+def run_task(func, *args):
+    """Run the task at dotted path func with args in a django-q worker"""
+
+    _worker.active = True
+    try:
+        import_string(func)(*args)
+    finally:
+        _worker.active = False
+
+
+def allow(notice):
+    """Return True if notice has not exceeded settings.NOTIFICATION_RATE_LIMIT
+    sends in the current rate limit period"""
+
+    limit = settings.NOTIFICATION_RATE_LIMIT
+    if not limit:
+        return True
+
+    period = settings.NOTIFICATION_RATE_LIMIT_PERIOD
+    key = functools.partial(
+        settings.CACHE_NOTIFICATION_RATE_.format,
+        notice._meta.model_name,
+        notice.pk,
+        int(time.time() // period),
+    )
+
+    # Each send claims one of limit slots.  cache.incr isn't atomic for all
+    # backends (e.g. the database cache) but cache.add only succeeds for one
+    # caller, so claiming slots with add can't exceed the limit. The "next"
+    # key is only a hint of where to start looking for a free slot.
+    first = cache.get(key("next"), 0)
+    for slot in range(first, limit):
+        if cache.add(key(slot), 1, period):
+            cache.set(key("next"), slot + 1, period)
+            return True
+
+    logger.warning("%s %d exceeded its rate limit of %d emails per %ds" % (
+        notice._meta.model_name, notice.pk, limit, period
+    ))
+    return False
+
+
+def recipients_for(notices):
+    """Return the set of email addresses for all notices that are not
+    currently rate limited"""
+
+    recipients = set()
+    for notice in notices:
+        if allow(notice):
+            recipients |= notice.recipients.recipient_emails()
+    return recipients
+
+
+def get_connection():
+    """Return the email connection shared by all notifications sent from this
+    process, (re)opening it if required"""
+
+    global _connection
+
+    if _connection is None:
+        _connection = mail.get_connection(fail_silently=False)
+
+    smtp = getattr(_connection, "connection", None)
+    if smtp is not None:
+        try:
+            status = smtp.noop()[0]
+        except Exception:
+            status = None
+        if status != 250:
+            # server closed the connection since our last send
+            _connection.close()
+
+    _connection.open()
+    return _connection
+
+
+def close_connection():
+    """Close the shared email connection"""
+
+    global _connection
+
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+
+def send(recipients, template, context=None, **kwargs):
+    """Send a notification email, reusing the shared connection when sending
+    from a notification worker.  Notifications sent from any other thread
+    (e.g. when a task couldn't be queued) use a connection of their own."""
+
+    connection = get_connection() if getattr(_worker, "active", False) else None
+    send_email_to_users(recipients, template, context=context, connection=connection, **kwargs)
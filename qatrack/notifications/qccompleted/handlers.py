@@ -1,7 +1,6 @@
 from collections import defaultdict
 import logging
 
-from django.conf import settings
 from django.db.models import Q
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
@@ -9,73 +8,41 @@ from django.utils import timezone
 from django_q.models import Schedule
 from django_q.tasks import schedule
 
+from qatrack.notifications import outbox
 from qatrack.qa.models import TestListInstance
 from qatrack.qa.signals import testlist_complete
-from qatrack.qatrack_core.email import send_email_to_users
 
 logger = logging.getLogger('qatrack')
 
 
 @receiver(testlist_complete)
 def email_on_testlist_save(*args, **kwargs):
-    """TestListInstance was completed.  Send email notification if applicable"""
-
-    test_list_instance = kwargs["instance"]
-
-    failing = test_list_instance.failing_tests().select_related(
-        "tolerance",
-        "reference",
-        "unit_test_info",
-        "unit_test_info__test",
-    ).order_by("order", "created")
-    tolerance = test_list_instance.tolerance_tests().select_related(
-        "tolerance",
-        "reference",
-        "unit_test_info",
-        "unit_test_info__test",
-    ).order_by("order", "created")
-
-    recipients = get_notification_recipients(test_list_instance)
-    comp_recipients, tol_recipients, act_recipients = recipients
-
-    if not (failing or tolerance or comp_recipients):
-        return
-
-    recipients = comp_recipients
-    if tolerance:
-        recipients |= tol_recipients
-    if failing:
-        recipients |= act_recipients | tol_recipients
-
-    context = {
-        "failing_tests": failing,
-        "tolerance_tests": tolerance,
-        "test_list_instance": test_list_instance,
-        "notice_type": "completed"
-    }
+    """TestListInstance was completed.  Queue email notification if applicable"""
+    outbox.enqueue("qatrack.notifications.qccompleted.tasks.send_completed_email", kwargs["instance"].pk)
 
-    template = getattr(settings, "EMAIL_NOTIFICATION_TEMPLATE", "notification_email.html")
-    subject_template = getattr(settings, "EMAIL_NOTIFICATION_SUBJECT_TEMPLATE", "notification_email_subject.txt")
 
-    send_email_to_users(recipients, template, context, subject_template=subject_template)
-
-
-def get_notification_recipients(test_list_instance):
+def get_notices(test_list_instance):
+    """Return all completed, tolerance & action notices applicable to test_list_instance"""
 
     from qatrack.notifications import models
 
     unit = test_list_instance.unit_test_collection.unit
     test_list = test_list_instance.test_list
 
-    subs = models.QCCompletedNotice.objects.filter(
+    return models.QCCompletedNotice.objects.filter(
         (Q(units=None) | Q(units__units=unit)) &
         (Q(test_lists=None) | Q(test_lists__test_lists=test_list))
     ).exclude(
         notification_type=models.QCCompletedNotice.FOLLOW_UP,
     ).select_related("recipients")  # yapf: disable
 
+
+def get_notification_recipients(test_list_instance):
+
+    from qatrack.notifications import models
+
     recipients = defaultdict(set)
-    for sub in subs:
+    for sub in get_notices(test_list_instance):
         recipients[sub.notification_type] |= sub.recipients.recipient_emails()
 
     return (
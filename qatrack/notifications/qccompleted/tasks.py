@@ -1,7 +1,54 @@
 from django.conf import settings
 
+from qatrack.notifications import outbox
 from qatrack.qa.models import TestListInstance
-from qatrack.qatrack_core.email import send_email_to_users
+
+
+def send_completed_email(test_list_instance_id):
+    """Task to send the completed, tolerance & action notices for a test list instance"""
+
+    from qatrack.notifications.models import QCCompletedNotice
+    from qatrack.notifications.qccompleted.handlers import get_notices
+
+    test_list_instance = TestListInstance.objects.filter(pk=test_list_instance_id).first()
+    if not test_list_instance:
+        return
+
+    failing = test_list_instance.failing_tests().select_related(
+        "tolerance",
+        "reference",
+        "unit_test_info",
+        "unit_test_info__test",
+    ).order_by("order", "created")
+    tolerance = test_list_instance.tolerance_tests().select_related(
+        "tolerance",
+        "reference",
+        "unit_test_info",
+        "unit_test_info__test",
+    ).order_by("order", "created")
+
+    notification_types = [QCCompletedNotice.COMPLETED]
+    if tolerance or failing:
+        notification_types.append(QCCompletedNotice.TOLERANCE)
+    if failing:
+        notification_types.append(QCCompletedNotice.ACTION)
+
+    notices = get_notices(test_list_instance).filter(notification_type__in=notification_types)
+    recipients = outbox.recipients_for(notices)
+    if not recipients:
+        return
+
+    context = {
+        "failing_tests": failing,
+        "tolerance_tests": tolerance,
+        "test_list_instance": test_list_instance,
+        "notice_type": "completed"
+    }
+
+    template = getattr(settings, "EMAIL_NOTIFICATION_TEMPLATE", "notification_email.html")
+    subject_template = getattr(settings, "EMAIL_NOTIFICATION_SUBJECT_TEMPLATE", "notification_email_subject.txt")
+
+    outbox.send(recipients, template, context, subject_template=subject_template)
 
 
 def send_follow_up_email(test_list_instance_id=None, notification_id=None):
@@ -14,7 +61,7 @@ def send_follow_up_email(test_list_instance_id=None, notification_id=None):
     if not (tli and sub):
         return
 
-    recipients = sub.recipients.recipient_emails()
+    recipients = outbox.recipients_for([sub])
     context = {
         'notice_type': "follow_up",
         'test_list_instance': tli,
@@ -22,4 +69,4 @@ def send_follow_up_email(test_list_instance_id=None, notification_id=None):
     template = getattr(settings, "EMAIL_NOTIFICATION_TEMPLATE", "notification_email.html")
     subject_template = getattr(settings, "EMAIL_NOTIFICATION_SUBJECT_TEMPLATE", "notification_email_subject.txt")
 
-    send_email_to_users(recipients, template, context, subject_template=subject_template)
+    outbox.send(recipients, template, context, subject_template=subject_template)
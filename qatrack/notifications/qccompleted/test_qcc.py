@@ -1,11 +1,15 @@
+from unittest import mock
+
 from django.contrib.admin.sites import AdminSite
 from django.core import mail
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django_q.models import Schedule
 
 from qatrack.accounts.tests.utils import create_user
+from qatrack.notifications import outbox
 from qatrack.notifications.models import (
     QCCompletedNotice,
     RecipientGroup,
@@ -432,6 +436,75 @@ class TestQCCompletedEmails(TestCase):
         tasks.send_follow_up_email(notification_id=notification.id)
         self.assertEqual(len(mail.outbox), 0)
 
+    @override_settings(NOTIFICATIONS_ASYNC=True)
+    @mock.patch("qatrack.notifications.outbox.transaction.on_commit", lambda func: func())
+    @mock.patch("qatrack.notifications.outbox.async_task")
+    def test_email_queued(self, async_task):
+        QCCompletedNotice.objects.create(
+            notification_type=QCCompletedNotice.COMPLETED,
+            recipients=self.recipients,
+        )
+        signals.testlist_complete.send(sender=self, instance=self.test_list_instance, created=True)
+        async_task.assert_called_once_with(
+            "qatrack.notifications.outbox.run_task",
+            "qatrack.notifications.qccompleted.tasks.send_completed_email",
+            self.test_list_instance.pk,
+            group="notifications",
+        )
+        assert len(mail.outbox) == 0
+
+    @override_settings(NOTIFICATIONS_ASYNC=True)
+    @mock.patch("qatrack.notifications.outbox.get_connection")
+    def test_shared_connection_only_in_worker(self, get_connection):
+        QCCompletedNotice.objects.create(
+            notification_type=QCCompletedNotice.COMPLETED,
+            recipients=self.recipients,
+        )
+        get_connection.return_value = mail.get_connection()
+        tasks.send_completed_email(self.test_list_instance.pk)
+        assert not get_connection.called
+
+        outbox.run_task("qatrack.notifications.qccompleted.tasks.send_completed_email", self.test_list_instance.pk)
+        assert get_connection.called
+        assert len(mail.outbox) == 2
+
+    def test_send_completed_email(self):
+        QCCompletedNotice.objects.create(
+            notification_type=QCCompletedNotice.COMPLETED,
+            recipients=self.recipients,
+        )
+        tasks.send_completed_email(self.test_list_instance.pk)
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].recipients() == ["example@example.com"]
+
+    def test_send_completed_email_no_tli(self):
+        tasks.send_completed_email(-1)
+        assert len(mail.outbox) == 0
+
+    @override_settings(NOTIFICATION_RATE_LIMIT=1)
+    def test_rate_limited(self):
+        cache.clear()
+        QCCompletedNotice.objects.create(
+            notification_type=QCCompletedNotice.COMPLETED,
+            recipients=self.recipients,
+        )
+        signals.testlist_complete.send(sender=self, instance=self.test_list_instance, created=True)
+        signals.testlist_complete.send(sender=self, instance=self.test_list_instance, created=True)
+        assert len(mail.outbox) == 1
+
+    @override_settings(NOTIFICATION_RATE_LIMIT=2)
+    def test_rate_limit_hint_stale(self):
+        """Sends are still limited if the hint of the next free slot is out of date"""
+        cache.clear()
+        notice = QCCompletedNotice.objects.create(
+            notification_type=QCCompletedNotice.COMPLETED,
+            recipients=self.recipients,
+        )
+        assert outbox.allow(notice)
+        with mock.patch.object(outbox.cache, "set"):
+            assert outbox.allow(notice)
+        assert not outbox.allow(notice)
+
 
 class TestQCCompletedNoticeModel:
 
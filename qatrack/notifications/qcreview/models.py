@@ -12,10 +12,10 @@ from qatrack.notifications.common.models import (
     UnitGroup,
 )
 from qatrack.qa.models import TestListInstance
-from qatrack.qatrack_core.scheduling import RecurrenceFieldMixin
+from qatrack.qatrack_core.scheduling import NextRunMixin
 
 
-class QCReviewNotice(RecurrenceFieldMixin, models.Model):
+class QCReviewNotice(NextRunMixin, models.Model):
 
     UNREVIEWED = 0
 
@@ -82,6 +82,7 @@ class QCReviewNotice(RecurrenceFieldMixin, models.Model):
     )
 
     last_sent = models.DateTimeField(null=True, editable=False)
+    next_run = models.DateTimeField(null=True, editable=False, db_index=True)
 
     class Meta:
         verbose_name = _l("QC Review Notice")
@@ -18,8 +18,6 @@ def run_review_notices():
         QCReviewNotice,
         "run_review_notices",
         schedule_qcreview_notice,
-        time_field="time",
-        recurrence_field="recurrences",
     )
 
 
@@ -13,11 +13,11 @@ from qatrack.notifications.common.models import (
     UnitGroup,
 )
 from qatrack.qa.models import UnitTestCollection
-from qatrack.qatrack_core.scheduling import RecurrenceFieldMixin
+from qatrack.qatrack_core.scheduling import NextRunMixin
 from qatrack.qatrack_core.utils import today_start_end
 
 
-class QCSchedulingNotice(RecurrenceFieldMixin, models.Model):
+class QCSchedulingNotice(NextRunMixin, models.Model):
 
     ALL = 0
     DUE = 10
@@ -99,6 +99,7 @@ class QCSchedulingNotice(RecurrenceFieldMixin, models.Model):
     )
 
     last_sent = models.DateTimeField(null=True, editable=False)
+    next_run = models.DateTimeField(null=True, editable=False, db_index=True)
 
     class Meta:
         verbose_name = _l("QC Scheduling Notice")
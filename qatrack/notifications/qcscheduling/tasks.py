@@ -18,8 +18,6 @@ def run_scheduling_notices():
         QCSchedulingNotice,
         "run_scheduling_notices",
         schedule_scheduling_notice,
-        time_field="time",
-        recurrence_field="recurrences",
     )
 
 
@@ -0,0 +1,52 @@
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from qatrack.notifications import outbox
+from qatrack.service_log.models import ServiceLog
+
+logger = logging.getLogger('qatrack')
+
+
+def send_service_event_email(service_log_id):
+    """Task to send the service event notices for a service log entry"""
+
+    from qatrack.notifications.service_log.handlers import get_notices
+
+    service_log = ServiceLog.objects.select_related(
+        "service_event",
+        "service_event__unit_service_area__unit",
+    ).filter(pk=service_log_id).first()
+    if not service_log:
+        return
+
+    recipients = outbox.recipients_for(get_notices(service_log.service_event, service_log.log_type))
+    if not recipients:
+        return
+
+    context = {
+        'service_event': service_log.service_event,
+        'service_log': service_log,
+    }
+
+    try:
+        outbox.send(
+            recipients,
+            "service_log/email.html",
+            context=context,
+            subject_template="service_log/subject.txt",
+            text_template="service_log/email.txt",
+        )
+        logger.info(
+            "Sent Service Event Notice for service event %d at %s" % (service_log.service_event_id, timezone.now())
+        )
+    except:  # noqa: E722  # pragma: nocover
+        logger.exception(
+            "Error sending Service Event Notice for service event %d at %s." %
+            (service_log.service_event_id, timezone.now())
+        )
+
+        fail_silently = getattr(settings, "EMAIL_FAIL_SILENTLY", True)
+        if not fail_silently:
+            raise
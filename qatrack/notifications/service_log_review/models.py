@@ -7,11 +7,11 @@ from django.utils.translation import gettext_lazy as _l
 from recurrence.fields import RecurrenceField
 
 from qatrack.notifications.common.models import RecipientGroup, UnitGroup
-from qatrack.qatrack_core.scheduling import RecurrenceFieldMixin
+from qatrack.qatrack_core.scheduling import NextRunMixin
 from qatrack.service_log.models import ServiceEvent
 
 
-class ServiceEventReviewNotice(RecurrenceFieldMixin, models.Model):
+class ServiceEventReviewNotice(NextRunMixin, models.Model):
 
     UNREVIEWED = 0
 
@@ -66,6 +66,7 @@ class ServiceEventReviewNotice(RecurrenceFieldMixin, models.Model):
     )
 
     last_sent = models.DateTimeField(null=True, editable=False)
+    next_run = models.DateTimeField(null=True, editable=False, db_index=True)
 
     class Meta:
         verbose_name = _l("Service Event Review Notice")
@@ -18,8 +18,6 @@ def run_service_event_review_notices():
         ServiceEventReviewNotice,
         "run_service_event_review_notices",
         schedule_serviceeventreview_notice,
-        time_field="time",
-        recurrence_field="recurrences",
     )
 
 
@@ -7,12 +7,12 @@ from django.utils.translation import gettext_lazy as _l
 from recurrence.fields import RecurrenceField
 
 from qatrack.notifications.common.models import RecipientGroup, UnitGroup
-from qatrack.qatrack_core.scheduling import RecurrenceFieldMixin
+from qatrack.qatrack_core.scheduling import NextRunMixin
 from qatrack.qatrack_core.utils import today_start_end
 from qatrack.service_log.models import ServiceEventSchedule
 
 
-class ServiceEventSchedulingNotice(RecurrenceFieldMixin, models.Model):
+class ServiceEventSchedulingNotice(NextRunMixin, models.Model):
 
     ALL = 0
     DUE = 10
@@ -82,6 +82,7 @@ class ServiceEventSchedulingNotice(RecurrenceFieldMixin, models.Model):
     )
 
     last_sent = models.DateTimeField(null=True, editable=False)
+    next_run = models.DateTimeField(null=True, editable=False, db_index=True)
 
     class Meta:
         verbose_name = _l("Service Event Scheduling Notice")
@@ -18,8 +18,6 @@ def run_scheduling_notices():
         ServiceEventSchedulingNotice,
         "run_service_log_scheduling_notices",
         schedule_service_event_scheduling_notice,
-        time_field="time",
-        recurrence_field="recurrences",
     )
 
 
@@ -7,6 +7,7 @@ from django.utils.html import format_html
 from django.utils.translation import gettext as _
 from django.utils.translation import gettext_lazy as _l
 
+from qatrack.qatrack_core.search import AutocompleteIndex
 from qatrack.service_log import models as sl_models
 from qatrack.units import models as u_models
 
@@ -317,16 +318,20 @@ class Part(models.Model):
             self.quantity_current = 0
         self.quantity_current = self.quantity_current if self.quantity_current >= 0 else 0
 
-        quantity_changed = initial_quantity != self.quantity_current
-        update_fields = ['quantity_current'] if quantity_changed else None
+        # only save the quantity (and only when it changed) so the part
+        # autocomplete index isn't invalidated by stock changes
+        if initial_quantity != self.quantity_current:
+            self.save(update_fields=['quantity_current'])
 
-        self.save(update_fields=update_fields)
         return self.quantity_current < self.quantity_min
 
     def get_absolute_url(self):
         return reverse("part_details", kwargs={"pk": self.pk})
 
 
+part_search = AutocompleteIndex(Part, ("part_number", "name"), order_by="part_number")
+
+
 class PartStorageCollectionManager(models.Manager):
 
     def get_queryset(self):
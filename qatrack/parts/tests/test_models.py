@@ -38,6 +38,12 @@ class TestPart(TestCase):
             '%s (%s) - %s' % (self.p_1.part_number, self.p_1.alt_part_number, self.p_1.name),
         )
 
+    def test_set_quantity_current_unchanged_not_saved(self):
+        self.p_1.set_quantity_current()
+        with mock.patch.object(self.p_1, "save") as save:
+            self.p_1.set_quantity_current()
+        assert not save.called
+
 
 class TestPartStorageCollection(TestCase):
 
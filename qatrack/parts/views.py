@@ -3,7 +3,7 @@ from collections import defaultdict
 from braces.views import LoginRequiredMixin
 from django.contrib import messages
 from django.contrib.auth.context_processors import PermWrapper
-from django.db.models import Count, F, Q
+from django.db.models import Count, F
 from django.forms.utils import timezone
 from django.http import HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404
@@ -25,9 +25,10 @@ from qatrack.parts import models as p_models
 
 def parts_searcher(request):
     p_search = request.GET['q']
+    part_ids = p_models.part_search.search(p_search, limit=50)
     parts = p_models.Part.objects\
-        .filter(Q(part_number__icontains=p_search) | Q(name__icontains=p_search)) \
-        .order_by('part_number')[0:50]\
+        .filter(id__in=part_ids) \
+        .order_by('part_number')\
         .values_list('id', 'part_number', 'alt_part_number', 'name', 'quantity_current')
     return JsonResponse({'data': list(parts)}, safe=False)
 
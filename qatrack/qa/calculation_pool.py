@@ -0,0 +1,259 @@
+"""
+Optional pool of long lived worker processes used to run composite & upload
+calculation procedures outside of the web server process.
+
+When ``settings.CALCULATION_POOL_SIZE`` is greater than zero, calculations
+are submitted to a pool of ``CALCULATION_POOL_SIZE`` worker processes which
+have Django set up and the modules from the default calculation context
+(numpy, scipy, matplotlib, pydicom etc) already imported.  Each calculation is
+limited to ``CALCULATION_POOL_TIMEOUT`` seconds of wall clock time and each
+worker may optionally be limited to ``CALCULATION_POOL_MEMORY_LIMIT`` MB of
+address space.  When the pool is disabled (the default), calculations are run
+in process exactly as before.
+
+ProcessPoolExecutor can't cancel a running task and breaks all outstanding
+calculations when one of its workers is killed, so when a calculation times
+out its pool is retired: new calculations are submitted to a new pool while
+the calculations already submitted to the old pool are left to finish, after
+which the old pool's workers (including the one still running the timed out
+calculation) are terminated.
+"""
+
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import functools
+import logging
+import multiprocessing
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.translation import gettext as _
+
+logger = logging.getLogger('qatrack')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# futures which have not finished (or been abandoned after timing out) for
+# each pool, and pools which will be terminated once they have none left
+_futures = {}
+_retired = set()
+
+_queue_depth = 0
+_queue_lock = threading.Lock()
+
+# set to True in worker processes so that calculations running in a worker
+# never try to submit work to a pool of their own
+_in_worker = False
+
+
+class CalculationError(Exception):
+    """Raised when a calculation could not be completed by the pool"""
+
+
+class CalculationTimeout(CalculationError):
+    """Raised when a calculation exceeds CALCULATION_POOL_TIMEOUT"""
+
+
+def enabled():
+    """Return True if calculations should be run in the calculation pool"""
+    return not _in_worker and settings.CALCULATION_POOL_SIZE > 0
+
+
+def queue_depth():
+    """Return number of calculations currently queued or running in the pool"""
+    return _queue_depth
+
+
+def _init_worker(memory_limit):
+    """Set up Django, resource limits and warm up imports in a new worker"""
+
+    global _in_worker
+    _in_worker = True
+
+    import django
+    django.setup()
+
+    if memory_limit:
+        try:
+            import resource
+            limit = int(memory_limit * 1024 * 1024)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            logger.warning("Unable to set calculation pool memory limit on this platform")
+
+    # importing perform imports all of the DEFAULT_CALCULATION_CONTEXT modules
+    from qatrack.qa.views import perform  # noqa: F401
+
+
+def _noop():
+    return None
+
+
+def _run_task(func, *args):
+    """Run func(*args) in a worker, discarding any database connections
+    which have gone stale since the workers last calculation"""
+
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def get_pool():
+    """Return the process wide calculation pool, creating it if required"""
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork so workers don't share the parents
+            # database connections
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=settings.CALCULATION_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings.CALCULATION_POOL_MEMORY_LIMIT,),
+            )
+        return _pool
+
+
+def start():
+    """Start all worker processes ahead of the first calculation request"""
+
+    if not enabled():
+        return
+
+    pool = get_pool()
+    for __ in range(settings.CALCULATION_POOL_SIZE):
+        pool.submit(_noop)
+
+
+def reset(terminate=False):
+    """Shut down the current pool. A new pool will be created on next use"""
+
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+        if pool is not None:
+            _futures.pop(pool, None)
+            _retired.discard(pool)
+
+    if pool is not None:
+        _shutdown(pool, terminate=terminate)
+
+
+def _shutdown(pool, terminate=False):
+
+    if terminate:
+        # ProcessPoolExecutor has no public API for cancelling a running task
+        # so we need to kill the worker processes directly
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+
+    pool.shutdown(wait=False)
+
+
+def _discard(pool):
+    """Shut down a broken pool. If it is still the current pool a new pool
+    will be created on next use"""
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        _futures.pop(pool, None)
+        _retired.discard(pool)
+
+    _shutdown(pool)
+
+
+def _retire(pool):
+    """Stop submitting new calculations to pool and terminate its workers once
+    the calculations already submitted to it have finished"""
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        _retired.add(pool)
+
+
+def _release(pool, future):
+    """Stop tracking future and terminate pool if it was retired and this was
+    its last outstanding calculation"""
+
+    with _pool_lock:
+        futures = _futures.get(pool, set())
+        futures.discard(future)
+        drained = pool in _retired and not futures
+        if drained:
+            _retired.discard(pool)
+            _futures.pop(pool, None)
+
+    if drained:
+        logger.info("Terminating retired calculation pool")
+        _shutdown(pool, terminate=True)
+
+
+def _task_done(pool, future):
+    global _queue_depth
+    with _queue_lock:
+        _queue_depth -= 1
+
+    if pool is not None:
+        _release(pool, future)
+
+
+def run(func, *args):
+    """
+    Run func(*args) in the calculation pool and return the result. func must
+    be a module level function and args & the return value must be
+    picklable.  If the pool is disabled, func is called directly.
+    """
+
+    global _queue_depth
+
+    if not enabled():
+        return func(*args)
+
+    pool = get_pool()
+    with _queue_lock:
+        _queue_depth += 1
+        depth = _queue_depth
+
+    logger.debug("Calculation pool queue depth: %d" % depth)
+    if depth > settings.CALCULATION_POOL_SIZE:
+        logger.info(
+            "Calculation pool queue depth (%d) exceeds pool size (%d)" % (depth, settings.CALCULATION_POOL_SIZE)
+        )
+
+    try:
+        future = pool.submit(_run_task, func, *args)
+    except (BrokenProcessPool, RuntimeError):
+        _task_done(None, None)
+        _discard(pool)
+        raise CalculationError(_("Calculation server unavailable. Please try again."))
+
+    with _pool_lock:
+        _futures.setdefault(pool, set()).add(future)
+    future.add_done_callback(functools.partial(_task_done, pool))
+
+    try:
+        return future.result(timeout=settings.CALCULATION_POOL_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        logger.error("Calculation %s timed out after %ss" % (func.__name__, settings.CALCULATION_POOL_TIMEOUT))
+        _retire(pool)
+        _release(pool, future)
+        msg = _("Calculation did not complete within %(timeout)s seconds")
+        raise CalculationTimeout(msg % {'timeout': settings.CALCULATION_POOL_TIMEOUT})
+    except BrokenProcessPool:
+        logger.error("Calculation pool worker died while running %s" % func.__name__)
+        _discard(pool)
+        raise CalculationError(_("Calculation failed unexpectedly (possibly due to exceeding the memory limit)"))
@@ -197,6 +197,64 @@ def display(fig, x, sgSize, baseline, dates=None, fit=False):
              fontsize=HFS)
 
 
+################################################################################
+
+def compute(x, sgSize, baseline, dates=None):
+    """
+    Calculate the control chart & range chart parameters for a dataset
+    without generating any plots.
+
+    Arguments:
+    x        -- one dimensional array or list of data
+    sgSize   -- subgroup size
+    baseline -- number of subgroups used to generate the baseline
+
+    Keyword arguments:
+    dates    -- Optional dates for data.  len(x) must == len(dates)
+
+    Returns a dictionary of JSON serializable results including the
+    control limits and the indices of any out of control subgroups.
+    """
+
+    if dates is None:
+        dates = list(range(len(x)))
+
+    sg, xbar, sgNum = get_subgroups(x, sgSize, dates)
+    r = get_ranges(sg, sgSize)
+    xbar_thresh, range_thresh = get_param(sg, xbar, r, baseline, sgSize)
+    Ac, Au, Al, Aus, Als = [float(t[0]) for t in xbar_thresh]
+    Rc, Ru, Rl = [float(t[0]) for t in range_thresh]
+
+    xbar_ooc = np.flatnonzero((xbar > Au) | (xbar < Al))
+
+    # with a subgroup size of 1 the first range is undefined
+    first_range = 1 if sgSize == 1 else 0
+    range_ooc = np.flatnonzero((r[first_range:] > Ru) | (r[first_range:] < Rl)) + first_range
+
+    return {
+        'n_points': len(x),
+        'subgroup_size': sgSize,
+        'n_baseline_subgroups': baseline,
+        'subgroup_dates': [dates[i * sgSize] for i in range(len(xbar))],
+        'subgroup_means': xbar.tolist(),
+        'ranges': r.tolist(),
+        'control_limits': {
+            'center': Ac,
+            'upper': Au,
+            'lower': Al,
+            'upper_std': Aus,
+            'lower_std': Als,
+        },
+        'range_limits': {
+            'center': Rc,
+            'upper': Ru,
+            'lower': Rl,
+        },
+        'out_of_control': xbar_ooc.tolist(),
+        'range_out_of_control': range_ooc.tolist(),
+    }
+
+
 ################################################################################
 
 def get_bins(x):
@@ -398,13 +456,11 @@ def unity_sgSize(sgNum, r, baseline):
 
 def get_subgroups(x, sgSize, dates):
 
-    sg = [x[i: i + sgSize] for i in np.arange(0, len(x), sgSize)]  # subgroups
-    dates = [dates[i] for i in np.arange(0, len(x), sgSize)]
-    if len(sg[- 1]) < sgSize:
-        sg = sg[0:- 1]
-        dates = dates[0:-1]
-    xbar = [np.mean(sg[i]) for i in np.arange(len(sg))]  # mean of subgroup
-    xbar = np.array(xbar)
+    x = np.asarray(x, dtype=float)
+    nsg = len(x) // sgSize  # incomplete trailing subgroups are discarded
+    sg = x[:nsg * sgSize].reshape(nsg, sgSize)  # subgroups
+    dates = list(dates[0:nsg * sgSize:sgSize])
+    xbar = sg.mean(axis=1)  # mean of subgroup
 
     if isinstance(dates[0], datetime.date):
         sgNum = dates
@@ -420,11 +476,9 @@ def get_ranges(sg, n):
 
     r = np.zeros(len(sg))
     if n == 1:
-        for i in np.arange(1, len(sg)):
-            r[i] = np.abs(sg[i] - sg[i - 1])
+        r[1:] = np.abs(np.diff(sg[:, 0]))
     else:
-        for i in np.arange(0, len(sg)):
-            r[i] = np.max(sg[i]) - np.min(sg[i])
+        r = sg.max(axis=1) - sg.min(axis=1)
 
     return r
 
@@ -0,0 +1,288 @@
+"""
+Streaming export of TestInstance data.
+
+Rows are read from the database with ``values_list().iterator()`` and written
+incrementally so that memory use is bounded no matter how many test instances
+are being exported.  NDJSON & CSV are always available, Apache Arrow (IPC
+stream) and Parquet output require the optional ``pyarrow`` package.
+"""
+
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from qatrack.qa import models
+from qatrack.qatrack_core.dates import end_of_day, parse_date, parse_datetime
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: nocover
+    pyarrow = None
+
+# (column name, lookup, arrow type name)
+COLUMNS = [
+    ("id", "id", "int64"),
+    ("unit_number", "unit_test_info__unit__number", "int64"),
+    ("unit", "unit_test_info__unit__name", "string"),
+    ("test_list_instance_id", "test_list_instance_id", "int64"),
+    ("test_list", "test_list_instance__test_list__name", "string"),
+    ("test_id", "unit_test_info__test_id", "int64"),
+    ("test", "unit_test_info__test__name", "string"),
+    ("test_slug", "unit_test_info__test__slug", "string"),
+    ("test_type", "unit_test_info__test__type", "string"),
+    ("work_started", "work_started", "timestamp"),
+    ("work_completed", "work_completed", "timestamp"),
+    ("value", "value", "float64"),
+    ("string_value", "string_value", "string"),
+    ("date_value", "date_value", "date"),
+    ("datetime_value", "datetime_value", "timestamp"),
+    ("skipped", "skipped", "bool"),
+    ("pass_fail", "pass_fail", "string"),
+    ("status", "status__name", "string"),
+    ("reference_type", "reference__type", "string"),
+    ("reference", "reference__value", "float64"),
+    ("tolerance_type", "tolerance__type", "string"),
+    ("act_low", "tolerance__act_low", "float64"),
+    ("tol_low", "tolerance__tol_low", "float64"),
+    ("tol_high", "tolerance__tol_high", "float64"),
+    ("act_high", "tolerance__act_high", "float64"),
+    ("mc_pass_choices", "tolerance__mc_pass_choices", "string"),
+    ("mc_tol_choices", "tolerance__mc_tol_choices", "string"),
+    ("comment", "comment", "string"),
+    ("created_by", "created_by__username", "string"),
+]
+
+COLUMN_NAMES = [c[0] for c in COLUMNS]
+
+NDJSON = "ndjson"
+CSV = "csv"
+ARROW = "arrow"
+PARQUET = "parquet"
+
+FORMATS = [NDJSON, CSV, ARROW, PARQUET]
+BINARY_FORMATS = [ARROW, PARQUET]
+
+CONTENT_TYPES = {
+    NDJSON: "application/x-ndjson",
+    CSV: "text/csv",
+    ARROW: "application/vnd.apache.arrow.stream",
+    PARQUET: "application/vnd.apache.parquet",
+}
+
+EXTENSIONS = {
+    NDJSON: "ndjson",
+    CSV: "csv",
+    ARROW: "arrows",
+    PARQUET: "parquet",
+}
+
+# number of rows fetched from the database at a time
+CHUNK_SIZE = 2000
+
+# number of rows per Arrow record batch / Parquet row group
+BATCH_SIZE = 50000
+
+
+class ExportError(Exception):
+    """Raised when an export can not be performed"""
+
+
+def export_queryset(units=None, tests=None, statuses=None, start=None, end=None):
+    """Return a queryset of the TestInstances to export ordered by work_completed.
+    units, tests & statuses are lists of primary keys and start & end limit
+    the work_completed dates"""
+
+    qs = models.TestInstance.objects.all()
+    if units:
+        qs = qs.filter(unit_test_info__unit_id__in=units)
+    if tests:
+        qs = qs.filter(unit_test_info__test_id__in=tests)
+    if statuses:
+        qs = qs.filter(status_id__in=statuses)
+    if start:
+        qs = qs.filter(work_completed__gte=start)
+    if end:
+        qs = qs.filter(work_completed__lte=end)
+    return qs.order_by("work_completed", "id")
+
+
+def parse_ids(values, name):
+    """Convert a list of (possibly comma separated) id strings to a list of ints"""
+
+    try:
+        return [int(v) for value in values or [] for v in str(value).split(",") if v.strip()]
+    except ValueError:
+        raise ExportError(_("%(name)s must be a list of integer ids") % {'name': name})
+
+
+def parse_date_arg(value, name, end=False):
+    """Convert a date or datetime string to an aware datetime.  Dates are
+    converted to the start of the day (or end of the day when end=True)"""
+
+    if not value:
+        return None
+
+    # DATETIME_INPUT_FORMATS includes a bare date format so dates must be
+    # checked for first
+    dt = parse_date(value, as_date=False)
+    if dt is None:
+        dt = parse_datetime(value)
+    elif end:
+        dt = end_of_day(timezone.make_aware(dt))
+
+    if dt is None:
+        raise ExportError(_("Invalid date for %(name)s: %(value)s") % {'name': name, 'value': value})
+
+    return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+
+
+def export_queryset_from_args(units=None, tests=None, statuses=None, start=None, end=None):
+    """Return export_queryset for unparsed id lists and start & end date strings"""
+
+    return export_queryset(
+        units=parse_ids(units, "unit"),
+        tests=parse_ids(tests, "test"),
+        statuses=parse_ids(statuses, "status"),
+        start=parse_date_arg(start, "start"),
+        end=parse_date_arg(end, "end", end=True),
+    )
+
+
+def rows(queryset):
+    """Iterate over the export columns for all test instances in queryset
+    without loading them all into memory"""
+    return queryset.values_list(*[c[1] for c in COLUMNS]).iterator(chunk_size=CHUNK_SIZE)
+
+
+def batched(iterable, size):
+    batch = []
+    for row in iterable:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Buffer:
+    """File like object which collects written data so that it can be
+    streamed in chunks"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(bytes(c) for c in self.chunks)
+        self.chunks = []
+        return data
+
+
+def ndjson_chunks(rows):
+    for batch in batched(rows, CHUNK_SIZE):
+        yield "".join(
+            json.dumps(dict(zip(COLUMN_NAMES, row)), cls=DjangoJSONEncoder) + "\n" for row in batch
+        )
+
+
+def csv_chunks(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMN_NAMES)
+    for batch in batched(rows, CHUNK_SIZE):
+        writer.writerows(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    data = buf.getvalue()
+    if data:
+        yield data
+
+
+def arrow_schema():
+    types = {
+        "int64": pyarrow.int64(),
+        "float64": pyarrow.float64(),
+        "string": pyarrow.string(),
+        "bool": pyarrow.bool_(),
+        "date": pyarrow.date32(),
+        "timestamp": pyarrow.timestamp("us", tz="UTC"),
+    }
+    return pyarrow.schema([(name, types[type_]) for name, __, type_ in COLUMNS])
+
+
+def record_batch(schema, batch):
+    columns = zip(*batch)
+    arrays = [pyarrow.array(col, type=field.type) for col, field in zip(columns, schema)]
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def check_pyarrow(file_format):
+    if pyarrow is None:
+        raise ExportError(_("The pyarrow package must be installed to export data in %(format)s format") % {
+            'format': file_format,
+        })
+
+
+def arrow_chunks(rows, file_format=ARROW):
+
+    check_pyarrow(file_format)
+
+    schema = arrow_schema()
+    sink = _Buffer()
+    if file_format == PARQUET:
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    for batch in batched(rows, BATCH_SIZE):
+        rb = record_batch(schema, batch)
+        if file_format == PARQUET:
+            writer.write_table(pyarrow.Table.from_batches([rb]))
+        else:
+            writer.write_batch(rb)
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def export_chunks(queryset, file_format):
+    """Return an iterator of str (NDJSON/CSV) or bytes (Arrow/Parquet) chunks
+    of the export of queryset in file_format"""
+
+    if file_format not in FORMATS:
+        raise ExportError(_("Unknown export format %(format)s. Valid formats are: %(formats)s") % {
+            'format': file_format,
+            'formats': ', '.join(FORMATS),
+        })
+
+    if file_format in BINARY_FORMATS:
+        # check here so the error is raised before streaming starts
+        check_pyarrow(file_format)
+        return arrow_chunks(rows(queryset), file_format)
+    elif file_format == CSV:
+        return csv_chunks(rows(queryset))
+    return ndjson_chunks(rows(queryset))
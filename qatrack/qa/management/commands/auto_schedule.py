@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
+
 from qatrack.qa.models import UnitTestCollection
+from qatrack.qatrack_core.scheduling import bulk_set_due_dates
 
 
 class Command(BaseCommand):
@@ -36,8 +38,7 @@ class Command(BaseCommand):
     def schedule_all(self):
         """Sets due date for all UnitTestCollections with assigned frequencies"""
         utcs = UnitTestCollection.objects.exclude(frequency=None)
-        for utc in utcs:
-            utc.set_due_date()
+        bulk_set_due_dates(utcs)
 
         self.stdout.write("Successfully set all due dates")
 
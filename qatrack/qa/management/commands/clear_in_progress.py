@@ -1,5 +1,3 @@
-from django.conf import settings
-from django.core.cache import cache
 from django.core.management.base import BaseCommand
 
 from qatrack.qa.models import TestListInstance
@@ -27,5 +25,4 @@ class Command(BaseCommand):
             return
 
         objs.delete()
-        cache.delete(settings.CACHE_IN_PROGRESS_COUNT_USER)
         print("Deleted %d In Progress TestListInstances" % counts)
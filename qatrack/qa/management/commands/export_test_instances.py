@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from qatrack.qa import export
+
+
+class Command(BaseCommand):
+    """A management command to export test instance data in NDJSON, CSV,
+    Arrow or Parquet format"""
+
+    help = 'export test instance data (streamed so any number of test instances can be exported)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=export.FORMATS,
+            default=export.CSV,
+            help="Output format (arrow & parquet require the pyarrow package)",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            dest="output",
+            help="File to write to (required for arrow & parquet output, otherwise defaults to stdout)",
+        )
+        parser.add_argument("--unit", dest="units", action="append", help="Unit id(s) to include")
+        parser.add_argument("--test", dest="tests", action="append", help="Test id(s) to include")
+        parser.add_argument("--status", dest="statuses", action="append", help="Status id(s) to include")
+        parser.add_argument("--start", dest="start", help="Include test instances completed on or after this date")
+        parser.add_argument("--end", dest="end", help="Include test instances completed on or before this date")
+
+    def handle(self, *args, **kwargs):
+
+        file_format = kwargs['file_format']
+        output = kwargs['output']
+        binary = file_format in export.BINARY_FORMATS
+
+        if binary and not output:
+            raise CommandError("--output is required for %s exports" % file_format)
+
+        try:
+            qs = export.export_queryset_from_args(
+                units=kwargs['units'],
+                tests=kwargs['tests'],
+                statuses=kwargs['statuses'],
+                start=kwargs['start'],
+                end=kwargs['end'],
+            )
+            chunks = export.export_chunks(qs, file_format)
+        except export.ExportError as e:
+            raise CommandError(str(e))
+
+        if not output:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        mode, encoding = ("wb", None) if binary else ("w", "utf-8")
+        with open(output, mode, encoding=encoding, newline=None if binary else "") as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+        self.stdout.write("Exported test instances to %s" % output)
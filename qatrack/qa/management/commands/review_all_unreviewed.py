@@ -85,6 +85,7 @@ class Command(BaseCommand):
                 review_date=review_time,
                 reviewed_by=user,
             )
+            tli.update_summary_counts()
 
             # Handle Service Log items:
             #    Log changes to this test_list_instance review status if linked to service_events via rtsqa.
@@ -94,8 +95,6 @@ class Command(BaseCommand):
             # Set utc due dates
             tli.unit_test_collection.set_due_date()
 
-        cache.delete(settings.CACHE_UNREVIEWED_COUNT)
-        cache.delete(settings.CACHE_UNREVIEWED_COUNT_USER)
         cache.delete(settings.CACHE_SE_NEEDING_REVIEW_COUNT)
 
         print("%s TestListInstances updated with status=%s by user=%s" % (counts, status, user.username))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from qatrack.qa.models import TestListInstance
+
+
+class Command(BaseCommand):
+    """A management command to calculate the stored pass/fail, review status
+    and comment counts for TestListInstances"""
+
+    help = 'calculate stored pass/fail, review status & comment counts for test list instances'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="all",
+            default=False,
+            help="Recalculate counts for all test list instances rather than only those missing counts",
+        )
+
+    def handle(self, *args, **kwargs):
+
+        tlis = TestListInstance.objects.order_by("pk")
+        if not kwargs['all']:
+            tlis = tlis.filter(Q(pass_fail_counts=None) | Q(review_status_counts=None) | Q(comment_count=None))
+
+        total = tlis.count()
+        if total <= 0:
+            self.stdout.write("No test list instances require updating")
+            return
+
+        for n, tli in enumerate(tlis.only("pk").iterator(), start=1):
+            tli.update_summary_counts()
+            if n % 1000 == 0:
+                self.stdout.write("Updated %d of %d test list instances" % (n, total))
+
+        self.stdout.write("Successfully updated counts for %d test list instances" % total)
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.18 on 2021-04-06 14:02
+
+from django.db import migrations, models
+import qatrack.qatrack_core.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa', '0058_testlistinstance_user_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testlistinstance',
+            name='comment_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Number of test instance and test list instance comments', null=True),
+        ),
+        migrations.AddField(
+            model_name='testlistinstance',
+            name='pass_fail_counts',
+            field=qatrack.qatrack_core.fields.JSONField(blank=True, editable=False, help_text='Number of test instances in each pass/fail state', null=True),
+        ),
+        migrations.AddField(
+            model_name='testlistinstance',
+            name='review_status_counts',
+            field=qatrack.qatrack_core.fields.JSONField(blank=True, editable=False, help_text='Number of test instances with each review status', null=True),
+        ),
+    ]
@@ -1,4 +1,7 @@
 import re
+import time
+import uuid
+import zlib
 
 import black
 from django.apps import apps
@@ -9,13 +12,15 @@ from django.contrib.contenttypes.fields import (
     GenericRelation,
 )
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import BaseCache
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
-from django.db.models import Count, Q, QuerySet
+from django.db.models import Count, Max, Q, QuerySet
+from django.dispatch import Signal
 from django.urls import reverse
-from django.utils import timezone
+from django.utils import timezone, translation
 from django.utils.translation import gettext as _
 from django.utils.translation import gettext_lazy as _l
 from django_comments.models import Comment
@@ -31,6 +36,10 @@ from qatrack.qatrack_core.fields import JSONField
 from qatrack.qatrack_core.scheduling import RecurrenceFieldMixin, SchedulingMixin
 from qatrack.units.models import Unit
 
+# sent after a test list instances stored pass/fail, review status & comment
+# counts are recalculated (i.e. after it is reviewed or commented on)
+summary_counts_updated = Signal(providing_args=["instance"])
+
 # All available test types
 BOOLEAN = "boolean"
 NUMERICAL = "numerical"
@@ -345,6 +354,159 @@ def autoreviewruleset_cache(rule_id):
     return cache_val[rule_id]
 
 
+def test_list_dependencies_cache_key(test_list_id, defaults=False):
+    """Return cache key for the composite dependency graph of a test list"""
+    return settings.CACHE_TEST_LIST_DEPENDENCIES_.format(test_list_id, "defaults" if defaults else "composites")
+
+
+def clear_test_list_dependencies_cache(test_list_ids):
+    """Remove cached composite dependency graphs for input test lists and any
+    test lists that include them as a sublist"""
+
+    test_list_ids = set(test_list_ids)
+    test_list_ids |= set(Sublist.objects.filter(child_id__in=test_list_ids).values_list("parent_id", flat=True))
+    keys = [test_list_dependencies_cache_key(pk, defaults) for pk in test_list_ids for defaults in [False, True]]
+    cache.delete_many(keys)
+
+
+def count_cache_key(key, *ids):
+    """
+    Return the cache key for a cached count in the current reconciliation
+    period.  Keys roll over every COUNT_CACHE_RECONCILE_INTERVAL seconds so
+    that any drift in incrementally updated counts is periodically corrected
+    by recalculating them from the database.  Each key's periods are offset
+    so that all users counts don't need recalculating at the same moment.
+    """
+    interval = settings.COUNT_CACHE_RECONCILE_INTERVAL
+    if not interval:
+        return key.format(*(ids + (0,)))
+
+    offset = zlib.crc32(key.format(*(ids + ("",))).encode()) % interval
+    period = int((time.time() + offset) // interval)
+    return key.format(*(ids + (period,)))
+
+
+def get_cached_count(key, calculate, *ids):
+    """Return count for key from the cache, calculating and caching it if required"""
+
+    key = count_cache_key(key, *ids)
+    count = cache.get(key)
+    if count is None:
+        count = calculate()
+        interval = settings.COUNT_CACHE_RECONCILE_INTERVAL
+        # add rather than set so we don't clobber a count that was
+        # incremented while we were calculating it
+        cache.add(key, count, 2 * interval if interval else settings.MAX_CACHE_TIMEOUT)
+    return count
+
+
+def atomic_cache_incr():
+    """Return True if the default cache backend increments values atomically
+    (e.g. memcached or local memory).  Backends which don't implement incr
+    themselves (e.g. the database & file based caches) fall back to a non
+    atomic get followed by a set."""
+    return type(caches['default']).incr is not BaseCache.incr
+
+
+def incr_cached_counts(keys, delta):
+    """Atomically adjust the counts for any of the input keys that are
+    currently cached.  If the cache backend can't increment atomically,
+    concurrent updates could be lost so the counts are removed instead and
+    will be recalculated when next requested."""
+
+    if not atomic_cache_incr():
+        cache.delete_many(keys)
+        return
+
+    for key in cache.get_many(keys):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # key expired since get_many
+            pass
+
+
+def clear_user_count_caches(user_ids):
+    """Remove the cached per user unreviewed & in progress counts for the input users"""
+
+    keys = []
+    for user_id in set(user_ids):
+        keys.append(count_cache_key(settings.CACHE_UNREVIEWED_COUNT_USER_, user_id))
+        keys.append(count_cache_key(settings.CACHE_IN_PROGRESS_COUNT_USER_, user_id))
+    cache.delete_many(keys)
+
+
+def clear_group_count_caches(group_ids):
+    """Remove the cached per user counts for all members of the input groups"""
+    clear_user_count_caches(User.objects.filter(groups__in=group_ids).values_list("pk", flat=True))
+
+
+def test_list_instance_count_state(tli):
+    """Return (in_progress, unreviewed) flags for the counts the input TestListInstance contributes to"""
+    return (tli.in_progress, not tli.in_progress and not tli.all_reviewed)
+
+
+def update_test_list_instance_counts(tli, old_state, new_state):
+    """
+    Incrementally adjust the cached unreviewed and in progress counts for a
+    :model:`qa.TestListInstance` moving from old_state to new_state (as
+    returned by test_list_instance_count_state, or None if the instance
+    didn't exist before / no longer exists).
+    """
+
+    old_in_progress, old_unreviewed = old_state or (False, False)
+    new_in_progress, new_unreviewed = new_state or (False, False)
+
+    d_in_progress = int(new_in_progress) - int(old_in_progress)
+    d_unreviewed = int(new_unreviewed) - int(old_unreviewed)
+    if not (d_in_progress or d_unreviewed):
+        return
+
+    user_ids = User.objects.filter(
+        groups__in=tli.unit_test_collection.visible_to.all(),
+    ).values_list("pk", flat=True).distinct()
+
+    if d_unreviewed:
+        incr_cached_counts([count_cache_key(settings.CACHE_UNREVIEWED_COUNT_)], d_unreviewed)
+        keys = [count_cache_key(settings.CACHE_UNREVIEWED_COUNT_USER_, uid) for uid in user_ids]
+        incr_cached_counts(keys, d_unreviewed)
+
+    if d_in_progress:
+        keys = [count_cache_key(settings.CACHE_IN_PROGRESS_COUNT_USER_, uid) for uid in user_ids]
+        incr_cached_counts(keys, d_in_progress)
+
+
+def clear_test_list_instance_counts(tli):
+    """Remove all cached counts that the input :model:`qa.TestListInstance` may contribute to"""
+    cache.delete(count_cache_key(settings.CACHE_UNREVIEWED_COUNT_))
+    clear_group_count_caches(tli.unit_test_collection.visible_to.all())
+
+
+def qc_overview_cache_key(group_ids=None):
+    """
+    Return cache key for the QC overview data. Keys include the current
+    overview version (see clear_qc_overview_cache), the local date (since due
+    statuses change daily), the active language and the users groups when the
+    overview is restricted to lists visible to the user.
+    """
+
+    version = cache.get(settings.CACHE_QC_OVERVIEW_VERSION)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(settings.CACHE_QC_OVERVIEW_VERSION, version, None):
+            version = cache.get(settings.CACHE_QC_OVERVIEW_VERSION, version)
+
+    groups = "all" if group_ids is None else "-".join(str(gid) for gid in sorted(group_ids))
+    today = timezone.localtime(timezone.now()).date().isoformat()
+
+    return settings.CACHE_QC_OVERVIEW_.format(version, today, translation.get_language(), groups)
+
+
+def clear_qc_overview_cache():
+    """Invalidate all cached QC overview data"""
+    cache.set(settings.CACHE_QC_OVERVIEW_VERSION, uuid.uuid4().hex, None)
+
+
 def set_active_unit_test_collections_for_unit_cache(unit: Unit) -> QuerySet:
     """Set the cached queryset for active unit test collections for a unit"""
     qs = UnitTestCollection.objects.filter(
@@ -1267,6 +1429,36 @@ def get_utc_tl_ids(active=None, units=None, frequencies=None, include_cycles=Tru
     return list(tls) + list(tls_from_tlcs)
 
 
+def test_instance_history_index(tlis):
+    """
+    Return a dictionary mapping (test_list_instance_id, unit_test_info_id)
+    to :model:`qa.TestInstance` for all the TestInstances belonging to the
+    input :model:`qa.TestListInstance`s.  All TestInstances are retrieved
+    with a single query rather than a prefetch per relation.
+    """
+
+    tlis_by_id = {tli.pk: tli for tli in tlis}
+
+    tis = TestInstance.objects.filter(
+        test_list_instance_id__in=list(tlis_by_id),
+    ).select_related(
+        "status",
+        "reference",
+        "tolerance",
+        "unit_test_info__test",
+        "unit_test_info__unit",
+        "created_by",
+    )
+
+    index = {}
+    for ti in tis:
+        # avoid a query per TestInstance when its test list instance is accessed
+        ti.test_list_instance = tlis_by_id[ti.test_list_instance_id]
+        index.setdefault((ti.test_list_instance_id, ti.unit_test_info_id), ti)
+
+    return index
+
+
 class UnitTestInfoManager(models.Manager):
 
     # def get_queryset(self):
@@ -1754,6 +1946,12 @@ class UnitTestCollection(SchedulingMixin, models.Model):
             ("can_review_non_visible_tli", _l("Can view tli and utc not visible to user's groups"))
         )
 
+    def set_due_date(self, due_date=None):
+        old_due_date = self.due_date
+        super().set_due_date(due_date=due_date)
+        if self.due_date != old_due_date:
+            clear_qc_overview_cache()
+
     def last_instance_for_scheduling(self):
         """ return last test_list_instance with all valid tests """
 
@@ -1765,6 +1963,25 @@ class UnitTestCollection(SchedulingMixin, models.Model):
         except TestListInstance.DoesNotExist:
             pass
 
+    @classmethod
+    def last_scheduling_dates(cls, pks):
+        """Return a dict mapping UnitTestCollection pk -> work_completed of its
+        last test list instance with all valid tests"""
+
+        return dict(
+            TestListInstance.objects.filter(
+                unit_test_collection_id__in=pks,
+                in_progress=False,
+                include_for_scheduling=True,
+            ).exclude(
+                testinstance__status__valid=False,
+            ).values_list("unit_test_collection_id").annotate(last=Max("work_completed")).order_by()
+        )
+
+    @classmethod
+    def due_dates_changed(cls, objs):
+        clear_qc_overview_cache()
+
     def last_done_date(self):
         """return date this test list was last performed"""
 
@@ -1795,29 +2012,19 @@ class UnitTestCollection(SchedulingMixin, models.Model):
         if before is not None:
             tlis = tlis.filter(work_completed__lt=before)
 
-        tlis = tlis.order_by(
-            "-work_completed"
-        ).prefetch_related(
-            "testinstance_set__status",
-            "testinstance_set__reference",
-            "testinstance_set__tolerance",
-            "testinstance_set__unit_test_info",
-            "testinstance_set__unit_test_info__unit",
-            "testinstance_set__unit_test_info__test",
-            "testinstance_set__created_by",
-        )[:settings.NHIST]
+        tlis = list(tlis.order_by("-work_completed")[:settings.NHIST])
 
         dates = []
         for tli in tlis:
             dates.append((tli.get_absolute_url(), tli.work_completed))
 
+        history = test_instance_history_index(tlis)
+        uti_ids = {ti.unit_test_info.test_id: ti.unit_test_info_id for ti in history.values()}
+
         instances = []
         for test in self.tests_object.ordered_tests():
-            test_history = []
-            for tli in tlis:
-                match = [x for x in tli.testinstance_set.all() if x.unit_test_info.test == test]
-                test_history.append((tli, match[0]) if match else (tli, None))
-
+            uti_id = uti_ids.get(test.pk)
+            test_history = [(tli, history.get((tli.pk, uti_id))) for tli in tlis]
             instances.append((test, test_history))
 
         return instances, dates
@@ -2300,6 +2507,27 @@ class TestListInstance(models.Model):
 
     all_reviewed = models.BooleanField(default=False)
 
+    # denormalized summary counts so listings don't need to load every test
+    # instance (see update_summary_counts).  null means not yet calculated.
+    pass_fail_counts = JSONField(
+        editable=False,
+        null=True,
+        blank=True,
+        help_text=_l("Number of test instances in each pass/fail state"),
+    )
+    review_status_counts = JSONField(
+        editable=False,
+        null=True,
+        blank=True,
+        help_text=_l("Number of test instances with each review status"),
+    )
+    comment_count = models.PositiveIntegerField(
+        editable=False,
+        null=True,
+        blank=True,
+        help_text=_l("Number of test instance and test list instance comments"),
+    )
+
     day = models.IntegerField(default=0)
 
     # for keeping a very basic history
@@ -2341,7 +2569,37 @@ class TestListInstance(models.Model):
         return [x for x in statuses if len(x[2]) > 0]
 
     def pass_fail_summary(self):
-        return {status[0]: len(status[2]) for status in self.pass_fail_status()}
+        """return dictionary of form {pass_fail: count} for all pass fail states present in this instance"""
+        if self.pass_fail_counts is None:
+            return {status[0]: len(status[2]) for status in self.pass_fail_status()}
+        return {status: count for status, __, count in self.pass_fail_totals()}
+
+    def pass_fail_totals(self):
+        """return list of (pass_fail, display, count) for all pass fail states present in this instance"""
+        if self.pass_fail_counts is None:
+            return [(status, display, len(tis)) for status, display, tis in self.pass_fail_status()]
+
+        counts = self.pass_fail_counts
+        return [(status, display, counts[status]) for status, display in PASS_FAIL_CHOICES if counts.get(status)]
+
+    def update_summary_counts(self):
+        """Recalculate the stored pass/fail, review status & comment counts for this instance"""
+
+        tis = TestInstance.objects.filter(test_list_instance_id=self.pk).order_by()
+
+        self.pass_fail_counts = dict(tis.values_list("pass_fail").annotate(Count("id")))
+        self.review_status_counts = {
+            str(status_id): count for status_id, count in tis.values_list("status_id").annotate(Count("id"))
+        }
+        self.comment_count = tis.exclude(comment='').exclude(comment=None).count() + self.comments.count()
+
+        # use update instead of save so we don't trigger save signal
+        TestListInstance.objects.filter(pk=self.pk).update(
+            pass_fail_counts=self.pass_fail_counts,
+            review_status_counts=self.review_status_counts,
+            comment_count=self.comment_count,
+        )
+        summary_counts_updated.send(sender=TestListInstance, instance=self)
 
     def duration(self):
         """return timedelta of time from start to completion"""
@@ -2355,10 +2613,37 @@ class TestListInstance(models.Model):
         statuses = [(status, [x for x in queryset if x.status == status]) for status in status_types]
         return [x for x in statuses if len(x[1]) > 0]
 
+    def review_status_totals(self, statuses=None):
+        """
+        return list of (status, count) for all review statuses present in this
+        instance. statuses is an optional dictionary of {pk: TestInstanceStatus}.
+        """
+
+        if self.review_status_counts is None:
+            return [(status, len(tis)) for status, tis in self.status()]
+
+        if statuses is None:
+            statuses = TestInstanceStatus.objects.in_bulk(list(map(int, self.review_status_counts)))
+
+        return [(statuses[int(pk)], count) for pk, count in self.review_status_counts.items() if int(pk) in statuses]
+
     def review_summary(self, queryset=None):
+        if queryset is None and self.review_status_counts is not None and self.comment_count is not None:
+            to_return = {
+                status.slug: {
+                    'num': count,
+                    'valid': status.valid,
+                    'reqs_review': status.requires_review,
+                    'default': status.is_default,
+                    'colour': status.colour
+                } for status, count in self.review_status_totals()
+            }
+            to_return['Comments'] = {'num': self.comment_count, 'is_comments': 1}
+            return to_return
+
         if queryset is None:
             queryset = self.testinstance_set.prefetch_related('status').all()
-        comment_count = queryset.exclude(comment='').count() + self.comments.count()
+        comment_count = queryset.exclude(comment='').exclude(comment=None).count() + self.comments.count()
 
         to_return = {
             status[0].slug: {
@@ -2381,6 +2666,8 @@ class TestListInstance(models.Model):
 
         # use update instead of save so we don't trigger save signal
         TestListInstance.objects.filter(pk=self.pk).update(all_reviewed=self.all_reviewed)
+        self.update_counts()
+        self.update_summary_counts()
 
         return self.update_service_event_statuses()
 
@@ -2395,6 +2682,26 @@ class TestListInstance(models.Model):
 
         return changed_se
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "in_progress" in field_names and "all_reviewed" in field_names:
+            # remember which cached counts this instance contributes to so
+            # they can be adjusted incrementally when it changes
+            instance._count_state = test_list_instance_count_state(instance)
+        return instance
+
+    def update_counts(self, deleted=False):
+        """Adjust cached unreviewed & in progress counts after this instance was saved or deleted"""
+
+        new_state = None if deleted else test_list_instance_count_state(self)
+        if hasattr(self, "_count_state"):
+            update_test_list_instance_counts(self, self._count_state, new_state)
+        else:
+            # previous state unknown, so counts have to be recalculated
+            clear_test_list_instance_counts(self)
+        self._count_state = new_state
+
     def tolerance_tests(self):
         return self.testinstance_set.filter(pass_fail=TOLERANCE)
 
@@ -2403,7 +2710,7 @@ class TestListInstance(models.Model):
 
     def history(self):
         # note when using, your view should likely prefetch and select related
-        # as follows
+        # as follows (history of previous instances is retrieved separately)
         # prefetch_related = [
         #     "testinstance_set__unit_test_info__test",
         #     "testinstance_set__reference",
@@ -2422,35 +2729,21 @@ class TestListInstance(models.Model):
                 work_completed__lt=self.work_completed,
             )
 
-        tlis = tlis.order_by(
-            "-work_completed"
-        ).prefetch_related(
-            "testinstance_set__status",
-            "testinstance_set__reference",
-            "testinstance_set__tolerance",
-            "testinstance_set__unit_test_info__test",
-            "testinstance_set__unit_test_info__unit",
-            "testinstance_set__created_by",
-            "testinstance_set__test_list_instance"
-        )[:settings.NHIST]
+        tlis = list(tlis.order_by("-work_completed")[:settings.NHIST])
 
         dates = []
         for tli in tlis:
             dates.append((tli.get_absolute_url(), tli.work_completed))
 
+        history = test_instance_history_index(tlis)
+
         instances = []
         # note sort  here rather than using self.testinstance_set.order_by(("order", "created")
         # because that causes Django to requery db and negates the advantage of using
-        # prefetch_related above
+        # prefetch_related in the view
         test_instances = sorted(self.testinstance_set.all(), key=lambda x: (x.order, x.created))
         for ti in test_instances:
-
-            test_history = []
-            for tli in tlis:
-                q = tli.testinstance_set.all()
-                match = [x for x in q if x.unit_test_info_id == ti.unit_test_info_id]
-                test_history.append((tli, match[0]) if match else (tli, None))
-
+            test_history = [(tli, history.get((tli.pk, ti.unit_test_info_id))) for tli in tlis]
             instances.append((ti, test_history))
 
         return instances, dates
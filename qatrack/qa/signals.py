@@ -1,3 +1,6 @@
+from contextlib import contextmanager
+import threading
+
 from django.core.exceptions import ValidationError
 from django.db.models import Q
 from django.db.models.signals import (
@@ -12,9 +15,11 @@ from django.utils import timezone
 from django_comments.models import Comment
 from django_comments.signals import comment_was_posted
 
+from qatrack.qatrack_core.scheduling import bulk_set_due_dates
 from qatrack.service_log import models as sl_models
+from qatrack.units.models import Unit
 
-from . import models
+from . import models, utils
 
 
 def loaded_from_fixture(kwargs):
@@ -23,8 +28,10 @@ def loaded_from_fixture(kwargs):
 
 testlist_complete = Signal(providing_args=["instance", "created"])
 
+_deferred = threading.local()
+
 
-def update_last_instances(test_list_instance):
+def update_last_instances(test_list_instance, set_due_date=True):
     utc = test_list_instance.unit_test_collection
     try:
         last_instance = models.TestListInstance.objects.complete().filter(
@@ -39,12 +46,37 @@ def update_last_instances(test_list_instance):
         return
 
     utc.last_instance = last_instance
-    due_date = utc.calc_due_date()
+    updates = {'last_instance': last_instance}
+    if set_due_date:
+        updates['due_date'] = utc.calc_due_date()
 
-    models.UnitTestCollection.objects.filter(pk=utc.pk).update(
-        due_date=due_date,
-        last_instance=last_instance,
-    )
+    models.UnitTestCollection.objects.filter(pk=utc.pk).update(**updates)
+    models.clear_qc_overview_cache()
+
+
+@contextmanager
+def defer_last_instance_updates():
+    """Within this block, saving a test list instance doesn't update its unit
+    test collection's last instance & due date. Instead last instances are
+    updated once per unit test collection when the block exits and then all
+    of their due dates are calculated together with bulk_set_due_dates."""
+
+    if getattr(_deferred, "tlis", None) is not None:
+        # already deferring
+        yield
+        return
+
+    _deferred.tlis = {}
+    try:
+        yield
+    finally:
+        pending, _deferred.tlis = _deferred.tlis, None
+
+    for tli in pending.values():
+        update_last_instances(tli, set_due_date=False)
+
+    if pending:
+        bulk_set_due_dates(models.UnitTestCollection.objects.filter(pk__in=list(pending)))
 
 
 def handle_se_statuses_post_tli_delete(test_list_instance):
@@ -185,6 +217,32 @@ def on_test_save(*args, **kwargs):
                     "%s with a non-boolean reference" % (test.type, ua.unit.name))
 
 
+@receiver(post_save, sender=models.Test)
+@receiver(post_delete, sender=models.Test)
+def on_test_saved(*args, **kwargs):
+    """Remove any stale compiled calculation procedures and dependency graphs
+    for this test"""
+    test = kwargs["instance"]
+    utils.clear_compiled_procedures(test.pk)
+    models.clear_test_list_dependencies_cache(
+        models.TestListMembership.objects.filter(test=test).values_list("test_list_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=models.TestListMembership)
+@receiver(post_delete, sender=models.TestListMembership)
+def on_test_list_membership_changed(*args, **kwargs):
+    """Test list membership changed so composite dependencies need to be recalculated"""
+    models.clear_test_list_dependencies_cache([kwargs["instance"].test_list_id])
+
+
+@receiver(post_save, sender=models.Sublist)
+@receiver(post_delete, sender=models.Sublist)
+def on_sublist_changed(*args, **kwargs):
+    """Sublist membership changed so composite dependencies need to be recalculated"""
+    models.clear_test_list_dependencies_cache([kwargs["instance"].parent_id])
+
+
 @receiver(testlist_complete)
 def check_tli_flag(*args, **kwargs):
     """Flag this test list instance if required"""
@@ -201,8 +259,15 @@ def check_tli_flag(*args, **kwargs):
 def on_test_list_instance_saved(*args, **kwargs):
     """set last instance for UnitTestInfo"""
 
-    if not loaded_from_fixture(kwargs):
-        update_last_instances(kwargs["instance"])
+    if loaded_from_fixture(kwargs):
+        return
+
+    tli = kwargs["instance"]
+    pending = getattr(_deferred, "tlis", None)
+    if pending is not None:
+        pending[tli.unit_test_collection_id] = tli
+    else:
+        update_last_instances(tli)
 
 
 @receiver(pre_delete, sender=models.TestListInstance)
@@ -263,6 +328,32 @@ def test_list_added_to_cycle(*args, **kwargs):
         update_unit_test_infos(kwargs["instance"].test_list)
 
 
+@receiver(post_save, sender=models.UnitTestCollection)
+@receiver(post_delete, sender=models.UnitTestCollection)
+@receiver(post_save, sender=models.Frequency)
+@receiver(post_delete, sender=models.Frequency)
+@receiver(post_save, sender=Unit)
+@receiver(post_delete, sender=Unit)
+@receiver(m2m_changed, sender=models.UnitTestCollection.visible_to.through)
+def on_overview_object_changed(*args, **kwargs):
+    """Assignment, frequency or unit changed so QC overview needs to be regenerated"""
+    models.clear_qc_overview_cache()
+
+
+@receiver(post_save, sender=models.Frequency)
+def on_frequency_saved(*args, **kwargs):
+    """Recalculate due dates of everything assigned to a frequency when it is
+    edited (e.g. its recurrence rules, excluded dates or window changed)"""
+
+    if loaded_from_fixture(kwargs) or kwargs["created"]:
+        return
+
+    frequency = kwargs["instance"]
+    utcs = models.UnitTestCollection.objects.filter(frequency=frequency, auto_schedule=True)
+    schedules = sl_models.ServiceEventSchedule.objects.filter(frequency=frequency, auto_schedule=True)
+    bulk_set_due_dates(list(utcs) + list(schedules))
+
+
 @receiver(post_save, sender=models.AutoReviewRule)
 @receiver(post_save, sender=models.AutoReviewRuleSet)
 @receiver(post_save, sender=models.TestInstanceStatus)
@@ -276,6 +367,20 @@ def on_autoreviewrule_save(*args, **kwargs):
         models.update_autoreviewruleset_cache()
 
 
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def on_comment_changed(*args, **kwargs):
+    """Update stored comment count of the test list instance a comment belongs to"""
+
+    comment = kwargs["instance"]
+    if loaded_from_fixture(kwargs) or comment.content_type.model_class() is not models.TestListInstance:
+        return
+
+    tli = models.TestListInstance.objects.filter(pk=comment.object_pk).first()
+    if tli is not None:
+        tli.update_summary_counts()
+
+
 @receiver(comment_was_posted, sender=Comment)
 def check_approved_statuses(*args, **kwargs):
 
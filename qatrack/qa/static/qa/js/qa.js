@@ -81,6 +81,10 @@ require(['jquery', 'lodash', 'moment', 'dropzone', 'autosize', 'cheekycheck', 'i
     var composite_update_required = false;
     var latest_autosave_call = null;
 
+    // inputs used for the last successful composite calculation so that
+    // only composites affected by changed values need to be recalculated
+    var last_composite_inputs = null;
+
     /***************************************************************/
     //minimal Pub/Sub functionality
     var topics = {};
@@ -943,6 +947,27 @@ require(['jquery', 'lodash', 'moment', 'dropzone', 'autosize', 'cheekycheck', 'i
                 skips: skips
             };
 
+            var inputs = _.cloneDeep({tests: qa_values, meta: meta, comments: comments, skips: skips});
+            var partial = (
+                !opts.set_defaults &&
+                !_.isNull(last_composite_inputs) &&
+                _.isEqual(last_composite_inputs.meta, meta) &&
+                _.isEqual(last_composite_inputs.comments, comments) &&
+                _.isEqual(last_composite_inputs.skips, skips)
+            );
+            if (partial){
+                // only simple test values have changed so send the current
+                // composite values along with the changed slugs and let the
+                // server recalculate only the affected composites
+                data.changed = _.filter(self.slugs, function(slug){
+                    return !_.isEqual(last_composite_inputs.tests[slug], qa_values[slug]);
+                });
+                data.tests = _.zipObject(self.slugs, _.map(self.test_instances, function(ti){
+                    return ti.value;
+                }));
+            }
+            last_composite_inputs = null;
+
             var on_success = function(data, status, XHR){
 
                 if (latest_composite_call !== null && latest_composite_call !== XHR){
@@ -950,6 +975,7 @@ require(['jquery', 'lodash', 'moment', 'dropzone', 'autosize', 'cheekycheck', 'i
                 }
 
                 if (data.success){
+                    last_composite_inputs = opts.set_defaults ? null : inputs;
                     _.each(data.results,function(result, name){
                         var ti = self.tests_by_slug[name];
                         if (!_.isNil(ti) && !ti.skipped){
@@ -0,0 +1,86 @@
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import time
+from unittest import mock
+
+from django.test import TestCase
+from django.test.utils import override_settings
+import pytest
+
+from qatrack.qa import calculation_pool
+
+
+def add(a, b):
+    return a + b
+
+
+def slow():
+    time.sleep(0.5)
+
+
+class TestCalculationPool(TestCase):
+
+    @override_settings(CALCULATION_POOL_SIZE=0)
+    def test_disabled_runs_in_process(self):
+        assert not calculation_pool.enabled()
+        assert calculation_pool.run(add, 1, 2) == 3
+
+    @override_settings(CALCULATION_POOL_SIZE=1)
+    def test_enabled(self):
+        assert calculation_pool.enabled()
+
+    @override_settings(CALCULATION_POOL_SIZE=1)
+    def test_run_in_pool(self):
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        with mock.patch.object(calculation_pool, "get_pool", return_value=pool):
+            assert calculation_pool.run(add, 1, 2) == 3
+        pool.shutdown()
+        assert calculation_pool.queue_depth() == 0
+
+    @override_settings(CALCULATION_POOL_SIZE=1, CALCULATION_POOL_TIMEOUT=0.01)
+    def test_timeout(self):
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        with mock.patch.object(calculation_pool, "get_pool", return_value=pool):
+            with pytest.raises(calculation_pool.CalculationTimeout):
+                calculation_pool.run(slow)
+        pool.shutdown()
+
+    @override_settings(CALCULATION_POOL_SIZE=2, CALCULATION_POOL_TIMEOUT=0.01)
+    def test_timeout_drains_pool(self):
+        """Other calculations in a pool are allowed to finish before the pool
+        with the timed out calculation is terminated"""
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        other = concurrent.futures.Future()
+        calculation_pool._futures[pool] = {other}
+        with mock.patch.object(calculation_pool, "get_pool", return_value=pool), \
+                mock.patch.object(calculation_pool, "_shutdown") as shutdown:
+            with pytest.raises(calculation_pool.CalculationTimeout):
+                calculation_pool.run(slow)
+            assert not shutdown.called
+            calculation_pool._release(pool, other)
+            shutdown.assert_called_once_with(pool, terminate=True)
+        assert pool not in calculation_pool._futures
+        pool.shutdown()
+
+    @override_settings(CALCULATION_POOL_SIZE=1)
+    def test_broken_pool_not_current(self):
+        """A broken pool that has already been replaced doesn't take the new pool down with it"""
+        broken = mock.Mock()
+        broken.submit.side_effect = BrokenProcessPool
+        current = mock.Mock()
+        with mock.patch.object(calculation_pool, "get_pool", return_value=broken), \
+                mock.patch.object(calculation_pool, "_pool", current):
+            with pytest.raises(calculation_pool.CalculationError):
+                calculation_pool.run(add, 1, 2)
+            assert calculation_pool._pool is current
+        broken.shutdown.assert_called_once_with(wait=False)
+        assert not current.shutdown.called
+
+    @override_settings(CALCULATION_POOL_SIZE=1)
+    def test_stale_connections_closed(self):
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        with mock.patch.object(calculation_pool, "get_pool", return_value=pool), \
+                mock.patch.object(calculation_pool, "close_old_connections") as close:
+            assert calculation_pool.run(add, 1, 2) == 3
+        pool.shutdown()
+        assert close.call_count == 2
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+import pytest
+
+from qatrack.qa import export
+from qatrack.qa.tests import utils
+
+
+class TestExport(TestCase):
+
+    def setUp(self):
+        self.tli = utils.create_test_list_instance()
+        self.status = utils.create_status()
+        now = timezone.now()
+        self.ti1 = utils.create_test_instance(self.tli, value=1, work_completed=now - timezone.timedelta(days=2))
+        self.ti2 = utils.create_test_instance(self.tli, value=2, work_completed=now)
+
+    def test_export_queryset_ordered(self):
+        assert list(export.export_queryset()) == [self.ti1, self.ti2]
+
+    def test_export_queryset_filter_test(self):
+        qs = export.export_queryset_from_args(tests=[str(self.ti2.unit_test_info.test_id)])
+        assert list(qs) == [self.ti2]
+
+    def test_export_queryset_filter_dates(self):
+        start = (timezone.localtime(timezone.now()) - timezone.timedelta(days=1)).strftime("%Y-%m-%d")
+        qs = export.export_queryset_from_args(start=start)
+        assert list(qs) == [self.ti2]
+
+    def test_export_queryset_filter_end_date(self):
+        end = timezone.localtime(timezone.now()).strftime("%Y-%m-%d")
+        qs = export.export_queryset_from_args(end=end)
+        assert list(qs) == [self.ti1, self.ti2]
+
+    def test_parse_end_date(self):
+        dt = export.parse_date_arg("2020-01-31", "end", end=True)
+        assert timezone.localtime(dt).date() == timezone.datetime(2020, 1, 31).date()
+        assert timezone.localtime(dt).hour == 23
+
+    def test_parse_end_datetime(self):
+        dt = export.parse_date_arg("2020-01-31 10:30", "end", end=True)
+        assert (timezone.localtime(dt).hour, timezone.localtime(dt).minute) == (10, 30)
+
+    def test_invalid_ids(self):
+        with pytest.raises(export.ExportError):
+            export.export_queryset_from_args(units=["foo"])
+
+    def test_invalid_date(self):
+        with pytest.raises(export.ExportError):
+            export.export_queryset_from_args(start="foo")
+
+    def test_invalid_format(self):
+        with pytest.raises(export.ExportError):
+            export.export_chunks(export.export_queryset(), "xls")
+
+    def test_csv(self):
+        data = "".join(export.export_chunks(export.export_queryset(), export.CSV))
+        rows = list(csv.reader(io.StringIO(data)))
+        assert rows[0] == export.COLUMN_NAMES
+        assert [r[0] for r in rows[1:]] == [str(self.ti1.pk), str(self.ti2.pk)]
+
+    def test_ndjson(self):
+        data = "".join(export.export_chunks(export.export_queryset(), export.NDJSON))
+        rows = [json.loads(line) for line in data.splitlines()]
+        assert [r['value'] for r in rows] == [1, 2]
+        assert rows[0]['test'] == self.ti1.unit_test_info.test.name
+
+    def test_command(self):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        try:
+            call_command("export_test_instances", "--output", path, stdout=io.StringIO())
+            with open(path) as f:
+                assert len(f.read().splitlines()) == 3
+        finally:
+            os.remove(path)
@@ -1,8 +1,11 @@
+import time
 from unittest import mock
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
 from django.test import TestCase
@@ -10,6 +13,8 @@ from django.utils import timezone
 from django_comments.models import Comment
 import pytest
 
+# connects the receivers which keep the cached counts up to date
+from qatrack import context_processors  # NOQA: F401
 from qatrack.qa import models
 from qatrack.qatrack_core import scheduling
 
@@ -1832,6 +1837,33 @@ class TestTestListInstance(TestCase):
         for stat, tests in self.test_list_instance.status():
             self.assertEqual(len(tests), 1)
 
+    def test_summary_counts(self):
+        tli = self.test_list_instance
+        assert tli.pass_fail_counts is None
+        models.TestInstance.objects.filter(pk=tli.testinstance_set.first().pk).update(comment="comment")
+
+        expected_totals = tli.pass_fail_totals()
+        expected_review = tli.review_summary()
+        tli.update_summary_counts()
+
+        tli = models.TestListInstance.objects.get(pk=tli.pk)
+        with self.assertNumQueries(0):
+            totals = tli.pass_fail_totals()
+        assert totals == expected_totals
+        assert tli.pass_fail_summary() == {status: count for status, __, count in expected_totals}
+        assert tli.review_summary() == expected_review
+        assert expected_review['Comments']['num'] == 1
+
+    def test_summary_counts_updated_on_review(self):
+        tli = self.test_list_instance
+        tli.update_all_reviewed()
+        review_status = utils.create_status(name="reviewed", slug="reviewed", is_default=False)
+        models.TestInstance.objects.filter(test_list_instance=tli).update(status=review_status)
+        tli.update_all_reviewed()
+
+        tli = models.TestListInstance.objects.get(pk=tli.pk)
+        assert tli.review_status_counts == {str(review_status.pk): len(self.values)}
+
     def test_unreviewed_instances(self):
 
         self.assertSetEqual(set(self.test_list_instance.unreviewed_instances()), set(models.TestInstance.objects.all()))
@@ -1877,6 +1909,24 @@ class TestTestListInstance(TestCase):
         utc = models.UnitTestCollection.objects.get(pk=self.unit_test_collection.pk)
         self.assertEqual(utc.last_instance, self.test_list_instance)
 
+    def test_history(self):
+        tli = self.create_test_list_instance(work_completed=timezone.now() + timezone.timedelta(days=1))
+        missing = self.test_list_instance.testinstance_set.get(unit_test_info__test=self.tests[-1])
+        missing.delete()
+
+        history, dates = tli.history()
+
+        assert dates == [(self.test_list_instance.get_absolute_url(), self.test_list_instance.work_completed)]
+        assert len(history) == len(self.tests)
+        for ti, test_history in history:
+            prev_tli, prev_ti = test_history[0]
+            assert prev_tli == self.test_list_instance
+            if ti.unit_test_info.test == self.tests[-1]:
+                assert prev_ti is None
+            else:
+                assert prev_ti.test_list_instance_id == prev_tli.pk
+                assert prev_ti.unit_test_info_id == ti.unit_test_info_id
+
 
 class TestAutoReview(TestCase):
 
@@ -2008,3 +2058,107 @@ class TestAutoReview(TestCase):
 
     def test_arrset_str(self):
         assert str(self.ruleset) == "default"
+
+
+class TestCountCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.group = utils.create_group()
+        self.user = utils.create_user()
+        self.user.groups.add(self.group)
+        self.utc = utils.create_unit_test_collection()
+
+    def user_count(self, key=settings.CACHE_UNREVIEWED_COUNT_USER_, method="your_unreviewed_count"):
+        return models.get_cached_count(
+            key,
+            lambda: getattr(models.TestListInstance.objects, method)(self.user),
+            self.user.pk,
+        )
+
+    def in_progress_count(self):
+        return self.user_count(settings.CACHE_IN_PROGRESS_COUNT_USER_, "your_in_progress_count")
+
+    @mock.patch.object(models, "atomic_cache_incr", return_value=True)
+    def test_incremented_on_complete(self, atomic):
+        assert self.user_count() == 0
+        utils.create_test_list_instance(unit_test_collection=self.utc)
+        with mock.patch.object(models.TestListInstance.objects, "your_unreviewed_count") as count:
+            assert self.user_count() == 1
+            assert not count.called
+
+    @mock.patch.object(models, "atomic_cache_incr", return_value=True)
+    def test_decremented_on_review(self, atomic):
+        tli = utils.create_test_list_instance(unit_test_collection=self.utc)
+        assert self.user_count() == 1
+
+        tli = models.TestListInstance.objects.get(pk=tli.pk)
+        tli.update_all_reviewed()
+        with mock.patch.object(models.TestListInstance.objects, "your_unreviewed_count") as count:
+            assert self.user_count() == 0
+            assert not count.called
+
+    @mock.patch.object(models, "atomic_cache_incr", return_value=False)
+    def test_recalculated_without_atomic_incr(self, atomic):
+        assert self.user_count() == 0
+        utils.create_test_list_instance(unit_test_collection=self.utc)
+        key = models.count_cache_key(settings.CACHE_UNREVIEWED_COUNT_USER_, self.user.pk)
+        assert cache.get(key) is None
+        assert self.user_count() == 1
+
+    def test_atomic_cache_incr(self):
+        with mock.patch.object(models, "caches", {'default': LocMemCache("test", {})}):
+            assert models.atomic_cache_incr()
+        with mock.patch.object(models, "caches", {'default': DatabaseCache("test", {})}):
+            assert not models.atomic_cache_incr()
+
+    def test_periods_offset(self):
+        interval = settings.COUNT_CACHE_RECONCILE_INTERVAL
+        with mock.patch("qatrack.qa.models.time.time", return_value=100.5 * interval):
+            keys = [models.count_cache_key(settings.CACHE_UNREVIEWED_COUNT_USER_, pk) for pk in range(20)]
+        # all keys would share a period without offsets
+        assert len({k.rsplit("-", 1)[1] for k in keys}) > 1
+
+    def test_decremented_on_delete(self):
+        tli = utils.create_test_list_instance(unit_test_collection=self.utc)
+        assert self.user_count() == 1
+        tli.delete()
+        assert self.user_count() == 0
+
+    def test_in_progress(self):
+        assert self.in_progress_count() == 0
+        assert self.user_count() == 0
+
+        tli = utils.create_test_list_instance(unit_test_collection=self.utc, in_progress=True)
+        assert self.in_progress_count() == 1
+        assert self.user_count() == 0
+
+        tli.in_progress = False
+        tli.save()
+        assert self.in_progress_count() == 0
+        assert self.user_count() == 1
+
+    def test_unknown_state_cleared(self):
+        tli = utils.create_test_list_instance(unit_test_collection=self.utc)
+        assert self.user_count() == 1
+
+        tli = models.TestListInstance.objects.only("pk", "unit_test_collection").get(pk=tli.pk)
+        tli.delete()
+        assert self.user_count() == 0
+
+    def test_group_membership_cleared(self):
+        self.user.groups.clear()
+        utils.create_test_list_instance(unit_test_collection=self.utc)
+        assert self.user_count() == 0
+
+        self.user.groups.add(self.group)
+        assert self.user_count() == 1
+
+    def test_reconciled(self):
+        assert self.user_count() == 0
+        key = models.count_cache_key(settings.CACHE_UNREVIEWED_COUNT_USER_, self.user.pk)
+        cache.set(key, 10)
+        assert self.user_count() == 10
+        next_period = time.time() + settings.COUNT_CACHE_RECONCILE_INTERVAL
+        with mock.patch("qatrack.qa.models.time.time", return_value=next_period):
+            assert self.user_count() == 0
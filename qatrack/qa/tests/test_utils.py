@@ -41,6 +41,43 @@ class TestUtils(TestCase):
         proc = "result = a + 2"
         self.assertListEqual(proc.split(), qautils.tokenize_composite_calc(proc))
 
+    def test_compile_procedure_cached(self):
+        code = qautils.compile_procedure(1, "result = 1", "__QAT+COMP_foo")
+        self.assertIs(code, qautils.compile_procedure(1, "result = 1", "__QAT+COMP_foo"))
+
+    def test_compile_procedure_changed(self):
+        code = qautils.compile_procedure(1, "result = 1", "__QAT+COMP_foo")
+        self.assertIsNot(code, qautils.compile_procedure(1, "result = 2", "__QAT+COMP_foo"))
+
+    def test_clear_compiled_procedures(self):
+        code = qautils.compile_procedure(1, "result = 1", "__QAT+COMP_foo")
+        qautils.clear_compiled_procedures(1)
+        self.assertIsNot(code, qautils.compile_procedure(1, "result = 1", "__QAT+COMP_foo"))
+
+    def test_test_save_clears_compiled_procedures(self):
+        test = utils.create_test(test_type=models.COMPOSITE)
+        test.calculation_procedure = "result = 1"
+        test.save()
+        code = qautils.compile_procedure(test.pk, test.calculation_procedure, "__QAT+COMP_foo")
+        test.save()
+        self.assertIsNot(code, qautils.compile_procedure(test.pk, test.calculation_procedure, "__QAT+COMP_foo"))
+
+    def test_composite_dependencies(self):
+        composites = {"c1": "result = a + b", "c2": "result = c1 * a"}
+        deps, all_deps = qautils.composite_dependencies(composites, ["a", "b", "c1", "c2"])
+        self.assertDictEqual(deps, {"c1": set(), "c2": {"c1"}})
+        self.assertDictEqual(all_deps, {"c1": {"a", "b"}, "c2": {"a", "c1"}})
+
+    def test_resolve_dependency_order(self):
+        order, cyclic = qautils.resolve_dependency_order({"c1": set(), "c2": {"c1"}, "c3": {"c2", "c1"}})
+        self.assertListEqual(order, ["c1", "c2", "c3"])
+        self.assertListEqual(cyclic, [])
+
+    def test_resolve_dependency_order_cyclic(self):
+        order, cyclic = qautils.resolve_dependency_order({"c1": set(), "c2": {"c3"}, "c3": {"c2"}})
+        self.assertListEqual(order, ["c1"])
+        self.assertSetEqual(set(cyclic), {"c2", "c3"})
+
     def test_set_encoder_set(self):
         self.assertIsInstance(json.dumps(set([1, 2]), cls=qautils.SetEncoder), str)
 
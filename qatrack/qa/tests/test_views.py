@@ -3,6 +3,7 @@ import glob
 import json
 import os
 import random
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth.models import Group, User
@@ -292,6 +293,87 @@ class TestControlImage(TestCase):
         self.assertTrue(response.get("content-type"), "image/png")
         qatrack.qa.control_chart.control_chart.display = old_display
 
+    def test_cached(self):
+        tl = utils.create_test_list()
+        test = utils.create_test()
+        utils.create_test_list_membership(tl, test)
+        unit = utils.create_unit()
+        utc = utils.create_unit_test_collection(test_collection=tl, unit=unit)
+        uti = models.UnitTestInfo.objects.get(test=test, unit=unit)
+        status = utils.create_status()
+
+        yesterday = timezone.now().date() - timezone.timedelta(days=1)
+        tomorrow = yesterday + timezone.timedelta(days=2)
+        url = self.make_url(test.pk, tl.pk, unit.pk, yesterday, tomorrow)
+
+        tli = utils.create_test_list_instance(unit_test_collection=utc)
+        for x in range(10):
+            utils.create_test_instance(tli, unit_test_info=uti, value=random.gauss(1, 0.5), status=status)
+
+        request = self.factory.get(url)
+        request.user = superuser
+        response = self.view(request)
+
+        with mock.patch("qatrack.qa.control_chart.control_chart.display") as display:
+            request = self.factory.get(url + "&timestamp=1234")
+            request.user = superuser
+            cached = self.view(request)
+            assert not display.called
+            assert cached.content == response.content
+
+            # new data invalidates cached image
+            utils.create_test_instance(tli, unit_test_info=uti, value=1, status=status)
+            request = self.factory.get(url)
+            request.user = superuser
+            self.view(request)
+            assert display.called
+
+
+class TestControlChartData(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.view = views.charts.ControlChartData.as_view()
+        self.url = reverse("control_chart_data")
+
+    def make_url(self, pk, tl_pk, upk, sg_size=2, n_base=2):
+        url = self.url + "?subgroup_size=%s&n_baseline_subgroups=%s" % (sg_size, n_base)
+        url += "&tests[]=%s" % pk
+        url += "&test_lists[]=%s" % tl_pk
+        url += "&units[]=%s" % upk
+        url += "&statuses[]=%s" % models.TestInstanceStatus.objects.all()[0].pk
+        return url
+
+    def test_not_enough_data(self):
+        request = self.factory.get(self.url)
+        request.user = superuser
+        response = self.view(request)
+        assert not json.loads(response.content.decode("UTF-8"))['success']
+
+    def test_valid(self):
+        tl = utils.create_test_list()
+        test = utils.create_test()
+        utils.create_test_list_membership(tl, test)
+        unit = utils.create_unit()
+        utc = utils.create_unit_test_collection(test_collection=tl, unit=unit)
+        uti = models.UnitTestInfo.objects.get(test=test, unit=unit)
+        status = utils.create_status()
+
+        tli = utils.create_test_list_instance(unit_test_collection=utc)
+        values = [1, 1.1, 0.9, 1, 1.05, 0.95, 1, 1, 5, 5]
+        for v in values:
+            utils.create_test_instance(tli, unit_test_info=uti, value=v, status=status)
+
+        request = self.factory.get(self.make_url(test.pk, tl.pk, unit.pk, sg_size=2, n_base=3))
+        request.user = superuser
+        response = self.view(request)
+        data = json.loads(response.content.decode("UTF-8"))
+
+        assert data['success']
+        assert data['n_points'] == len(values)
+        assert len(data['subgroup_means']) == len(values) // 2
+        assert data['out_of_control'] == [4]
+
 
 class TestChartView(TestCase):
 
@@ -482,6 +564,91 @@ class TestChartData(TestCase):
         ]
         self.assertListEqual(actual, expected)
 
+    def test_basic_data_series(self):
+        data = {
+            "tests[]": [self.test1.pk, self.test2.pk],
+            "test_lists[]": [self.tl1.pk, self.tl2.pk],
+            "units[]": [self.utc1.unit.pk],
+            "statuses[]": [self.status.pk],
+        }
+        resp = self.client.get(self.url, data=data)
+        data = json.loads(resp.content.decode("UTF-8"))
+        unit_name = self.utc1.unit.name
+        expected = {
+            '%s - %s :: test1' % (unit_name, self.tl1.name): self.NPOINTS,
+            '%s - %s :: test1' % (unit_name, self.tl2.name): self.NPOINTS,
+            '%s - %s :: test2' % (unit_name, self.tl2.name): self.NPOINTS // 2,
+        }
+        actual = {name: len(s['series_data']) for name, s in data['plot_data']['series'].items()}
+        self.assertDictEqual(actual, expected)
+
+    def test_basic_data_max_points(self):
+        data = {
+            "tests[]": [self.test1.pk],
+            "test_lists[]": [self.tl1.pk],
+            "units[]": [self.utc1.unit.pk],
+            "statuses[]": [self.status.pk],
+            "max_points": 4,
+        }
+        resp = self.client.get(self.url, data=data)
+        data = json.loads(resp.content.decode("UTF-8"))
+        unit_name = self.utc1.unit.name
+        series = data['plot_data']['series']['%s - %s :: test1' % (unit_name, self.tl1.name)]['series_data']
+        assert len(series) == 4
+
+    def test_test_instance_filters_are_subqueries(self):
+        data = {
+            "tests[]": [self.test1.pk, self.test2.pk],
+            "test_lists[]": [self.tl1.pk, self.tl2.pk],
+            "units[]": [self.utc1.unit.pk],
+            "statuses[]": [self.status.pk],
+        }
+        view = views.charts.BaseChartView()
+        view.request = RequestFactory().get(self.url, data=data)
+        tis = view.get_test_instances(view.get_chart_filters())
+        sql, params = tis.query.sql_with_params()
+        # test instances + tests, units, statuses & test lists subqueries
+        assert sql.count("SELECT") == 5
+        assert len(tis) == 2 * self.NPOINTS + self.NPOINTS // 2
+
+    @mock.patch.object(views.charts, "COMMENT_CHUNK_SIZE", 2)
+    def test_comments_fetched_in_chunks(self):
+        tli = models.TestListInstance.objects.filter(unit_test_collection=self.utc1).latest("pk")
+        Comment(
+            submit_date=timezone.now(),
+            user=User.objects.get(username="user"),
+            content_object=tli,
+            comment='TestList comment',
+            site=get_current_site(RequestFactory().get(self.url)),
+        ).save()
+        data = {
+            "tests[]": [self.test1.pk],
+            "test_lists[]": [self.tl1.pk],
+            "units[]": [self.utc1.unit.pk],
+            "statuses[]": [self.status.pk],
+        }
+        resp = self.client.get(self.url, data=data)
+        data = json.loads(resp.content.decode("UTF-8"))
+        series = data['plot_data']['series']['%s - %s :: test1' % (self.utc1.unit.name, self.tl1.name)]
+        comments = {p['test_list_instance']['id']: p['test_instance_comment'] for p in series['series_data']}
+        assert 'TestList comment' in comments.pop(tli.pk)
+        assert not any(comments.values())
+
+    def test_downsample_indices(self):
+        values = [0, 1, 5, 2, 3, -4, 2, 1, 0, 1]
+        idx = views.charts.downsample_indices(values, 4)
+        assert list(idx) == [0, 2, 5, 9]
+
+    def test_downsample_indices_keep(self):
+        values = [0, 1, 5, 2, 3, -4, 2, 1, 0, 1]
+        keep = [False] * 10
+        keep[7] = True
+        idx = views.charts.downsample_indices(values, 4, keep)
+        assert list(idx) == [0, 2, 5, 7, 9]
+
+    def test_downsample_indices_not_required(self):
+        assert list(views.charts.downsample_indices([1, 2, 3], 4)) == [0, 1, 2]
+
     def test_basic_data_relative(self):
         data = {
             "tests[]": [self.test1.pk, self.test2.pk],
@@ -527,11 +694,26 @@ class TestChartData(TestCase):
             "relative": "true",
         }
         resp = self.client.get(url, data=data)
+        content = b"".join(resp.streaming_content).decode("UTF-8")
         expected_nlines = 2 + 10 + 1  # 2 header  + 10 rows data + 1 blank
-        self.assertTrue(len(resp.content.decode("UTF-8").split('\n')), expected_nlines)
+        self.assertEqual(len(content.split('\n')), expected_nlines)
+        assert content.startswith("%s - tl1 :: test1 (relative to ref)" % self.utc1.unit.name)
 
         self.assertEqual(resp.get('Content-Disposition'), 'attachment; filename="qatrackexport.csv"')
 
+    def test_export_csv_view_chunked(self):
+        url = reverse("charts_export_csv")
+        data = {
+            "tests[]": [self.test1.pk, self.test2.pk],
+            "test_lists[]": [self.tl1.pk, self.tl2.pk],
+            "units[]": [self.utc1.unit.pk],
+            "statuses[]": [self.status.pk],
+        }
+        expected = b"".join(self.client.get(url, data=data).streaming_content)
+        with mock.patch.object(views.charts, "EXPORT_CHUNK_SIZE", 3):
+            content = b"".join(self.client.get(url, data=data).streaming_content)
+        assert content == expected
+
 
 class TestComposite(TestCase):
 
@@ -725,6 +907,100 @@ class TestComposite(TestCase):
         }
         self.assertDictEqual(values, expected)
 
+    def test_composite_changed_only(self):
+
+        t3 = utils.create_test(name="test3")
+        tc3 = utils.create_test(name="testc3", test_type=models.COMPOSITE)
+        tc3.calculation_procedure = "result = 3*test3"
+        tc3.save()
+        tcc = utils.create_test(name="testcc", test_type=models.COMPOSITE)
+        tcc.calculation_procedure = "result = testc + testc3"
+        tcc.save()
+        for t in [t3, tc3, tcc]:
+            utils.create_test_list_membership(self.test_list, t)
+            utils.create_unit_test_info(test=t, unit=self.unit)
+
+        data = {
+            'tests': {
+                "testc": 3.,
+                "testc3": "",
+                "testcc": 6.,
+                "test1": 1.,
+                "test2": 2.,
+                "test3": 2.,
+            },
+            'changed': ["test3"],
+            'meta': {},
+            'test_list_id': self.test_list.id,
+            'unit_id': self.unit.id,
+        }
+        request = self.factory.post(self.url, content_type='application/json', data=json.dumps(data))
+        request.user = self.user
+        response = self.view(request)
+        values = json.loads(response.content.decode("UTF-8"))
+
+        assert set(values['results'].keys()) == {"testc3", "testcc"}
+        assert values['results']['testc3']['value'] == 6.
+        assert values['results']['testcc']['value'] == 9.
+
+    def test_composite_dependency_cache_cleared(self):
+
+        data = {
+            'tests': {
+                "testc": "",
+                "testcc": "",
+                "test1": 1.,
+                "test2": 2.,
+            },
+            'meta': {},
+            'test_list_id': self.test_list.id,
+            'unit_id': self.unit.id,
+        }
+        request = self.factory.post(self.url, content_type='application/json', data=json.dumps(data))
+        request.user = self.user
+        self.view(request)
+
+        tcc = utils.create_test(name="testcc", test_type=models.COMPOSITE)
+        tcc.calculation_procedure = "result = 2*testc"
+        tcc.save()
+        utils.create_test_list_membership(self.test_list, tcc)
+        utils.create_unit_test_info(test=tcc, unit=self.unit)
+
+        request = self.factory.post(self.url, content_type='application/json', data=json.dumps(data))
+        request.user = self.user
+        response = self.view(request)
+        values = json.loads(response.content.decode("UTF-8"))
+        assert values['results']['testcc']['value'] == 6.
+
+        tcc.calculation_procedure = "result = 3*testc"
+        tcc.save()
+        request = self.factory.post(self.url, content_type='application/json', data=json.dumps(data))
+        request.user = self.user
+        response = self.view(request)
+        values = json.loads(response.content.decode("UTF-8"))
+        assert values['results']['testcc']['value'] == 9.
+
+    def test_composite_nothing_changed(self):
+
+        data = {
+            'tests': {
+                "testc": 3.,
+                "test1": 1.,
+                "test2": 2.,
+            },
+            'changed': [],
+            'meta': {},
+            'test_list_id': self.test_list.id,
+            'unit_id': self.unit.id,
+        }
+        request = self.factory.post(self.url, content_type='application/json', data=json.dumps(data))
+        request.user = self.user
+        response = self.view(request)
+        values = json.loads(response.content.decode("UTF-8"))
+
+        assert values['success']
+        assert values['results'] == {}
+
     def test_set_skip(self):
 
         ts = utils.create_test(name="test_skip", test_type=models.COMPOSITE)
@@ -2073,6 +2349,63 @@ class TestDueDateOverView(TestCase):
         self.assertListEqual(response.context_data["due"][4][2], [self.utc])
 
 
+class TestOverviewObjects(TestCase):
+
+    def setUp(self):
+        self.status = utils.create_status()
+        self.test_list = utils.create_test_list()
+        self.tests = [utils.create_test(name="test%d" % i) for i in range(3)]
+        for test in self.tests:
+            utils.create_test_list_membership(self.test_list, test)
+
+        self.utc = utils.create_unit_test_collection(test_collection=self.test_list)
+        self.adhoc = utils.create_unit_test_collection(unit=self.utc.unit, null_frequency=True)
+
+        self.url = reverse("overview_objects")
+        utils.create_user()
+        self.client.login(username="user", password="password")
+
+    def perform(self, pass_fails):
+        tli = utils.create_test_list_instance(unit_test_collection=self.utc)
+        for test, pass_fail in zip(self.tests, pass_fails):
+            uti = models.UnitTestInfo.objects.get(test=test, unit=self.utc.unit)
+            ti = utils.create_test_instance(tli, unit_test_info=uti, status=self.status)
+            models.TestInstance.objects.filter(pk=ti.pk).update(pass_fail=pass_fail)
+        tli.save()
+        return tli
+
+    def get_overview(self):
+        return json.loads(self.client.get(self.url).content.decode("UTF-8"))
+
+    def test_grouped_by_unit_frequency(self):
+        self.perform([models.OK, models.OK, models.ACTION])
+
+        data = self.get_overview()
+        unit_freqs = data['unit_lists'][str(self.utc.unit.number)]['unit_freqs']
+
+        utc_data = unit_freqs[self.utc.frequency.name][self.utc.name]
+        assert utc_data['id'] == self.utc.pk
+        assert utc_data['last_instance_status'] == {models.OK: 2, models.ACTION: 1}
+
+        adhoc_data = unit_freqs['Ad Hoc'][self.adhoc.name]
+        assert adhoc_data['last_instance_status'] == 'New List'
+
+    def test_cached(self):
+        self.get_overview()
+        with mock.patch.object(views.review.OverviewObjects, "get_overview") as get_overview:
+            self.get_overview()
+            assert not get_overview.called
+
+    def test_cache_cleared_on_new_instance(self):
+        self.get_overview()
+        self.perform([models.TOLERANCE, models.OK, models.OK])
+
+        data = self.get_overview()
+        unit_freqs = data['unit_lists'][str(self.utc.unit.number)]['unit_freqs']
+        utc_data = unit_freqs[self.utc.frequency.name][self.utc.name]
+        assert utc_data['last_instance_status'] == {models.OK: 2, models.TOLERANCE: 1}
+
+
 class TestReviewStatusContext(TestCase):
 
     def setUp(self):
@@ -2128,6 +2461,21 @@ class TestReviewStatusContext(TestCase):
             self.assertEqual(ti.status.valid, context['statuses'][ti.status.name]['valid'])
             self.assertEqual(ti.status.requires_review, context['statuses'][ti.status.name]['requires_review'])
 
+    def test_prefetch_missing_summary_counts(self):
+        models.TestListInstance.objects.filter(pk=self.tli_1.pk).update(pass_fail_counts=None)
+        tli = models.TestListInstance.objects.get(pk=self.tli_1.pk)
+        views.base.prefetch_missing_summary_counts([tli, None])
+        with self.assertNumQueries(0):
+            assert sum(tli.pass_fail_summary().values()) == 3
+            assert all(ti.status.name for ti in tli.testinstance_set.all())
+            assert tli.comments.all().count() == 1
+
+    def test_stored_summary_counts_not_prefetched(self):
+        self.tli_1.update_summary_counts()
+        tli = models.TestListInstance.objects.get(pk=self.tli_1.pk)
+        views.base.prefetch_missing_summary_counts([tli])
+        assert not getattr(tli, "_prefetched_objects_cache", None)
+
 
 class TestTrees(TestCase):
 
@@ -1,3 +1,5 @@
+from functools import reduce
+import hashlib
 import io
 import json
 import math
@@ -92,6 +94,102 @@ def tokenize_composite_calc(calc_procedure):
     return tokens
 
 
+def process_procedure(procedure):
+    """
+    Cleans and sets new style division for calculations procedures. Used by
+    both the :view:`qa.perform.Upload` &
+    :view:`qa.perform.CompositeCalculation` views.
+
+    """
+    return "\n".join([procedure, "\n"]).replace('\r', '\n')
+
+
+# process wide cache of compiled calculation procedures keyed on
+# (test_id, filename, procedure hash).  Code objects can't be pickled so
+# this can not live in the Django cache.
+_compiled_procedures = {}
+
+
+def compile_procedure(test_id, procedure, filename):
+    """
+    Return a compiled code object for the input calculation procedure.
+    Compiled procedures are cached per process so that the (relatively
+    expensive) compilation step only happens once for each version of a
+    tests calculation procedure.
+    """
+
+    procedure = procedure or ""
+    proc_hash = hashlib.md5(procedure.encode("utf-8")).hexdigest()
+    key = (test_id, filename, proc_hash)
+    code = _compiled_procedures.get(key)
+    if code is None:
+        code = compile(process_procedure(procedure), filename, "exec")
+        _compiled_procedures[key] = code
+    return code
+
+
+def clear_compiled_procedures(test_id=None):
+    """Remove compiled procedures for test with id test_id from the cache (or
+    all compiled procedures if test_id is None)"""
+
+    if test_id is None:
+        _compiled_procedures.clear()
+        return
+
+    for key in [k for k in list(_compiled_procedures) if k[0] == test_id]:
+        _compiled_procedures.pop(key, None)
+
+
+def composite_dependencies(composite_tests, all_slugs):
+    """
+    Figure out dependencies of composite tests. composite_tests is a dict of
+    the form {slug: calculation_procedure} and all_slugs is a list of all
+    test slugs available to the calculations.  Returns a tuple of
+    (dependencies, all_dependencies) where dependencies maps each composite
+    slug to the set of composite slugs it depends on, and all_dependencies
+    maps each composite slug to the set of all slugs it depends on.
+    """
+
+    dependencies = {}
+    all_dependencies = {}
+    slugs = list(composite_tests.keys())
+    for slug in slugs:
+        tokens = set(tokenize_composite_calc(composite_tests[slug]))
+        dependencies[slug] = set(s for s in slugs if s in tokens and s != slug)
+        all_dependencies[slug] = set(s for s in all_slugs if s in tokens and s != slug)
+
+    return dependencies, all_dependencies
+
+
+def resolve_dependency_order(dependencies):
+    """
+    Resolve calculation order dependencies using topological sort.
+
+    This allows composite calculations to be calculated in the correct
+    order for situations where you have composites that depend on
+    other composites. For example, if A & B are both composite tests,
+    but A is a function of B, then B must be calculated before A.
+    Cyclical dependencies are also flagged.
+
+    Returns a tuple of (calculation_order, cyclic_tests).
+
+    See http://code.activestate.com/recipes/577413-topological-sort/
+    """
+
+    data = {k: set(v) - {k} for k, v in dependencies.items()}  # Ignore self dependencies
+    extra_items_in_deps = reduce(set.union, list(data.values()), set()) - set(data.keys())
+    data.update(dict((item, set()) for item in extra_items_in_deps))
+    deps = []
+    while True:
+        ordered = set(item for item, dep in list(data.items()) if not dep)
+        if not ordered:
+            break
+        deps.extend(list(sorted(ordered)))
+        data = dict((item, (dep - ordered)) for item, dep in list(data.items()) if item not in ordered)
+
+    return deps, list(data.keys())
+
+
 def unique(seq, idfun=None):
     """f5 from http://www.peterbe.com/plog/uniqifiers-benchmark"""
     # order preserving
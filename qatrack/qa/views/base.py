@@ -4,7 +4,7 @@ import logging
 from braces.views import PrefetchRelatedMixin, SelectRelatedMixin
 from django.conf import settings
 from django.contrib.auth.context_processors import PermWrapper
-from django.db.models import Count, Q
+from django.db.models import Count, Q, prefetch_related_objects
 from django.template.loader import get_template
 from django.urls import resolve, reverse
 from django.utils.safestring import mark_safe
@@ -38,11 +38,33 @@ from .. import signals  # NOQA
 logger = logging.getLogger('qatrack')
 
 
-def generate_review_status_context(test_list_instance):
+def generate_review_status_context(test_list_instance, statuses=None):
+    """
+    Generate review status counts context for a TestListInstance.  statuses
+    is an optional dictionary of {pk: TestInstanceStatus} used when rendering
+    from the instances stored summary counts.
+    """
 
     if not test_list_instance:
         return {}
 
+    if test_list_instance.review_status_counts is not None and test_list_instance.comment_count is not None:
+        status_context = {}
+        for status, count in test_list_instance.review_status_totals(statuses):
+            status_context[status.name] = {
+                "count": count,
+                "valid": status.valid,
+                "requires_review": status.requires_review,
+                "reviewed_by": test_list_instance.reviewed_by,
+                "reviewed": test_list_instance.reviewed,
+                "colour": status.colour,
+            }
+        return {
+            "statuses": status_context,
+            "comments": test_list_instance.comment_count,
+            "show_icons": settings.ICON_SETTINGS['SHOW_REVIEW_ICONS']
+        }
+
     statuses = collections.defaultdict(lambda: {"count": 0})
     comment_count = 0
     for ti in test_list_instance.testinstance_set.all():
@@ -65,6 +87,41 @@ def generate_review_status_context(test_list_instance):
     return c
 
 
+def prefetch_missing_summary_counts(tlis):
+    """Prefetch the test instances & comments required to render the status
+    summaries of any of the input TestListInstances whose summary counts
+    have not been calculated yet (see update_tli_summary_counts)"""
+
+    missing = [
+        tli for tli in tlis
+        if tli is not None and None in (tli.pass_fail_counts, tli.review_status_counts, tli.comment_count)
+    ]
+    if missing:
+        prefetch_related_objects(missing, "testinstance_set__status", "comments")
+
+
+class TestListInstanceSummaryMixin:
+    """
+    A mixin for listings which render review status & pass/fail summaries of
+    :model:`qa.TestListInstance`s
+    """
+
+    def get_summary_instance(self, obj):
+        """Return the :model:`qa.TestListInstance` summarized in the row for obj"""
+        return obj
+
+    def get_review_statuses(self):
+        """Return dictionary of all :model:`qa.TestInstanceStatus`s keyed by pk"""
+        if not hasattr(self, "_review_statuses"):
+            self._review_statuses = models.TestInstanceStatus.objects.in_bulk()
+        return self._review_statuses
+
+    def get_rows(self, objects):
+        objects = list(objects)
+        prefetch_missing_summary_counts(self.get_summary_instance(obj) for obj in objects)
+        return super().get_rows(objects)
+
+
 class TestListInstanceMixin(SelectRelatedMixin, PrefetchRelatedMixin):
     """
     A mixin for commonly required prefetch_related/select_related  for
@@ -176,7 +233,7 @@ class BaseEditTestListInstance(TestListInstanceMixin, UpdateView):
         return reverse("unreviewed")
 
 
-class UTCList(BaseListableView):
+class UTCList(TestListInstanceSummaryMixin, BaseListableView):
 
     model = models.UnitTestCollection
 
@@ -239,12 +296,9 @@ class UTCList(BaseListableView):
     }
 
     prefetch_related = (
-        'last_instance__testinstance_set',
-        'last_instance__testinstance_set__status',
         'last_instance__reviewed_by',
         'last_instance__modified_by',
         'last_instance__created_by',
-        'last_instance__comments',
     )
 
     order_by = ["unit__name", "frequency__name", "name"]
@@ -350,10 +404,13 @@ class UTCList(BaseListableView):
         c = {"instance": utc.last_instance}
         return template.render(c)
 
+    def get_summary_instance(self, utc):
+        return utc.last_instance
+
     def last_instance_review_status(self, utc):
         template = self.templates['review_status']
         c = {'instance': utc.last_instance, 'perms': PermWrapper(self.request.user), 'request': self.request}
-        c.update(generate_review_status_context(utc.last_instance))
+        c.update(generate_review_status_context(utc.last_instance, self.get_review_statuses()))
         return template.render(c)
 
     def last_instance_pass_fail(self, utc):
@@ -367,7 +424,7 @@ class UTCList(BaseListableView):
         return template.render(c)
 
 
-class TestListInstances(BaseListableView):
+class TestListInstances(TestListInstanceSummaryMixin, BaseListableView):
     """
     This view provides a base for any sort of listing of
     :model:`qa.TestListInstance`'s.
@@ -423,12 +480,9 @@ class TestListInstances(BaseListableView):
     )
 
     prefetch_related = (
-        'testinstance_set',
-        'testinstance_set__status',
         'rtsqa_for_tli',
         'rtsqa_for_tli__service_event',
         'serviceevents_initiated',
-        'comments',
         'attachment_set',
     )
 
@@ -535,7 +589,7 @@ class TestListInstances(BaseListableView):
             "show_label": settings.ICON_SETTINGS['SHOW_REVIEW_LABELS_LISTING'],
             "show_icons": settings.ICON_SETTINGS['SHOW_STATUS_ICONS_REVIEW']
         }
-        c.update(generate_review_status_context(tli))
+        c.update(generate_review_status_context(tli, self.get_review_statuses()))
         return template.render(c)
 
     def pass_fail(self, tli):
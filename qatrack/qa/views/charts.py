@@ -1,14 +1,19 @@
 import collections
+import csv
+import hashlib
 import io
 import itertools
 import json
 import textwrap
 
 from braces.views import JSONResponseMixin, PermissionRequiredMixin
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Count
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q, prefetch_related_objects
 from django.db.utils import ProgrammingError
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.loader import get_template
 from django.utils import timezone
 from django.views.generic import TemplateView, View
@@ -33,6 +38,13 @@ numpy.seterr(all='raise')
 
 JSON_CONTENT_TYPE = "application/json"
 
+# number of rows of each series read at a time when exporting chart data
+EXPORT_CHUNK_SIZE = 1000
+
+# number of test list instances to fetch comments for per query. Keeps the
+# query below SQL Server's limit of 2100 parameters
+COMMENT_CHUNK_SIZE = 1000
+
 
 local_tz = timezone.get_current_timezone()
 
@@ -83,6 +95,47 @@ def get_tests_for_test_lists(request):
     return HttpResponse(json_context, content_type=JSON_CONTENT_TYPE)
 
 
+def downsample_indices(values, max_points, keep=None):
+    """
+    Return the (sorted) indices of the points to retain when reducing a
+    series of values to approximately max_points points.  The series is split
+    into equal sized buckets and the minimum and maximum value from each
+    bucket are retained so that peaks are preserved.  The first & last point,
+    along with any point where keep is True, are always retained.  Null (NaN)
+    values are only retained when required by keep.
+    """
+
+    values = numpy.asarray(values, dtype=float)
+    npoints = len(values)
+    if not max_points or npoints <= max_points:
+        return numpy.arange(npoints)
+
+    selected = numpy.zeros(npoints, dtype=bool)
+    selected[[0, npoints - 1]] = True
+    if keep is not None:
+        selected |= numpy.asarray(keep, dtype=bool)
+
+    nbuckets = max(1, (max_points - 2) // 2)
+    interior = numpy.arange(1, npoints - 1)
+    buckets = (interior - 1) * nbuckets // (npoints - 2)
+    vals = values[interior]
+
+    not_null = ~numpy.isnan(vals)
+    interior, buckets, vals = interior[not_null], buckets[not_null], vals[not_null]
+
+    if len(vals):
+        # sort by bucket and then value so the first & last entry for each
+        # bucket are the min & max values in that bucket
+        order = numpy.lexsort((vals, buckets))
+        sorted_buckets = buckets[order]
+        boundaries = sorted_buckets[1:] != sorted_buckets[:-1]
+        firsts = numpy.concatenate(([True], boundaries))
+        lasts = numpy.concatenate((boundaries, [True]))
+        selected[interior[order][firsts | lasts]] = True
+
+    return numpy.flatnonzero(selected)
+
+
 class ChartView(PermissionRequiredMixin, TemplateView):
     """View responsible for rendering the main charts user interface."""
 
@@ -396,19 +449,39 @@ class BaseChartView(View):
 
         return point
 
-    def get_plot_data(self):
-        """Retrieve all :model:`qa.TestInstance` data requested."""
+    def get_max_points(self):
+        """Return maximum number of points per series requested (None for no limit)"""
+        try:
+            max_points = int(self.request.GET.get("max_points", ""))
+        except ValueError:
+            return None
+        return max_points if max_points > 0 else None
 
-        self.plot_data = {'series': {}, 'events': []}
+    def series_data(self, tis, relative):
+        """
+        Convert :model:`qa.TestInstance`s to points, downsampling the series
+        if the number of points exceeds the requested max_points.  Out of
+        tolerance points are always retained.
+        """
 
-        now = timezone.now()
-        dates = self.get_date(now, now - timezone.timedelta(days=365))
+        points = [self.test_instance_to_point(ti, relative=relative) for ti in tis]
+
+        max_points = self.get_max_points()
+        if max_points and len(points) > max_points:
+            values = [p['value'] if p['value'] is not None else numpy.nan for p in points]
+            keep = [ti.pass_fail in (models.TOLERANCE, models.ACTION) for ti in tis]
+            points = [points[idx] for idx in downsample_indices(values, max_points, keep)]
+
+        return points
 
-        from_date = dates[0]
-        to_date = dates[1]
+    def get_chart_filters(self):
+        """
+        Parse the requested chart filters from the GET data. Returns None if
+        any of the required filters are missing.
+        """
 
-        combine_data = self.request.GET.get("combine_data") == "true"
-        relative = self.request.GET.get("relative") == "true"
+        now = timezone.now()
+        from_date, to_date = self.get_date(now, now - timezone.timedelta(days=365))
 
         tests = self.request.GET.getlist("tests[]", [])
         test_lists = self.request.GET.getlist("test_lists[]", [])
@@ -416,71 +489,110 @@ class BaseChartView(View):
         statuses = self.request.GET.getlist("statuses[]", [])
         service_types = self.request.GET.getlist("service_types[]", [])
 
-        show_events = self.request.GET.get('show_events') == 'true'
-        # se_types = self.request.GET.getlist('service_types[]', [])
-
         if not (tests and test_lists and units and statuses):
+            return None
+
+        return {
+            'from_date': from_date,
+            'to_date': to_date,
+            'combine_data': self.request.GET.get("combine_data") == "true",
+            'relative': self.request.GET.get("relative") == "true",
+            'show_events': self.request.GET.get('show_events') == 'true',
+            'tests': models.Test.objects.filter(pk__in=tests),
+            'test_lists': models.TestList.objects.filter(pk__in=test_lists),
+            'units': Unit.objects.filter(pk__in=units),
+            'statuses': models.TestInstanceStatus.objects.filter(pk__in=statuses),
+            'service_types': sl_models.ServiceType.objects.filter(pk__in=service_types),
+        }
+
+    def get_test_instances(self, filters):
+        """Return queryset of all :model:`qa.TestInstance`s matching the chart
+        filters.  The filters are querysets so they're included as subqueries
+        and the query doesn't grow with the number of test list, test & unit
+        combinations requested."""
+
+        tis = models.TestInstance.objects.filter(
+            unit_test_info__test__in=filters['tests'],
+            unit_test_info__unit__in=filters['units'],
+            status__in=filters['statuses'],
+            work_completed__gte=filters['from_date'],
+            work_completed__lte=filters['to_date'],
+        )
+        if not filters['combine_data']:
+            tis = tis.filter(test_list_instance__test_list__in=filters['test_lists'])
+
+        return tis
+
+    def get_plot_data(self):
+        """Retrieve all :model:`qa.TestInstance` data requested."""
+
+        self.plot_data = {'series': {}, 'events': []}
+
+        filters = self.get_chart_filters()
+        if filters is None:
             return
 
-        tests = models.Test.objects.filter(pk__in=tests)
-        test_lists = models.TestList.objects.filter(pk__in=test_lists)
-        units = Unit.objects.filter(pk__in=units)
-        statuses = models.TestInstanceStatus.objects.filter(pk__in=statuses)
-        service_types = sl_models.ServiceType.objects.filter(pk__in=service_types)
+        from_date = filters['from_date']
+        to_date = filters['to_date']
+        combine_data = filters['combine_data']
+        relative = filters['relative']
+        show_events = filters['show_events']
+        units = filters['units']
+        service_types = filters['service_types']
+
+        # retrieve test instances for every requested test list, test & unit
+        # combination in a single query and then partition them into series
+        tis = self.get_test_instances(filters).select_related(
+            "reference", "tolerance", "unit_test_info__test", "unit_test_info__unit", "status",
+            'test_list_instance', 'test_list_instance__test_list'
+        ).order_by(
+            "work_completed"
+        )
+
+        series_tis = collections.defaultdict(list)
+        tlis = {}
+        for ti in tis:
+            # share test list instances between their test instances so
+            # comments only need to be fetched once for each
+            ti.test_list_instance = tlis.setdefault(ti.test_list_instance_id, ti.test_list_instance)
+            uti = ti.unit_test_info
+            if combine_data:
+                series_tis[(uti.test_id, uti.unit_id)].append(ti)
+            else:
+                series_tis[(ti.test_list_instance.test_list_id, uti.test_id, uti.unit_id)].append(ti)
+
+        tlis = list(tlis.values())
+        for start in range(0, len(tlis), COMMENT_CHUNK_SIZE):
+            prefetch_related_objects(tlis[start:start + COMMENT_CHUNK_SIZE], "comments", "comments__user")
+
+        tests = list(filters['tests'])
+        test_lists = list(filters['test_lists'])
+        units_list = list(units)
 
         if not combine_data:
-            # retrieve test instances for every possible permutation of the
+            # generate series for every possible permutation of the
             # requested test list, test & units
-            for tl, t, u in itertools.product(test_lists, tests, units):
-                tis = models.TestInstance.objects.filter(
-                    test_list_instance__test_list=tl,
-                    unit_test_info__test=t,
-                    unit_test_info__unit=u,
-                    status__pk__in=statuses,
-                    work_completed__gte=from_date,
-                    work_completed__lte=to_date,
-                ).select_related(
-                    "reference", "tolerance", "unit_test_info__test", "unit_test_info__unit", "status",
-                    'test_list_instance', 'test_list_instance__test_list'
-                ).prefetch_related(
-                    "test_list_instance__comments",
-                    "test_list_instance__comments__user",
-                ).order_by(
-                    "work_completed"
-                )
+            for tl, t, u in itertools.product(test_lists, tests, units_list):
+                tis = series_tis.get((tl.id, t.id, u.id))
                 if tis:
-                    # tli = tis.first().test_list_instance
                     name = "%s - %s :: %s%s" % (u.name, tl.name, t.name, " (relative to ref)" if relative else "")
                     self.plot_data['series'][name] = {
-                        'series_data': [self.test_instance_to_point(ti, relative=relative) for ti in tis],
+                        'series_data': self.series_data(tis, relative),
                         'unit': {'name': u.name, 'id': u.id},
                         'test_list': {'name': tl.name, 'id': tl.id},
                     }
         else:
-            # retrieve test instances for every possible permutation of the
+            # generate series for every possible permutation of the
             # requested test & units
-            for t, u in itertools.product(tests, units):
-                tis = models.TestInstance.objects.filter(
-                    unit_test_info__test=t,
-                    unit_test_info__unit=u,
-                    status__pk__in=statuses,
-                    work_completed__gte=from_date,
-                    work_completed__lte=to_date,
-                ).select_related(
-                    "reference", "tolerance", "unit_test_info__test", "unit_test_info__unit", "status",
-                    'test_list_instance'
-                ).prefetch_related(
-                    "test_list_instance__comments",
-                    "test_list_instance__comments__user",
-                ).order_by("work_completed")
+            for t, u in itertools.product(tests, units_list):
+                tis = series_tis.get((t.id, u.id))
                 if tis:
-                    tli = tis.first().test_list_instance
+                    tli = tis[0].test_list_instance
                     name = "%s :: %s%s" % (u.name, t.name, " (relative to ref)" if relative else "")
                     self.plot_data['series'][name] = {
-                        'series_data': [self.test_instance_to_point(ti, relative=relative) for ti in tis],
+                        'series_data': self.series_data(tis, relative),
                         'unit': {'name': u.name, 'id': u.id},
                         'test_list': {'name': tli.test_list.name, 'id': tli.test_list.id},
-                        # 'test_list_instance': {'date': tli.created, 'id': tli.id}
                     }
 
         if show_events:
@@ -542,16 +654,17 @@ class BasicChartData(PermissionRequiredMixin, JSONResponseMixin, BaseChartView):
     raise_exception = True
 
 
-class ControlChartImage(PermissionRequiredMixin, BaseChartView):
-    """Return a control chart image from given qa data"""
-
-    permission_required = "qa.can_view_charts"
-    raise_exception = True
+class ControlChartMixin:
+    """Common control chart parameter & data handling"""
 
     def convert_date(self, dt):
         """date is being used by Python code, so no need to convert to ISO"""
         return dt
 
+    def get_max_points(self):
+        """control chart calculations require all data points"""
+        return None
+
     def get_number_from_request(self, param, default, dtype=float):
         """look for a number in GET and convert it to the given datatype"""
         try:
@@ -560,14 +673,74 @@ class ControlChartImage(PermissionRequiredMixin, BaseChartView):
             v = default
         return v
 
-    def get_plot_data(self):
+    def get_control_chart_params(self):
+        """Return (n_baseline_subgroups, subgroup_size) requested by user"""
+
+        n_baseline_subgroups = self.get_number_from_request("n_baseline_subgroups", 2, dtype=int)
+        n_baseline_subgroups = max(2, n_baseline_subgroups)
+
+        subgroup_size = self.get_number_from_request("subgroup_size", 2, dtype=int)
+        if not (1 < subgroup_size < 100):
+            subgroup_size = 1
+
+        return n_baseline_subgroups, subgroup_size
+
+    def get_control_chart_data(self, context):
         """
         The control chart software can only handle one test at a time
         so if user requested more than one test, just grab
         one of them.
         """
 
-        super(ControlChartImage, self).get_plot_data()
+        dates, data = [], []
+        if context["plot_data"]['series'] and list(context["plot_data"]['series'].values()):
+            name, series = list(context["plot_data"]['series'].items())[0]
+            points = series['series_data']
+            non_null_points = [(ti["date"], ti["value"]) for ti in points if ti['value'] is not None]
+            if non_null_points:
+                dates, data = list(zip(*non_null_points))
+
+        return dates, data
+
+
+class ControlChartImage(PermissionRequiredMixin, ControlChartMixin, BaseChartView):
+    """Return a control chart image from given qa data"""
+
+    permission_required = "qa.can_view_charts"
+    raise_exception = True
+
+    def get_cache_key(self):
+        """
+        Generate a cache key for the requested chart. The key includes the
+        number & latest modification time of the :model:`qa.TestInstance`s
+        being charted so that cached images are invalidated whenever the
+        underlying data changes.
+        """
+
+        filters = self.get_chart_filters()
+        if filters is None:
+            return None
+
+        params = sorted((k, self.request.GET.getlist(k)) for k in self.request.GET if k != "timestamp")
+        data_version = self.get_test_instances(filters).aggregate(modified=Max("modified"), count=Count("id"))
+        key_data = json.dumps([params, filters['from_date'], filters['to_date'], data_version], cls=DjangoJSONEncoder)
+
+        return settings.CACHE_CONTROL_CHART_.format(hashlib.md5(key_data.encode("utf-8")).hexdigest())
+
+    def get(self, request):
+
+        cache_key = self.get_cache_key()
+        if cache_key is not None:
+            png = cache.get(cache_key)
+            if png is not None:
+                return HttpResponse(png, content_type="image/png")
+
+        resp = super().get(request)
+
+        if cache_key is not None and resp.get("Content-Type") == "image/png":
+            cache.set(cache_key, resp.content, settings.CONTROL_CHART_CACHE_TIMEOUT)
+
+        return resp
 
     def render_to_response(self, context):
         """Create a png image and write the control chart image to it"""
@@ -579,21 +752,9 @@ class ControlChartImage(PermissionRequiredMixin, BaseChartView):
             self.get_number_from_request("height", 480) / dpi,
         )
         FigureCanvas(fig)
-        dates, data = [], []
-
-        if context["plot_data"]['series'] and list(context["plot_data"]['series'].values()):
-            name, series = list(context["plot_data"]['series'].items())[0]
-            points = series['series_data']
-            non_null_points = [(ti["date"], ti["value"]) for ti in points if ti['value'] is not None]
-            if non_null_points:
-                dates, data = list(zip(*non_null_points))
-
-        n_baseline_subgroups = self.get_number_from_request("n_baseline_subgroups", 2, dtype=int)
-        n_baseline_subgroups = max(2, n_baseline_subgroups)
 
-        subgroup_size = self.get_number_from_request("subgroup_size", 2, dtype=int)
-        if not (1 < subgroup_size < 100):
-            subgroup_size = 1
+        dates, data = self.get_control_chart_data(context)
+        n_baseline_subgroups, subgroup_size = self.get_control_chart_params()
 
         include_fit = self.request.GET.get("fit_data", "") == "true"
 
@@ -617,33 +778,128 @@ class ControlChartImage(PermissionRequiredMixin, BaseChartView):
         return HttpResponse(buf.getvalue(), content_type="image/png")
 
 
-class ExportCSVView(PermissionRequiredMixin, JSONResponseMixin, BaseChartView):
-    """JSON view used for basic chart type"""
+class ControlChartData(PermissionRequiredMixin, ControlChartMixin, JSONResponseMixin, BaseChartView):
+    """
+    JSON view returning control chart limits & out of control subgroups
+    for given qa data without rendering an image.
+    """
 
     permission_required = "qa.can_view_charts"
     raise_exception = True
 
     def render_to_response(self, context):
-        import csv
-        response = HttpResponse(content_type='text/csv')
+
+        dates, data = self.get_control_chart_data(context)
+        n_baseline_subgroups, subgroup_size = self.get_control_chart_params()
+
+        if n_baseline_subgroups < 1 or n_baseline_subgroups > len(data) / subgroup_size:
+            return self.render_json_response({'success': False, 'error': "Not enough data for control chart"})
+
+        try:
+            results = control_chart.compute(numpy.array(data), subgroup_size, n_baseline_subgroups, dates=dates)
+        except (RuntimeError, OverflowError, TypeError, FloatingPointError, ValueError) as e:
+            msg = "There was a problem calculating your control chart: %s" % str(e)
+            return self.render_json_response({'success': False, 'error': msg})
+
+        results['success'] = True
+        return self.render_json_response(results)
+
+
+class Echo:
+    """Pseudo buffer whose write method just returns the value written"""
+
+    def write(self, value):
+        return value
+
+
+class ExportCSVView(PermissionRequiredMixin, BaseChartView):
+    """
+    Stream chart data as CSV. Each series is read EXPORT_CHUNK_SIZE
+    :model:`qa.TestInstance`s at a time (using keyset pagination) so memory
+    use is bounded regardless of the size of the export. Every chunk is read
+    completely before the next query is run since some database backends
+    (e.g. SQL Server without MARS) don't support multiple open cursors.
+    """
+
+    permission_required = "qa.can_view_charts"
+    raise_exception = True
+
+    def get(self, request):
+
+        self._test_choices_cache = {}
+
+        filters = self.get_chart_filters()
+        series = list(self.get_export_series(filters)) if filters else []
+
+        response = StreamingHttpResponse(self.csv_rows(series), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="qatrackexport.csv"'
+        return response
+
+    def get_export_series(self, filters):
+        """Generate (name, queryset) pairs for every series that has data"""
+
+        tis = self.get_test_instances(filters)
+        relative = " (relative to ref)" if filters['relative'] else ""
+        units = list(filters['units'])
+        tests = list(filters['tests'])
+
+        if filters['combine_data']:
+            present = set(
+                tis.order_by().values_list("unit_test_info__test_id", "unit_test_info__unit_id").distinct()
+            )
+            for t, u in itertools.product(tests, units):
+                if (t.id, u.id) in present:
+                    name = "%s :: %s%s" % (u.name, t.name, relative)
+                    yield name, tis.filter(unit_test_info__test=t, unit_test_info__unit=u)
+        else:
+            present = set(
+                tis.order_by().values_list(
+                    "test_list_instance__test_list_id", "unit_test_info__test_id", "unit_test_info__unit_id"
+                ).distinct()
+            )
+            for tl, t, u in itertools.product(list(filters['test_lists']), tests, units):
+                if (tl.id, t.id, u.id) in present:
+                    name = "%s - %s :: %s%s" % (u.name, tl.name, t.name, relative)
+                    yield name, tis.filter(
+                        test_list_instance__test_list=tl, unit_test_info__test=t, unit_test_info__unit=u
+                    )
+
+    def series_rows(self, tis):
+        """Generate (date, value, reference) triplets for a single series"""
+
+        tis = tis.select_related("reference", "unit_test_info__test").order_by("work_completed", "pk")
+        chunk = list(tis[:EXPORT_CHUNK_SIZE])
+        while chunk:
+            for ti in chunk:
+                ref = ti.reference.value if ti.reference is not None else ""
+                yield ti.work_completed, ti.value_display() if not ti.skipped else "", ref
+
+            if len(chunk) < EXPORT_CHUNK_SIZE:
+                break
+
+            last = chunk[-1]
+            after = Q(work_completed__gt=last.work_completed) | Q(work_completed=last.work_completed, pk__gt=last.pk)
+            chunk = list(tis.filter(after)[:EXPORT_CHUNK_SIZE])
+
+    def csv_rows(self, series):
+        """Generate encoded CSV lines with series arranged side by side"""
+
+        writer = csv.writer(Echo())
 
-        writer = csv.writer(response)
         header1 = []
         header2 = []
-        for h in context['headers']:
-            header1.extend([h.encode('utf-8'), '', ''])
+        for name, __ in series:
+            header1.extend([name, '', ''])
             header2.extend(["Date", "Value", "Ref"])
 
-        writer.writerow(header1)
-        writer.writerow(header2)
+        yield writer.writerow(header1)
+        yield writer.writerow(header2)
 
         tz = timezone.get_current_timezone()
-        for row_set in context['rows']:
+        columns = [self.series_rows(tis) for __, tis in series]
+        for row_set in itertools.zip_longest(*columns, fillvalue=("", "", "")):
             row = []
             for date, val, ref in row_set:
                 date = format_datetime(date.astimezone(tz)) if date else ""
                 row.extend([date, val, ref])
-            writer.writerow(row)
-
-        return response
+            yield writer.writerow(row)
@@ -1,5 +1,4 @@
 import collections
-from functools import reduce
 import json
 import math
 import os
@@ -50,7 +49,7 @@ from qatrack.service_log import models as sl_models
 from qatrack.units.models import Site, Unit
 
 from . import forms
-from .. import models, signals, utils
+from .. import calculation_pool, models, signals, utils
 from .base import BaseEditTestListInstance, TestListInstances, UTCList, logger
 
 pd.plotting.register_matplotlib_converters()  # required so matplotlib can convert dates correctly
@@ -66,16 +65,6 @@ DEFAULT_CALCULATION_CONTEXT = {
 }
 
 
-def process_procedure(procedure):
-    """
-    Cleans and sets new style division for calculations procedures. Used by
-    both the :view:`qa.perform.Upload` &
-    :view:`qa.perform.CompositeCalculation` views.
-
-    """
-    return "\n".join([procedure, "\n"]).replace('\r', '\n')
-
-
 def set_attachment_owners(test_list_instance, attachments):
 
     tis = test_list_instance.testinstance_set.select_related("unit_test_info")
@@ -334,7 +323,18 @@ class UploadHandler:
             else:
                 self.handle_upload()
 
-            results = self.run_calc()
+            if calculation_pool.enabled():
+                data = dict(self.data, attachment_id=self.attachment.pk)
+                results = calculation_pool.run(calculate_upload, self.user, data)
+            else:
+                results = self.run_calc()
+        except calculation_pool.CalculationError as e:
+            results = {
+                'success': False,
+                'errors': [str(e)],
+                "result": None,
+                "user_attached": [],
+            }
         except Exception:
             msg = traceback.format_exc(limit=5, chain=True)
             results = {
@@ -373,7 +373,7 @@ class UploadHandler:
 
         try:
             test = models.Test.objects.get(pk=self.data.get("test_id"))
-            code = compile(process_procedure(test.calculation_procedure), "__QAT+COMP_%s.py" % test.slug, "exec")
+            code = utils.compile_procedure(test.pk, test.calculation_procedure, "__QAT+COMP_%s.py" % test.slug)
             exec(code, self.calculation_context)
             key = "result" if "result" in self.calculation_context else test.slug
             results["result"] = self.calculation_context[key]
@@ -422,8 +422,15 @@ class UploadHandler:
 
         comments = self.data["comments"]
         skips = self.data.get("skips", {})
+
+        try:
+            f = open(self.attachment.attachment.path, "r")
+        except NotImplementedError:
+            self.attachment.attachment.open("r")
+            f = self.attachment.attachment
+
         self.calculation_context.update({
-            "FILE": open(self.attachment.attachment.path, "r"),
+            "FILE": f,
             "BIN_FILE": self.attachment.attachment,
             "META": meta_data,
             "REFS": refs,
@@ -492,6 +499,9 @@ class Upload(JSONResponseMixin, View):
 
     def run_calc(self):
 
+        if calculation_pool.enabled():
+            return self.run_calc_in_pool()
+
         self.set_calculation_context()
 
         results = {
@@ -510,7 +520,7 @@ class Upload(JSONResponseMixin, View):
 
         try:
             test = models.Test.objects.get(pk=self.request.POST.get("test_id"))
-            code = compile(process_procedure(test.calculation_procedure), "__QAT+COMP_%s.py" % test.slug, "exec")
+            code = utils.compile_procedure(test.pk, test.calculation_procedure, "__QAT+COMP_%s.py" % test.slug)
             exec(code, self.calculation_context)
             key = "result" if "result" in self.calculation_context else test.slug
             results["result"] = self.calculation_context[key]
@@ -528,6 +538,33 @@ class Upload(JSONResponseMixin, View):
 
         return self.render_json_response(results)
 
+    def run_calc_in_pool(self):
+        """run the calculation procedure in the calculation pool"""
+
+        data = {
+            "test_list_id": self.test_list.pk,
+            "unit_id": self.unit.pk,
+            "test_id": self.request.POST.get("test_id"),
+            "attachment_id": self.attachment.pk,
+            "meta": self.get_json_data("meta"),
+            "comments": self.get_json_data("comments"),
+            "skips": self.get_json_data("skips"),
+        }
+        try:
+            results = calculation_pool.run(calculate_upload, self.request.user, data)
+        except calculation_pool.CalculationError as e:
+            results = {
+                'attachment_id': self.attachment.id,
+                'attachment': attachment_info(self.attachment),
+                'success': False,
+                'errors': [str(e)],
+                "result": None,
+                "comment": "",
+                "user_attached": [],
+            }
+
+        return self.render_json_response(results)
+
     def handle_upload(self):
         """read incoming file and save tmp file to disk ready for processing"""
 
@@ -631,6 +668,7 @@ class CompositePerformer:
 
         self.set_dependencies()
         self.resolve_dependency_order()
+        self.set_stale_composites()
 
         results = {}
 
@@ -641,11 +679,13 @@ class CompositePerformer:
             }
 
         for slug in self.calculation_order:
-            raw_procedure = self.composite_tests[slug]
-            procedure = process_procedure(raw_procedure)
+            if slug not in self.stale_composites:
+                continue
+
+            procedure = self.composite_tests[slug]
             tb_limit = 5
             try:
-                code = compile(procedure, "__QAT+COMP_%s" % slug, "exec")
+                code = utils.compile_procedure(self.composite_ids[slug], procedure, "__QAT+COMP_%s" % slug)
                 exec(code, self.calculation_context)
                 key = "result" if "result" in self.calculation_context else slug
                 result = self.calculation_context[key]
@@ -691,11 +731,12 @@ class CompositePerformer:
                 }
 
                 for s in self.all_dependencies[slug]:
+                    calculated = s in self.composite_tests and s not in self.current_composites
                     incomplete_composite = (
-                        s in self.composite_tests and
+                        calculated and
                         (results.get(s) is None or results[s]['value'] is None or results[s]['error'])
                     )
-                    incomplete_simple = s not in self.composite_tests and self.data['tests'][s] in (None, "")
+                    incomplete_simple = not calculated and self.data['tests'][s] in (None, "")
 
                     if incomplete_simple or incomplete_composite:
                         results[slug]['error'] = None
@@ -734,6 +775,7 @@ class CompositePerformer:
         self.composite_tests = {
             t.slug: t.calculation_procedure for t in self.all_tests if filter_(t)
         }
+        self.composite_ids = {t.slug: t.pk for t in self.all_tests if filter_(t)}
 
     def set_test_types(self):
         """retrieve calculation procs for all composite tests"""
@@ -803,48 +845,95 @@ class CompositePerformer:
                 self.calculation_context[slug] = val
 
     def set_dependencies(self):
-        """figure out composite dependencies of composite tests"""
-
-        self.all_dependencies = {}
-        self.dependencies = {}
-        slugs = list(self.composite_tests.keys())
-        all_slugs = list(self.data['tests'].keys())
-        for slug in slugs:
-            tokens = utils.tokenize_composite_calc(self.composite_tests[slug])
-            comp_dependencies = [s for s in slugs if s in tokens and s != slug]
-            self.dependencies[slug] = set(comp_dependencies)
-            all_dependencies = [s for s in all_slugs if s in tokens and s != slug]
-            self.all_dependencies[slug] = set(all_dependencies)
+        """
+        figure out composite dependencies of composite tests.  The dependency
+        graph & calculation order for a test list are cached until one of its
+        tests or its membership changes
+        """
+
+        key = models.test_list_dependencies_cache_key(self.test_list.pk, bool(self.defaults))
+        graph = cache.get(key)
+        if graph is None:
+            all_slugs = [t.slug for t in self.all_tests]
+            dependencies, all_dependencies = utils.composite_dependencies(self.composite_tests, all_slugs)
+            calculation_order, cyclic_tests = utils.resolve_dependency_order(dependencies)
+            graph = {
+                'dependencies': dependencies,
+                'all_dependencies': all_dependencies,
+                'calculation_order': calculation_order,
+                'cyclic_tests': cyclic_tests,
+            }
+            cache.set(key, graph)
+
+        self.graph = graph
+        self.dependencies = graph['dependencies']
+
+        # only include dependencies for tests that are actually included in the data
+        all_slugs = set(self.data['tests'].keys())
+        self.all_dependencies = {slug: deps & all_slugs for slug, deps in graph['all_dependencies'].items()}
 
     def resolve_dependency_order(self):
-        """
-        Resolve calculation order dependencies using topological sort.
+        """Set calculation order & cyclic tests from the dependency graph. See
+        :func:`qa.utils.resolve_dependency_order`"""
 
-        This allows composite calculations to be calculated in the correct
-        order for situations where you have composites that depend on
-        other composites. For example, if A & B are both composite tests,
-        but A is a function of B, then B must be calculated before A.
-        Cyclical dependencies are also flagged.
+        self.calculation_order = self.graph['calculation_order']
+        self.cyclic_tests = self.graph['cyclic_tests']
 
-        See http://code.activestate.com/recipes/577413-topological-sort/
+    def set_stale_composites(self):
+        """
+        Determine which composite tests need to be recalculated.  If the
+        client includes a list of `changed` slugs in its request, only
+        composites which depend (directly or via other composites) on one
+        of those tests are recalculated and the current values for all
+        other composites are taken from the incoming test data. Otherwise
+        all composites are recalculated.
         """
 
-        #
-        data = dict(self.dependencies)
-        for k, v in list(data.items()):
-            v.discard(k)  # Ignore self dependencies
-        extra_items_in_deps = reduce(set.union, list(data.values())) - set(data.keys())
-        data.update(dict((item, set()) for item in extra_items_in_deps))
-        deps = []
-        while True:
-            ordered = set(item for item, dep in list(data.items()) if not dep)
-            if not ordered:
-                break
-            deps.extend(list(sorted(ordered)))
-            data = dict((item, (dep - ordered)) for item, dep in list(data.items()) if item not in ordered)
+        self.stale_composites = set(self.calculation_order)
+        self.current_composites = set()
+
+        changed = None if self.defaults else self.data.get("changed")
+        if changed is None:
+            return
+
+        changed = set(changed)
+        stale = set()
+        for slug in self.calculation_order:
+            deps = self.all_dependencies[slug]
+            if slug in changed or deps & changed or deps & stale:
+                stale.add(slug)
+
+        self.stale_composites = stale
+        self.current_composites = set(self.calculation_order) - stale
+
+        values = self.data.get("tests") or {}
+        for slug in self.current_composites:
+            self.calculation_context[slug] = values.get(slug)
+            if slug not in self.context_keys:
+                self.context_keys.append(slug)
+
+
+def _calculate_composites(user, data):
+    return CompositePerformer(user, data).calculate()
 
-        self.calculation_order = deps
-        self.cyclic_tests = list(data.keys())
+
+def calculate_composites(user, data):
+    """Calculate composite values using the calculation pool if enabled"""
+    try:
+        return calculation_pool.run(_calculate_composites, user, data)
+    except calculation_pool.CalculationError as e:
+        return {"success": False, "errors": [str(e)]}
+
+
+def calculate_upload(user, data):
+    """
+    Run the upload calculation procedure for the existing attachment with id
+    data['attachment_id']. Used for running upload calculations in the
+    calculation pool.
+    """
+    results = UploadHandler(user, data, None).process()
+    cleanup_matplotlib()
+    return results
 
 
 class CompositeCalculation(JSONResponseMixin, View):
@@ -863,7 +952,7 @@ class CompositeCalculation(JSONResponseMixin, View):
         except (ValueError):
             data = {}
 
-        result = CompositePerformer(self.request.user, data).calculate()
+        result = calculate_composites(self.request.user, data)
         return self.render_json_response(result)
 
 
@@ -5,6 +5,7 @@ from braces.views import JSONResponseMixin, PermissionRequiredMixin
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.db.models import Count, Q
 from django.db.transaction import atomic
 from django.http import Http404, HttpResponseRedirect, JsonResponse
@@ -24,6 +25,7 @@ from django.views.generic import (
 )
 import pytz
 
+from qatrack.qatrack_core.chrome import ChromeBusy
 from qatrack.qatrack_core.dates import format_datetime
 from qatrack.reports.qc.testlistinstance import TestListInstanceDetailsReport
 from qatrack.service_log.models import (
@@ -90,7 +92,11 @@ def test_list_instance_report(request, pk):
     }
     report = TestListInstanceDetailsReport(base_opts=base_opts, report_opts=report_opts, user=request.user)
 
-    return report.render_to_response(base_opts['report_format'])
+    try:
+        return report.render_to_response(base_opts['report_format'])
+    except ChromeBusy as e:
+        messages.error(request, str(e))
+        return HttpResponseRedirect(tli.get_absolute_url())
 
 
 class ReviewTestListInstance(PermissionRequiredMixin, BaseEditTestListInstance):
@@ -214,6 +220,8 @@ def review_test_list_instance(test_list_instance, test_instances, status_pks, re
             still_requires_review = True
         models.TestInstance.objects.filter(pk__in=test_instance_pks).update(status=status)
 
+    test_list_instance.update_summary_counts()
+
     # Handle Service Log items:
     #
     #    Change status of service events with status__requires_review = False to have default status if this
@@ -550,8 +558,6 @@ class DueDateOverview(PermissionRequiredMixin, TemplateView):
             "unit",
             "assigned_to",
         ).prefetch_related(
-            "last_instance__testinstance_set",
-            "last_instance__testinstance_set__status",
             "last_instance__modified_by",
             "tests_object",
         ).exclude(due_date=None).order_by(
@@ -661,11 +667,6 @@ class OverviewObjects(JSONResponseMixin, View):
             "last_instance",
             "frequency",
             "unit",
-            "assigned_to",
-        ).prefetch_related(
-            "last_instance__testinstance_set",
-            "last_instance__testinstance_set__status",
-            "last_instance__modified_by",
         ).order_by("frequency__nominal_interval", "unit__number", "name", )
 
         if request.GET.get('user') == 'true':
@@ -673,9 +674,39 @@ class OverviewObjects(JSONResponseMixin, View):
 
         return qs.distinct()
 
-    def get(self, request):
+    def get_last_instance_statuses(self, utcs):
+        """
+        Return dictionary of form {tli_id: {pass_fail: count}} for the last
+        instances of all input utcs using a single aggregate query
+        """
+
+        last_instance_ids = [utc.last_instance_id for utc in utcs if utc.last_instance_id]
+        counts = models.TestInstance.objects.filter(
+            test_list_instance_id__in=last_instance_ids,
+        ).order_by().values_list(
+            "test_list_instance_id",
+            "pass_fail",
+        ).annotate(Count("id"))
+
+        tli_counts = collections.defaultdict(dict)
+        for tli_id, pass_fail, count in counts:
+            tli_counts[tli_id][pass_fail] = count
+
+        # order statuses the same way as TestListInstance.pass_fail_status
+        return {
+            tli_id: {pf: pf_counts[pf] for pf, __ in models.PASS_FAIL_CHOICES if pf in pf_counts}
+            for tli_id, pf_counts in tli_counts.items()
+        }
 
-        qs = self.get_queryset(request)
+    def get_overview(self, request):
+
+        utcs = list(self.get_queryset(request))
+        last_instance_statuses = self.get_last_instance_statuses(utcs)
+
+        # group utcs by unit & frequency in a single pass
+        utcs_by_unit_freq = collections.defaultdict(list)
+        for utc in utcs:
+            utcs_by_unit_freq[(utc.unit_id, utc.frequency_id)].append(utc)
 
         units = Unit.objects.order_by("number")
         frequencies = list(models.Frequency.objects.order_by("nominal_interval")) + [None]
@@ -689,31 +720,42 @@ class OverviewObjects(JSONResponseMixin, View):
                 freq_name = freq.name if freq else _('Ad Hoc')
                 if freq_name not in unit_freqs:
                     unit_freqs[freq_name] = collections.OrderedDict()
-                for utc in qs:
-                    if utc.frequency == freq and utc.unit == unit:
-
-                        if utc.last_instance:
-                            last_instance_pfs = {}
-                            for lipfs in utc.last_instance.pass_fail_status():
-                                last_instance_pfs[lipfs[0]] = len(lipfs[2])
-                        else:
-                            last_instance_pfs = _('New List')
-
-                        ds = utc.due_status()
-                        last_completed = utc.last_instance.work_completed if utc.last_instance else None
-                        unit_freqs[freq_name][utc.name] = {
-                            'id': utc.pk,
-                            'url': reverse('review_utc', args=(utc.pk,)),
-                            'last_instance_status': last_instance_pfs,
-                            'last_instance_work_completed': last_completed,
-                            'due_date': utc.due_date,
-                            'due_status': ds
-                        }
-                        due_counts[ds] += 1
+                for utc in utcs_by_unit_freq.get((unit.pk, freq.pk if freq else None), []):
+
+                    if utc.last_instance:
+                        last_instance_pfs = last_instance_statuses.get(utc.last_instance_id, {})
+                    else:
+                        last_instance_pfs = _('New List')
+
+                    ds = utc.due_status()
+                    last_completed = utc.last_instance.work_completed if utc.last_instance else None
+                    unit_freqs[freq_name][utc.name] = {
+                        'id': utc.pk,
+                        'url': reverse('review_utc', args=(utc.pk,)),
+                        'last_instance_status': last_instance_pfs,
+                        'last_instance_work_completed': last_completed,
+                        'due_date': utc.due_date,
+                        'due_status': ds
+                    }
+                    due_counts[ds] += 1
 
             unit_lists[unit.number] = {'unit_freqs': unit_freqs, 'unit_name': unit.name, 'unit_id': unit.id}
 
-        return self.render_json_response({'unit_lists': unit_lists, 'due_counts': due_counts, 'success': True})
+        return {'unit_lists': unit_lists, 'due_counts': due_counts, 'success': True}
+
+    def get(self, request):
+
+        group_ids = None
+        if request.GET.get('user') == 'true':
+            group_ids = request.user.groups.values_list("pk", flat=True)
+
+        key = models.qc_overview_cache_key(group_ids)
+        overview = cache.get(key)
+        if overview is None:
+            overview = self.get_overview(request)
+            cache.set(key, overview, settings.QC_OVERVIEW_CACHE_TIMEOUT)
+
+        return self.render_json_response(overview)
 
 
 class UTCInstances(PermissionRequiredMixin, TestListInstances):
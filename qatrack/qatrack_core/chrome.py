@@ -0,0 +1,380 @@
+"""
+Pooled headless Chrome PDF rendering.
+
+Launching Chrome is by far the most expensive part of converting a report to
+PDF so rather than starting a new browser for every document (see
+:func:`qatrack.qatrack_core.utils.chrometopdf`), :func:`html_to_pdf` keeps a
+small per-process pool of long lived headless Chrome instances which are
+driven over the DevTools protocol when ``settings.CHROME_POOL_SIZE`` is
+greater than zero.  Each PDF is rendered in a new tab of an idle browser.
+
+The DevTools connection uses Chrome's ``--remote-debugging-pipe`` transport
+(NUL delimited JSON messages on file descriptors 3 & 4) so no extra
+dependencies are required.  If the pool is disabled (the default), pipes are
+not supported (Windows), or a pooled browser fails, the document is rendered
+by launching a new Chrome process exactly as before.
+"""
+
+import atexit
+import base64
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+
+from qatrack.qatrack_core.utils import chrometopdf
+
+logger = logging.getLogger('qatrack')
+
+# browsers are restarted after rendering this many documents to keep their
+# memory use in check
+MAX_RENDERS = 100
+
+# max number of seconds to wait for a browser to exit when shutting it down
+SHUTDOWN_TIMEOUT = 5
+
+PIPES_SUPPORTED = os.name == "posix"
+
+# Chrome reads DevTools commands from fd 3 and writes responses to fd 4.
+# subprocess can only map pipes onto stdin/stdout/stderr in the child (using
+# a preexec_fn isn't safe when the parent has other threads), so the pipes are
+# passed as stdin & stdout and moved onto fds 3 & 4 by the shell as it exec's
+# Chrome. Chrome's own stdout is sent to the stderr log.
+EXEC_WRAPPER = 'exec "$@" 3<&0 4>&1 0</dev/null 1>&2'
+
+# Page.printToPDF options matching the output of the --print-to-pdf command
+# line switch used by chrometopdf (which includes Chrome's default header &
+# footer with the date, title, url and page numbers)
+PRINT_TO_PDF_OPTIONS = {
+    'displayHeaderFooter': True,
+}
+
+
+class ChromeError(Exception):
+    """Raised when a pooled browser fails to render a document"""
+
+
+class ChromeTimeout(ChromeError):
+    """Raised when Chrome does not respond within settings.CHROME_PDF_TIMEOUT"""
+
+
+class ChromeBusy(Exception):
+    """Raised when too many documents are already waiting for a browser"""
+
+
+class ChromeBrowser:
+    """A headless Chrome process controlled over the DevTools pipe transport.
+    Instances are not thread safe; ChromePool ensures only one thread uses a
+    browser at a time."""
+
+    def __init__(self):
+
+        self.renders = 0
+        self._msg_id = 0
+        self._buffer = bytearray()
+        self._events = []
+
+        if not shutil.which(settings.CHROME_PATH):
+            raise ChromeError("Unable to launch chrome '%s'" % settings.CHROME_PATH)
+
+        try:
+            stderr = open(os.path.join(settings.LOG_ROOT, 'report-stderr.txt'), 'a')
+        except OSError as e:
+            raise ChromeError("Unable to open chrome log file: %s" % e)
+
+        self.profile_dir = tempfile.mkdtemp(prefix="qatrack-chrome-")
+
+        cmd_read, self._cmd_write = os.pipe()
+        self._resp_read, resp_write = os.pipe()
+
+        command = [
+            '/bin/sh',
+            '-c',
+            EXEC_WRAPPER,
+            'sh',
+            settings.CHROME_PATH,
+            '--headless',
+            '--disable-gpu',
+            '--no-sandbox',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--remote-debugging-pipe',
+            '--user-data-dir=%s' % self.profile_dir,
+            'about:blank',
+        ]
+
+        try:
+            self.process = subprocess.Popen(command, stdin=cmd_read, stdout=resp_write, stderr=stderr)
+        except OSError:
+            os.close(self._cmd_write)
+            os.close(self._resp_read)
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            raise ChromeError("Unable to launch chrome '%s'" % settings.CHROME_PATH)
+        finally:
+            os.close(cmd_read)
+            os.close(resp_write)
+            stderr.close()
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def _read_message(self, deadline):
+
+        while True:
+            end = self._buffer.find(b"\0")
+            if end >= 0:
+                message = bytes(self._buffer[:end])
+                del self._buffer[:end + 1]
+                return json.loads(message.decode("utf-8"))
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ChromeTimeout("Timed out waiting for chrome")
+
+            readable, __, __ = select.select([self._resp_read], [], [], remaining)
+            if readable:
+                data = os.read(self._resp_read, 1024 * 1024)
+                if not data:
+                    raise ChromeError("Chrome closed the DevTools connection")
+                self._buffer.extend(data)
+
+    def command(self, method, params=None, session_id=None, deadline=None):
+        """Send a DevTools command and return its result. Events received
+        while waiting for the response are kept for :meth:`wait_for_event`"""
+
+        deadline = deadline or time.monotonic() + settings.CHROME_PDF_TIMEOUT
+
+        self._msg_id += 1
+        msg_id = self._msg_id
+        message = {'id': msg_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+
+        data = json.dumps(message).encode("utf-8") + b"\0"
+        try:
+            while data:
+                written = os.write(self._cmd_write, data)
+                data = data[written:]
+        except OSError as e:
+            raise ChromeError("Unable to send command to chrome: %s" % e)
+
+        while True:
+            response = self._read_message(deadline)
+            if response.get("id") == msg_id:
+                if "error" in response:
+                    raise ChromeError("%s failed: %s" % (method, response['error'].get("message", "")))
+                return response.get("result", {})
+            elif "method" in response:
+                self._events.append(response)
+
+    def wait_for_event(self, method, session_id=None, deadline=None):
+        """Wait for (and return) the next event named method"""
+
+        deadline = deadline or time.monotonic() + settings.CHROME_PDF_TIMEOUT
+
+        while True:
+            for event in self._events:
+                if event['method'] == method and event.get("sessionId") == session_id:
+                    self._events.remove(event)
+                    return event
+            event = self._read_message(deadline)
+            if "method" in event:
+                self._events.append(event)
+
+    def print_to_pdf(self, url, deadline=None):
+        """Load url in a new tab and return it printed as PDF bytes"""
+
+        deadline = deadline or time.monotonic() + settings.CHROME_PDF_TIMEOUT
+
+        self.renders += 1
+        self._events = []
+
+        target = self.command("Target.createTarget", {'url': 'about:blank'}, deadline=deadline)['targetId']
+        session = self.command(
+            "Target.attachToTarget", {
+                'targetId': target,
+                'flatten': True
+            }, deadline=deadline
+        )['sessionId']
+
+        self.command("Page.enable", session_id=session, deadline=deadline)
+        navigation = self.command("Page.navigate", {'url': url}, session_id=session, deadline=deadline)
+        if navigation.get("errorText"):
+            raise ChromeError("Unable to load %s: %s" % (url, navigation['errorText']))
+        self.wait_for_event("Page.loadEventFired", session_id=session, deadline=deadline)
+
+        pdf = self.command("Page.printToPDF", PRINT_TO_PDF_OPTIONS, session_id=session, deadline=deadline)['data']
+        self.command("Target.closeTarget", {'targetId': target}, deadline=deadline)
+        self._events = []
+
+        return base64.b64decode(pdf)
+
+    def close(self):
+        """Shut down the browser process and clean up its profile"""
+
+        if self.alive:
+            try:
+                self.command("Browser.close", deadline=time.monotonic() + SHUTDOWN_TIMEOUT)
+            except ChromeError:
+                pass
+
+        for fd in (self._cmd_write, self._resp_read):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+        try:
+            self.process.wait(SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class ChromePool:
+    """A pool of up to size browsers which are launched as needed.  At most
+    queue_size documents may wait for a free browser at once and they will wait
+    at most timeout seconds before ChromeBusy is raised."""
+
+    browser_class = ChromeBrowser
+
+    def __init__(self, size, queue_size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._admission = threading.BoundedSemaphore(size + queue_size)
+
+        # slots are either an idle browser or None when a browser has not been
+        # launched yet (or was discarded)
+        self._slots = queue.LifoQueue()
+        for __ in range(size):
+            self._slots.put(None)
+
+    def _checkout(self):
+
+        try:
+            browser = self._slots.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ChromeBusy(_("Timed out waiting for the PDF renderer. Please try again."))
+
+        if browser is not None and (not browser.alive or browser.renders >= MAX_RENDERS):
+            browser.close()
+            browser = None
+
+        if browser is None:
+            try:
+                browser = self.browser_class()
+            except Exception:
+                self._slots.put(None)
+                raise
+
+        return browser
+
+    def render(self, url):
+        """Render url to a PDF using the next available browser"""
+
+        if not self._admission.acquire(blocking=False):
+            raise ChromeBusy(_("Too many PDFs are already waiting to be rendered. Please try again."))
+
+        try:
+            browser = self._checkout()
+            try:
+                pdf = browser.print_to_pdf(url, deadline=time.monotonic() + self.timeout)
+            except Exception:
+                # the browser is in an unknown state so don't reuse it
+                browser.close()
+                self._slots.put(None)
+                raise
+            self._slots.put(browser)
+            return pdf
+        finally:
+            self._admission.release()
+
+    def close(self):
+        """Shut down all idle browsers"""
+
+        while True:
+            try:
+                browser = self._slots.get_nowait()
+            except queue.Empty:
+                break
+            if browser is not None:
+                browser.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the pool for this process (creating it if necessary)"""
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            # browsers belonging to a parent process can't be shared after a fork
+            _pool = ChromePool(settings.CHROME_POOL_SIZE, settings.CHROME_POOL_QUEUE_SIZE, settings.CHROME_PDF_TIMEOUT)
+        return _pool
+
+
+@atexit.register
+def reset():
+    """Shut down the current pool. A new pool will be created on next use"""
+
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is not None and pool.pid == os.getpid():
+        pool.close()
+
+
+def enabled():
+    """Return True if PDFs should be rendered by the browser pool"""
+    return PIPES_SUPPORTED and bool(settings.CHROME_PATH) and settings.CHROME_POOL_SIZE > 0
+
+
+def html_to_pdf(html, name="", fallback_when_busy=True):
+    """Convert an html document to pdf using a pooled browser if possible,
+    falling back to launching a new chrome process.  If the pool is busy,
+    ChromeBusy is raised when fallback_when_busy is False (e.g. so a web
+    request can ask the user to try again), otherwise a new chrome process
+    is used."""
+
+    if not enabled():
+        return chrometopdf(html, name=name)
+
+    path = os.path.join(settings.TMP_REPORT_ROOT, "%s_%s.html" % (name or "report", uuid.uuid4().hex[:10]))
+    try:
+        with open(path, "wb") as f:
+            f.write(html.encode("UTF-8"))
+        return get_pool().render("file://%s" % path)
+    except ChromeBusy:
+        if not fallback_when_busy:
+            raise
+        logger.warning("Chrome pool busy rendering %s. Falling back to a new chrome process" % name)
+        return chrometopdf(html, name=name)
+    except Exception:
+        # anything from a browser crash to a malformed DevTools response
+        logger.exception("Pooled chrome failed to render %s. Falling back to a new chrome process" % name)
+        return chrometopdf(html, name=name)
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -1,12 +1,15 @@
+import functools
+import html
 import logging
-from io import BytesIO
+import re
 
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+import cssutils
 import pynliner
+from pynliner.soupselect import select
 
 logger = logging.getLogger('qatrack')
 
@@ -24,8 +27,69 @@ def email_context(context):
     return context
 
 
+@functools.lru_cache(maxsize=32)
+def parse_stylesheet(css):
+    """Parse css and return the stylesheet along with a tuple of (selector,
+    specificity, properties) for each style rule. Our email templates only
+    use a handful of distinct stylesheets so the (slow) parsing is cached."""
+
+    stylesheet = cssutils.CSSParser().parseString(css)
+    rules = []
+    for rule in stylesheet.cssRules.rulesOfType(cssutils.css.CSSRule.STYLE_RULE):
+        props = tuple((p.name, p.value) for p in rule.style.getProperties())
+        for selector in rule.selectorList:
+            rules.append((selector.selectorText, selector.specificity, props))
+    return stylesheet, tuple(rules)
+
+
+class EmailInliner(pynliner.Pynliner):
+    """Pynliner that uses cached stylesheets and applies styles without
+    building a cssutils declaration for every element"""
+
+    def _get_styles(self):
+        self._get_external_styles()
+        self._get_internal_styles()
+        for style_string in self.extra_style_strings:
+            self.style_string += style_string
+        self.stylesheet, self.rules = parse_stylesheet(self.style_string)
+
+    def _apply_styles(self):
+
+        elem_props = {}
+        for selector, specificity, props in self.rules:
+            for element in select(self.soup, selector):
+                elem_props.setdefault(id(element), (element, []))[1].append((specificity, props))
+
+        for element, prop_lists in elem_props.values():
+            # ascending (stable) sort by specificity so later rules win ties
+            style = {}
+            for __, props in sorted(prop_lists, key=lambda p: p[0]):
+                for name, value in props:
+                    style.pop(name, None)
+                    style[name] = value
+            style = "; ".join("%s: %s" % nv for nv in style.items())
+            if element.has_attr('style'):
+                style = "%s; %s" % (style, element['style'])
+            element['style'] = style
+
+    def get_text(self):
+        """Return the text content of the already parsed document. Must be
+        called after run since it removes the <style> tags from the soup"""
+        for tag in self.soup.find_all("style"):
+            tag.extract()
+        text = self.soup.get_text()
+        text = re.sub(pynliner.SUBSTITUTION_PATTERN, lambda m: self._substitutions[int(m.group(1))], text)
+        return html.unescape(text)
+
+
+def inline_css(html_content):
+    """Return html_content with its CSS inlined along with a plain text version"""
+    inliner = EmailInliner().from_string(html_content)
+    return inliner.run(), inliner.get_text()
+
+
 def send_email_to_users(
-    recipients, template, context=None, subject_template=None, text_template=None, attachments=None
+    recipients, template, context=None, subject_template=None, text_template=None, attachments=None, connection=None
 ):
 
     if len(recipients) == 0:
@@ -44,23 +108,22 @@ def send_email_to_users(
         subject = getattr(settings, "EMAIL_NOTIFICATION_SUBJECT", "QATrack+ Notification")
 
     html_content = render_to_string(template, context)
-    html_body = pynliner.fromString(html_content)
+    html_body, text_body = inline_css(html_content)
 
     if text_template:
         text_body = render_to_string(text_template, context)
-    else:
-        text_body = strip_tags(html_body)
 
     message = EmailMultiAlternatives(
         subject,
         text_body,
         from_address,
         recipients,
+        connection=connection,
     )
     message.attach_alternative(html_body, "text/html")
 
     for name, attachment, mimetype in attachments:
-        if isinstance(attachment, BytesIO):
+        if hasattr(attachment, "read"):
             attachment.seek(0)
             attachment = attachment.read()
         message.attach(name, attachment, mimetype)
@@ -1,3 +1,5 @@
+from datetime import time as dt_time
+
 from django.conf import settings
 from django.utils import timezone
 from recurrence.fields import RecurrenceField
@@ -16,10 +18,39 @@ DUE = "tolerance"
 OVERDUE = "action"
 
 
-def calc_due_date(completed, due_date, frequency):
+class RecurrenceCache:
+    """Memoizes recurrence expansions for calculating many due dates at once.
+    Rule sets are built once per (Frequency, dtstart) pair and the result of
+    each lookup is remembered so objects sharing a Frequency (and often a due
+    date) don't repeatedly expand the same recurrence."""
+
+    def __init__(self):
+        self._rulesets = {}
+        self._results = {}
+
+    def after(self, frequency, dt, dtstart):
+        """Equivalent to frequency.recurrences.after(dt, dtstart=dtstart)"""
+
+        key = (frequency.pk, dt, dtstart)
+        if key not in self._results:
+            ruleset_key = (frequency.pk, dtstart)
+            if ruleset_key not in self._rulesets:
+                self._rulesets[ruleset_key] = frequency.recurrences.to_dateutil_rruleset(dtstart=dtstart, cache=True)
+            self._results[key] = self._rulesets[ruleset_key].after(dt)
+        return self._results[key]
+
+
+def _after(frequency, dt, dtstart, cache=None):
+    if cache is not None:
+        return cache.after(frequency, dt, dtstart)
+    return frequency.recurrences.after(dt, dtstart=dtstart)
+
+
+def calc_due_date(completed, due_date, frequency, cache=None):
     """Calculate the next due date after completed for input frequency. If
     completed is prior to qc window the due date return will be the same as
-    input due_date."""
+    input due_date. cache is an optional RecurrenceCache to use when
+    calculating due dates for many objects."""
 
     # The behaviour of recurrence rules differs slightly depending on the
     # timezone of the datetimes so it's important datetimes are localized
@@ -34,39 +65,81 @@ def calc_due_date(completed, due_date, frequency):
 
     is_classic_offset = frequency.window_start is None
     if is_classic_offset or due_date is None:
-        return frequency.recurrences.after(completed, dtstart=completed)
+        return _after(frequency, completed, completed, cache)
 
     if due_date is None:
-        return calc_initial_due_date(completed, frequency)
+        return calc_initial_due_date(completed, frequency, cache)
 
     if should_update_schedule(completed, due_date, frequency):
 
         # ok, we're inside or beyond QC window so get next due date
-        next_due_date = frequency.recurrences.after(completed, dtstart=due_date)
+        next_due_date = _after(frequency, completed, due_date, cache)
 
         # now, it's possible that we performed the test long after the due
         # date and now we're inside the next QC window so we have to check
         # if we should move the next one!
         # See TestCalcDueDate.test_first_of_month_performed_long_after_inside_next_window
         if should_update_schedule(completed, next_due_date, frequency):
-            next_due_date = frequency.recurrences.after(next_due_date, dtstart=next_due_date)
+            next_due_date = _after(frequency, next_due_date, next_due_date, cache)
 
         return next_due_date
 
     return due_date
 
 
-def calc_initial_due_date(completed, frequency):
+def calc_initial_due_date(completed, frequency, cache=None):
     """if due date is None, check whether completed date falls within the
     window for the next occurence. If it does return second occurence,
     otherwise return next occurence."""
 
-    next_occurence = frequency.recurrences.after(completed, dtstart=completed)
+    next_occurence = _after(frequency, completed, completed, cache)
     if should_update_schedule(completed, next_occurence, frequency):
-        return frequency.recurrences.after(next_occurence, dtstart=next_occurence)
+        return _after(frequency, next_occurence, next_occurence, cache)
     return next_occurence
 
 
+def bulk_set_due_dates(objs, batch_size=500):
+    """Recalculate and save the due dates of many auto scheduled objects (e.g.
+    UnitTestCollections and/or ServiceEventSchedules) at once.  Last
+    instances are looked up with one query per batch, Frequencies are shared
+    between objects so their recurrences are only parsed and expanded once,
+    and due dates are written with bulk_update.  Returns the number of objects
+    whose due date changed."""
+
+    cache = RecurrenceCache()
+    frequencies = {}
+    by_model = {}
+    for obj in objs:
+        by_model.setdefault(obj._meta.model, []).append(obj)
+
+    changed = 0
+    for model, model_objs in by_model.items():
+
+        to_schedule = [o for o in model_objs if o.auto_schedule and o.frequency_id is not None]
+        frequency_model = model._meta.get_field("frequency").related_model
+        missing = {o.frequency_id for o in to_schedule} - set(frequencies)
+        frequencies.update(frequency_model.objects.in_bulk(missing))
+
+        for start in range(0, len(to_schedule), batch_size):
+            batch = to_schedule[start:start + batch_size]
+            last_completed = model.last_scheduling_dates([o.pk for o in batch])
+
+            updated = []
+            for obj in batch:
+                obj.frequency = frequencies[obj.frequency_id]
+                due_date = obj.due_date_after(last_completed.get(obj.pk), cache=cache)
+                if due_date is not None and due_date != obj.due_date:
+                    obj.due_date = due_date
+                    updated.append(obj)
+
+            model.objects.bulk_update(updated, ["due_date"])
+            changed += len(updated)
+            if updated:
+                model.due_dates_changed(updated)
+
+    return changed
+
+
 def qc_window(due_date, frequency):
     """Calculate the qc window around due_date for given frequency"""
 
@@ -89,6 +162,32 @@ def should_update_schedule(date, due_date, frequency):
     return start is None or start <= date
 
 
+def calc_next_run(recurrence, run_time, after=None):
+    """Return the first datetime after `after` (default now) that an object
+    scheduled to run at run_time on the days given by recurrence should run
+    at. Returns None if there are no further occurrences."""
+
+    if not recurrence or run_time is None:
+        return None
+
+    tz = timezone.get_current_timezone()
+    after = timezone.localtime(after or timezone.now(), tz)
+    day = after.date()
+
+    # recurrences occur at most once per day so if the run time on the first
+    # occurrence has already passed, the next occurrence will be on a later day
+    for __ in range(2):
+        occurrence = recurrence.after(tz.localize(timezone.datetime.combine(day, dt_time.min)), inc=True)
+        if occurrence is None:
+            return None
+        if timezone.is_aware(occurrence):
+            occurrence = timezone.localtime(occurrence, tz)
+        run = tz.localize(timezone.datetime.combine(occurrence.date(), run_time))
+        if run > after:
+            return run
+        day = occurrence.date() + timezone.timedelta(days=1)
+
+
 def calc_nominal_interval(recurrence):
     """Calculate avg number of days between tests for ordering purposes"""
     tz = timezone.get_current_timezone()
@@ -111,15 +210,43 @@ class SchedulingMixin:
 
         if self.auto_schedule and self.frequency:
             last_valid = self.last_instance_for_scheduling()
-            if not last_valid and self.last_instance:
+            return self.due_date_after(last_valid.work_completed if last_valid else None)
+
+        # return existing due date (could be None)
+        return self.due_date
+
+    def due_date_after(self, last_completed, cache=None):
+        """return the next due date given the completion time of the last
+        instance valid for scheduling (None if there isn't one)"""
+
+        if self.auto_schedule and self.frequency:
+            if not last_completed and self.last_instance_id:
                 # Done before but no valid lists
                 return timezone.now()
-            elif (last_valid and last_valid.work_completed):
-                return calc_due_date(last_valid.work_completed, self.due_date, self.frequency)
+            elif last_completed:
+                return calc_due_date(last_completed, self.due_date, self.frequency, cache=cache)
 
         # return existing due date (could be None)
         return self.due_date
 
+    @classmethod
+    def last_scheduling_dates(cls, pks):
+        """Return a dict mapping pk -> completion time of the last instance
+        valid for scheduling for each of the objects with the given pks.
+        This looks up each objects last instance individually so models
+        should override it with a single aggregate query."""
+
+        dates = {}
+        for obj in cls.objects.filter(pk__in=pks):
+            last_valid = obj.last_instance_for_scheduling()
+            if last_valid is not None:
+                dates[obj.pk] = last_valid.work_completed
+        return dates
+
+    @classmethod
+    def due_dates_changed(cls, objs):
+        """Called by bulk_set_due_dates after due dates of objs were updated"""
+
     def set_due_date(self, due_date=None):
         """Set due date field for this UTC. Note model is not saved to db.
         Saving be done manually"""
@@ -217,3 +344,26 @@ class RecurrenceFieldMixin:
                 if isinstance(field, (RecurrenceField,)):
                     models_with_recurrence.append((model, field.name))
         return models_with_recurrence
+
+
+class NextRunMixin(RecurrenceFieldMixin):
+    """A mixin for models which are run periodically at a given time of day
+    on the days given by their recurrence field (e.g. notices & report
+    schedules). The next time the object should run is stored in an indexed
+    `next_run` field which must be defined on the model, so that
+    `run_periodic_scheduler` can find objects that are due with a single
+    range query."""
+
+    time_field_name = "time"
+
+    def save(self, *args, **kwargs):
+        if not self.pk:
+            # recurrence must be localized before the next run is calculated
+            self.relocalize_recurrence()
+        self.next_run = self.calc_next_run()
+        super().save(*args, **kwargs)
+
+    def calc_next_run(self, after=None):
+        """Return the first datetime after `after` (default now) this object should run at"""
+        run_time = self._meta.get_field(self.time_field_name).to_python(getattr(self, self.time_field_name))
+        return calc_next_run(getattr(self, self.recurrence_field_name), run_time, after=after)
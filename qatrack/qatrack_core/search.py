@@ -0,0 +1,185 @@
+"""
+Fast lookups for autocomplete widgets.
+
+Autocompletes make a request on every keystroke so rather than running
+``icontains`` queries (which can't use an index) for each one:
+
+* integer ids are matched by prefix using a handful of range lookups on the
+  primary key index (see :func:`id_prefix_filter`), and
+* text fields are matched by normalized word prefix against a sorted per
+  process index (see :class:`AutocompleteIndex`) which is rebuilt when an
+  instance of the model is saved or deleted.  Results for recent queries are
+  kept in a small LRU cache.
+"""
+
+import bisect
+import functools
+import re
+import threading
+import unicodedata
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+# number of recent autocomplete queries to cache results for
+SEARCH_CACHE_SIZE = 256
+
+# index terms are truncated to this length to limit memory use
+MAX_TERM_LENGTH = 32
+
+DIGITS_RE = re.compile(r"^[0-9]+$")
+
+# start of each word (run of letters & digits)
+WORD_START_RE = re.compile(r"(?:^|(?<=[\W_]))[^\W_]")
+
+
+def normalize(text):
+    """Return text lower cased, stripped of accents and with runs of
+    whitespace collapsed to a single space"""
+
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def word_suffixes(text):
+    """Return the portions of (normalized) text starting at each word"""
+    return [text[m.start():] for m in WORD_START_RE.finditer(text)]
+
+
+def id_prefix_filter(q, max_id, field="pk"):
+    """Return a Q object matching objects whose integer field starts with
+    the digits in q (e.g. 12 matches 12, 120-129, 1200-1299 etc up to
+    max_id). Unlike ``field__icontains`` this is able to use the fields
+    index.  An empty query matches everything and a query which isn't a
+    number matches nothing."""
+
+    q = q.strip()
+    if not q:
+        return Q()
+
+    if not DIGITS_RE.match(q) or (q.startswith("0") and q != "0"):
+        return Q(**{"%s__in" % field: []})
+
+    prefix = int(q)
+    match = Q(**{field: prefix})
+    scale = 10
+    while 0 < prefix * scale <= max_id:
+        match |= Q(**{"%s__range" % field: (prefix * scale, prefix * scale + scale - 1)})
+        scale *= 10
+
+    return match
+
+
+class PrefixIndex:
+    """Sorted index of the words in one or more text fields of a list of
+    rows. Searching for a query returns the rows which have a field
+    containing a word which starts with the query."""
+
+    def __init__(self, rows):
+        """rows is an iterable of (pk, text1, text2...) tuples in the order
+        search results should be returned"""
+
+        self.pks = []
+        self.texts = []
+        entries = []
+        for position, (pk, *texts) in enumerate(rows):
+            texts = [normalize(t) for t in texts]
+            self.pks.append(pk)
+            self.texts.append(texts)
+            for text in texts:
+                entries.extend((suffix[:MAX_TERM_LENGTH], position) for suffix in word_suffixes(text))
+
+        entries.sort()
+        self.terms = [term for term, __ in entries]
+        self.positions = [position for __, position in entries]
+
+    def search(self, q, limit=None):
+        """Return up to limit pks of rows matching q"""
+
+        q = normalize(q)
+        if not q:
+            return self.pks[:limit]
+
+        term = q[:MAX_TERM_LENGTH]
+        matches = set()
+        for i in range(bisect.bisect_left(self.terms, term), len(self.terms)):
+            if not self.terms[i].startswith(term):
+                break
+            matches.add(self.positions[i])
+
+        if len(q) > MAX_TERM_LENGTH:
+            # terms are truncated so check the full text for long queries
+            matches = {
+                p for p in matches if any(s.startswith(q) for t in self.texts[p] for s in word_suffixes(t))
+            }
+
+        return [self.pks[p] for p in sorted(matches)][:limit]
+
+
+class AutocompleteIndex:
+    """A PrefixIndex of the fields of all instances of model ordered by
+    order_by. The index is built on first use in each process and rebuilt
+    after an instance of the model is saved or deleted in any process."""
+
+    def __init__(self, model, fields, order_by="pk"):
+
+        self.model = model
+        self.fields = fields
+        self.order_by = order_by
+        self._index = None
+        self._version = None
+        self._lock = threading.Lock()
+
+        uid = "qatrack.qatrack_core.search.%s" % model._meta.label_lower
+        post_save.connect(self._changed, sender=model, weak=False, dispatch_uid="%s.save" % uid)
+        post_delete.connect(self._changed, sender=model, weak=False, dispatch_uid="%s.delete" % uid)
+
+    @property
+    def cache_key(self):
+        return settings.CACHE_AUTOCOMPLETE_VERSION_.format(self.model._meta.label_lower)
+
+    def version(self):
+        """Return a stamp which changes when any instance of the model changes"""
+
+        version = cache.get(self.cache_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(self.cache_key, version, settings.MAX_CACHE_TIMEOUT):
+                version = cache.get(self.cache_key, version)
+        return version
+
+    def invalidate(self):
+        cache.set(self.cache_key, uuid.uuid4().hex, settings.MAX_CACHE_TIMEOUT)
+
+    def _changed(self, sender, **kwargs):
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not set(update_fields) & set(self.fields):
+            return
+
+        self.invalidate()
+        # invalidate again once committed in case another process rebuilt
+        # its index before the change was visible to it
+        transaction.on_commit(self.invalidate)
+
+    def get_index(self, version):
+        with self._lock:
+            if self._index is None or self._version != version:
+                rows = self.model.objects.order_by(self.order_by, "pk").values_list("pk", *self.fields)
+                self._index = PrefixIndex(rows)
+                self._version = version
+            return self._index
+
+    def search(self, q, limit=None):
+        """Return a list of up to limit pks of instances matching q"""
+        return list(_cached_search(self, self.version(), normalize(q), limit))
+
+
+@functools.lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _cached_search(index, version, q, limit):
+    return tuple(index.get_index(version).search(q, limit))
@@ -2,14 +2,11 @@ from functools import wraps
 import logging
 import os
 
-from django.conf import settings
 from django.db import ProgrammingError, connection
 from django.utils import timezone
 from django_q.models import Schedule
 from django_q.tasks import schedule
 
-from qatrack.qatrack_core.utils import today_start_end
-
 logger = logging.getLogger('django-q')
 
 
@@ -66,10 +63,11 @@ def _schedule_periodic_task(function, task_name, interval_min=None, next_run=Non
 
 
 @qatrack_task_wrapper
-def run_periodic_scheduler(model, log_name, handler, time_field="time", recurrence_field="recurrence"):
+def run_periodic_scheduler(model, log_name, handler):
     """Check a model with a recurring schedule for instances that should be run in the next time period.
 
-        model: the Django model to check,
+        model: the Django model to check. Must use
+        qatrack.qatrack_core.scheduling.NextRunMixin,
 
         log_name: short description to include in log strings,
 
@@ -78,46 +76,32 @@ def run_periodic_scheduler(model, log_name, handler, time_field="time", recurren
         datetime when the task should be scheduled for. The handler function
         should perform the actual scheduling of the task.
 
-        time_field: The name of the field that holds what time the task should be run
-        recurrence_field: The name of the field that holds the recurrence field
+    After an instance is handled its next_run is advanced to its following
+    occurrence so each run is only scheduled once.
     """
 
-    start_today, end_today = today_start_end()
-    now = timezone.localtime(timezone.now()).replace(tzinfo=None)
-    start_time, end_time = (now, now + timezone.timedelta(minutes=15))
-
-    logger.info("Running %s task at %s for notices between %s and %s" % (log_name, now, start_time, end_time))
+    start_time = timezone.now()
+    end_time = start_time + timezone.timedelta(minutes=15)
 
-    # first narrow down notices to those supposed to run in this 15 minute block
-    instances = model.objects.filter(
-        **{
-            "%s__gte" % time_field: start_time.strftime("%H:%M"),
-            "%s__lte" % time_field: end_time.strftime("%H:%M"),
-        }
-    )
+    logger.info("Running %s task for notices between %s and %s" % (log_name, start_time, end_time))
 
-    if settings.DEBUG:  # pragma: nocover
-        instances = model.objects.all()
+    # next_run is indexed so this is a single range query regardless of how
+    # many instances exist
+    instances = model.objects.filter(next_run__lte=end_time).order_by("next_run")
 
-    # now look at recurrences occuring today and see if they should be sent now
     for instance in instances:
 
-        # since our recurrence can only occur with a maximum frequency of 1 /
-        # day, between will just return ~timezone.now() if the report is to be
-        # sent today.  If we make reports available at a higher frequency this
-        # check will need to be adjusted.
-        # note: inc=True required to catch daily recurrences
-        occurences = getattr(instance, recurrence_field).between(start_today, end_today, inc=True)
-        logger.info(
-            "Occurences for %s %s: %s (between %s & %s)" % (
-                model._meta.model_name,
-                instance.id,
-                occurences,
-                start_today,
-                end_today,
-            )
-        )
-        if occurences and start_time.time() <= getattr(instance, time_field) <= end_time.time():
-            tz = timezone.get_current_timezone()
-            send_time = tz.localize(timezone.datetime.combine(start_today, getattr(instance, time_field)))
-            handler(instance, send_time)
+        next_run = instance.next_run
+        if next_run < start_time:
+            # run time was missed (e.g. the cluster wasn't running) so skip
+            # ahead to the next run time rather than sending late
+            logger.info("Missed run of %s %s at %s" % (model._meta.model_name, instance.id, next_run))
+            next_run = instance.calc_next_run(after=start_time - timezone.timedelta(microseconds=1))
+
+        if next_run is not None and next_run <= end_time:
+            logger.info("Scheduling %s %s for %s" % (model._meta.model_name, instance.id, next_run))
+            handler(instance, timezone.localtime(next_run))
+            next_run = instance.calc_next_run(after=next_run)
+
+        # use update so the next run isn't recalculated relative to now by save
+        model.objects.filter(pk=instance.pk).update(next_run=next_run)
@@ -0,0 +1,177 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import TestCase
+from django.test.utils import override_settings
+import pytest
+
+from qatrack.qatrack_core import chrome
+
+# minimal stand in for Chrome which speaks the DevTools pipe protocol
+FAKE_CHROME = """#!%s
+import base64, json, os, sys
+
+buf = b""
+while True:
+    data = os.read(3, 65536)
+    if not data:
+        break
+    buf += data
+    while b"\\0" in buf:
+        raw, buf = buf.split(b"\\0", 1)
+        msg = json.loads(raw.decode())
+        method, result, events = msg["method"], {}, []
+        if method == "Target.createTarget":
+            result = {"targetId": "T1"}
+        elif method == "Target.attachToTarget":
+            result = {"sessionId": "S1"}
+        elif method == "Page.navigate":
+            if "fail" in msg["params"]["url"]:
+                os._exit(1)
+            if "malformed" in msg["params"]["url"]:
+                os.write(4, b"not json\\0")
+                continue
+            events = [{"method": "Page.loadEventFired", "params": {}, "sessionId": "S1"}]
+        elif method == "Page.printToPDF":
+            result = {"data": base64.b64encode(b"%%PDF-fake").decode()}
+        elif method == "Browser.close":
+            sys.exit(0)
+        # send events before the response to make sure they are buffered
+        for out in events + [{"id": msg["id"], "result": result}]:
+            os.write(4, json.dumps(out).encode() + b"\\0")
+"""
+
+
+@pytest.mark.skipif(not chrome.PIPES_SUPPORTED, reason="pipe transport not supported")
+class TestChromePool(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.fake_chrome = os.path.join(cls.tmp_dir, "fake-chrome")
+        with open(cls.fake_chrome, "w") as f:
+            f.write(FAKE_CHROME % sys.executable)
+        os.chmod(cls.fake_chrome, 0o755)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def tearDown(self):
+        chrome.reset()
+
+    @override_settings(CHROME_POOL_SIZE=0)
+    @mock.patch("qatrack.qatrack_core.chrome.chrometopdf", return_value=b"pdf")
+    def test_disabled_uses_subprocess(self, chrometopdf):
+        assert not chrome.enabled()
+        assert chrome.html_to_pdf("<html></html>", name="foo") == b"pdf"
+        chrometopdf.assert_called_once_with("<html></html>", name="foo")
+
+    def test_browser_print_to_pdf(self):
+        with override_settings(CHROME_PATH=self.fake_chrome):
+            browser = chrome.ChromeBrowser()
+        try:
+            assert browser.print_to_pdf("file:///tmp/foo.html") == b"%PDF-fake"
+            assert browser.renders == 1
+        finally:
+            browser.close()
+        assert not browser.alive
+        assert not os.path.exists(browser.profile_dir)
+
+    def test_pool_reuses_browser(self):
+        with override_settings(CHROME_PATH=self.fake_chrome, CHROME_POOL_SIZE=1):
+            assert chrome.enabled()
+            pool = chrome.get_pool()
+            assert chrome.html_to_pdf("<html></html>") == b"%PDF-fake"
+            browser = pool._slots.queue[0]
+            assert chrome.html_to_pdf("<html></html>") == b"%PDF-fake"
+            assert pool._slots.queue[0] is browser
+            assert browser.renders == 2
+
+    def test_pool_recycles_browser(self):
+        with override_settings(CHROME_PATH=self.fake_chrome, CHROME_POOL_SIZE=1):
+            pool = chrome.get_pool()
+            chrome.html_to_pdf("<html></html>")
+            browser = pool._slots.queue[0]
+            browser.renders = chrome.MAX_RENDERS
+            chrome.html_to_pdf("<html></html>")
+            assert pool._slots.queue[0] is not browser
+            assert not browser.alive
+
+    @mock.patch("qatrack.qatrack_core.chrome.chrometopdf", return_value=b"fallback")
+    def test_browser_failure_falls_back(self, chrometopdf):
+        with override_settings(CHROME_PATH=self.fake_chrome, CHROME_POOL_SIZE=1):
+            pool = chrome.get_pool()
+            assert chrome.html_to_pdf("<html></html>", name="fail") == b"fallback"
+            assert chrometopdf.called
+            # failed browser is discarded
+            assert pool._slots.queue == [None]
+
+    @mock.patch("qatrack.qatrack_core.chrome.chrometopdf", return_value=b"fallback")
+    def test_malformed_response_falls_back(self, chrometopdf):
+        with override_settings(CHROME_PATH=self.fake_chrome, CHROME_POOL_SIZE=1):
+            assert chrome.html_to_pdf("<html></html>", name="malformed") == b"fallback"
+
+    @mock.patch("qatrack.qatrack_core.chrome.chrometopdf", return_value=b"fallback")
+    def test_missing_log_dir_falls_back(self, chrometopdf):
+        log_root = os.path.join(self.tmp_dir, "missing")
+        with override_settings(CHROME_PATH=self.fake_chrome, CHROME_POOL_SIZE=1, LOG_ROOT=log_root):
+            assert chrome.html_to_pdf("<html></html>") == b"fallback"
+
+    def test_print_options(self):
+        with override_settings(CHROME_PATH=self.fake_chrome):
+            browser = chrome.ChromeBrowser()
+        try:
+            with mock.patch.object(browser, "command", wraps=browser.command) as command:
+                browser.print_to_pdf("file:///tmp/foo.html")
+        finally:
+            browser.close()
+        command.assert_any_call("Page.printToPDF", chrome.PRINT_TO_PDF_OPTIONS, session_id="S1", deadline=mock.ANY)
+
+    def test_busy(self):
+        pool = chrome.ChromePool(size=1, queue_size=0, timeout=1)
+        pool._admission.acquire()
+        with pytest.raises(chrome.ChromeBusy):
+            pool.render("file:///tmp/foo.html")
+
+    @mock.patch("qatrack.qatrack_core.chrome.chrometopdf", return_value=b"fallback")
+    def test_busy_falls_back(self, chrometopdf):
+        with override_settings(CHROME_PATH=self.fake_chrome, CHROME_POOL_SIZE=1, CHROME_POOL_QUEUE_SIZE=0):
+            chrome.get_pool()._admission.acquire()
+            assert chrome.html_to_pdf("<html></html>", name="busy") == b"fallback"
+            with pytest.raises(chrome.ChromeBusy):
+                chrome.html_to_pdf("<html></html>", name="busy", fallback_when_busy=False)
+
+    def test_missing_chrome(self):
+        with override_settings(CHROME_PATH=os.path.join(self.tmp_dir, "missing")):
+            with pytest.raises(chrome.ChromeError):
+                chrome.ChromeBrowser()
+
+    def test_wait_timeout(self):
+        pool = chrome.ChromePool(size=1, queue_size=1, timeout=0.01)
+        pool._slots.get()
+        with pytest.raises(chrome.ChromeBusy):
+            pool.render("file:///tmp/foo.html")
+
+    def test_concurrent_renders(self):
+        results = []
+        with override_settings(CHROME_PATH=self.fake_chrome, CHROME_POOL_SIZE=2, CHROME_POOL_QUEUE_SIZE=4):
+            pool = chrome.get_pool()
+
+            def render():
+                results.append(pool.render("file:///tmp/foo.html"))
+
+            threads = [threading.Thread(target=render) for __ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert results == [b"%PDF-fake"] * 4
+        assert len([b for b in pool._slots.queue if b is not None]) <= 2
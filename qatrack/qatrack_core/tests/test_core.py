@@ -8,9 +8,11 @@ from django.urls import reverse
 from django.utils import timezone
 import numpy as np
 import pandas as pd
+import pynliner
 import pytz
 
 from qatrack.qa.tests import utils
+from qatrack.qatrack_core.email import inline_css, parse_stylesheet
 from qatrack.qatrack_core.serializers import QATrackJSONEncoder
 from qatrack.qatrack_core.utils import end_of_day, relative_dates, start_of_day
 
@@ -35,6 +37,30 @@ class TestLoginViews(TestCase):
         assert "/accounts/reset/done/" in resp.redirect_chain[0]
 
 
+class TestInlineCSS:
+
+    html = (
+        "<html><head><title>Title</title><style>p { color: red } p.x { color: blue; font-weight: bold }"
+        "@media only screen and (max-width: 620px) { p { color: green } }</style></head>"
+        "<body><p class='x' style='margin: 0'>Tom &amp; Jerry</p><p>Two</p></body></html>"
+    )
+
+    def test_matches_pynliner(self):
+        html, __ = inline_css(self.html)
+        assert html == pynliner.fromString(self.html)
+
+    def test_text(self):
+        __, text = inline_css(self.html)
+        assert text == "TitleTom & JerryTwo"
+
+    def test_stylesheet_cached(self):
+        parse_stylesheet.cache_clear()
+        inline_css(self.html)
+        inline_css(self.html)
+        info = parse_stylesheet.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+
 class TestJSONEncoder:
 
     def test_np_int(self):
@@ -5,8 +5,12 @@ import pytz
 import recurrence
 
 from qatrack.qa import models
+# connects the receiver which reschedules when a frequency is edited
+from qatrack.qa import signals  # NOQA: F401
 from qatrack.qa.tests import utils as qautils
 from qatrack.qatrack_core import dates, scheduling
+from qatrack.service_log import models as sl_models
+from qatrack.service_log.tests import utils as sl_utils
 
 
 class TestDateFunctions:
@@ -420,6 +424,116 @@ class TestCalcDueDate(TestCase):
 
 
 
+class TestRecurrenceCache(TestCase):
+
+    def test_after_matches_recurrence(self):
+        freq = qautils.create_frequency(interval=3)
+        cache = scheduling.RecurrenceCache()
+        tz = timezone.get_current_timezone()
+        dtstart = tz.localize(timezone.datetime(2020, 1, 1, 8))
+        for day in range(10):
+            dt = dtstart + timezone.timedelta(days=day, hours=3)
+            expected = freq.recurrences.after(dt, dtstart=dtstart)
+            assert cache.after(freq, dt, dtstart) == expected
+            assert cache.after(freq, dt, dtstart) == expected
+
+    def test_calc_due_date_with_cache(self):
+        freq = qautils.create_frequency(interval=7)
+        freq.window_start = 1
+        cache = scheduling.RecurrenceCache()
+        tz = timezone.get_current_timezone()
+        due = tz.localize(timezone.datetime(2020, 1, 8))
+        for day in range(14):
+            completed = tz.localize(timezone.datetime(2020, 1, 1, 12)) + timezone.timedelta(days=day)
+            expected = scheduling.calc_due_date(completed, due, freq)
+            assert scheduling.calc_due_date(completed, due, freq, cache=cache) == expected
+
+
+class TestBulkSetDueDates(TestCase):
+
+    def setUp(self):
+        self.freq = qautils.create_frequency()
+        self.status = qautils.create_status()
+        self.utcs = [qautils.create_unit_test_collection(frequency=self.freq) for __ in range(3)]
+        now = timezone.now()
+        for i, utc in enumerate(self.utcs[:2]):
+            tli = qautils.create_test_list_instance(
+                unit_test_collection=utc, work_completed=now - timezone.timedelta(days=i)
+            )
+            qautils.create_test_instance(tli, status=self.status)
+            tli.save()
+
+    def test_matches_set_due_date(self):
+        models.UnitTestCollection.objects.update(due_date=None)
+        expected = {}
+        for utc in self.utcs:
+            utc.refresh_from_db()
+            expected[utc.pk] = utc.calc_due_date()
+
+        changed = scheduling.bulk_set_due_dates(models.UnitTestCollection.objects.all())
+
+        assert changed == 2
+        for utc in models.UnitTestCollection.objects.all():
+            assert utc.due_date == expected[utc.pk]
+
+    def test_unscheduled_ignored(self):
+        models.UnitTestCollection.objects.update(due_date=None, auto_schedule=False)
+        assert scheduling.bulk_set_due_dates(models.UnitTestCollection.objects.all()) == 0
+        assert not models.UnitTestCollection.objects.exclude(due_date=None).exists()
+
+    def test_default_last_scheduling_dates(self):
+        pks = [utc.pk for utc in self.utcs]
+        default = scheduling.SchedulingMixin.last_scheduling_dates.__func__(models.UnitTestCollection, pks)
+        assert len(default) == 2
+        assert default == models.UnitTestCollection.last_scheduling_dates(pks)
+
+    def test_frequency_edit_reschedules(self):
+        models.UnitTestCollection.objects.update(due_date=None)
+        self.freq.window_end += 1
+        self.freq.save()
+        performed = models.UnitTestCollection.objects.filter(pk__in=[utc.pk for utc in self.utcs[:2]])
+        assert not performed.filter(due_date=None).exists()
+
+    def test_service_event_schedules(self):
+        ses = sl_utils.create_service_event_schedule(frequency=self.freq)
+        se = sl_utils.create_service_event(unit_service_area=ses.unit_service_area)
+        se.service_event_schedule = ses
+        se.save()
+        sl_models.ServiceEventSchedule.objects.update(due_date=None)
+
+        ses.refresh_from_db()
+        expected = ses.calc_due_date()
+        assert scheduling.bulk_set_due_dates([ses]) == 1
+        ses.refresh_from_db()
+        assert ses.due_date == expected
+
+
+class TestCalcNextRun(TestCase):
+
+    def setUp(self):
+        self.tz = timezone.get_current_timezone()
+        self.recurrence = recurrence.deserialize("RRULE:FREQ=WEEKLY;BYDAY=MO")
+        self.recurrence.dtstart = self.tz.localize(timezone.datetime(2012, 1, 1))
+
+    def test_later_today(self):
+        after = self.tz.localize(timezone.datetime(2026, 10, 19, 7))
+        next_run = scheduling.calc_next_run(self.recurrence, timezone.datetime(2026, 1, 1, 8).time(), after)
+        assert next_run == self.tz.localize(timezone.datetime(2026, 10, 19, 8))
+
+    def test_passed_today(self):
+        after = self.tz.localize(timezone.datetime(2026, 10, 19, 8))
+        next_run = scheduling.calc_next_run(self.recurrence, timezone.datetime(2026, 1, 1, 8).time(), after)
+        assert next_run == self.tz.localize(timezone.datetime(2026, 10, 26, 8))
+
+    def test_no_occurrences(self):
+        rec = recurrence.deserialize("")
+        rec.dtstart = self.tz.localize(timezone.datetime(2012, 1, 1))
+        assert scheduling.calc_next_run(rec, timezone.datetime(2026, 1, 1, 8).time()) is None
+
+    def test_no_time(self):
+        assert scheduling.calc_next_run(self.recurrence, None) is None
+
+
 class TestRelocalizeRecurrences(TestCase):
 
     def test_find_models_with_recurrence(self):
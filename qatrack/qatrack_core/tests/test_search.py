@@ -0,0 +1,107 @@
+from django.test import TestCase
+
+from qatrack.faults.models import FaultType, fault_type_search
+from qatrack.qatrack_core import search
+from qatrack.service_log import models as sl_models
+from qatrack.service_log.tests import utils as sl_utils
+
+
+class TestNormalize:
+
+    def test_normalize(self):
+        assert search.normalize("  Café\tÖLÉ  x ") == "cafe ole x"
+
+    def test_none(self):
+        assert search.normalize(None) == ""
+
+
+class TestIdPrefixFilter(TestCase):
+
+    def setUp(self):
+        self.usa = sl_utils.create_unit_service_area()
+        self.se_ids = [
+            sl_utils.create_service_event(unit_service_area=self.usa, problem_description="%d" % i).pk
+            for i in range(12)
+        ]
+
+    def filter(self, q):
+        max_id = max(self.se_ids)
+        qs = sl_models.ServiceEvent.objects.filter(search.id_prefix_filter(q, max_id, "id"))
+        return sorted(qs.values_list("id", flat=True))
+
+    def test_prefix(self):
+        pk = self.se_ids[0]
+        expected = [se_id for se_id in self.se_ids if str(se_id).startswith(str(pk))]
+        assert self.filter(str(pk)) == expected
+
+    def test_ranges(self):
+        q = search.id_prefix_filter("12", 15000)
+        assert q.children == [
+            ("pk", 12),
+            ("pk__range", (120, 129)),
+            ("pk__range", (1200, 1299)),
+            ("pk__range", (12000, 12999)),
+        ]
+
+    def test_empty(self):
+        assert self.filter(" ") == sorted(self.se_ids)
+
+    def test_not_a_number(self):
+        assert self.filter("1a") == []
+
+    def test_leading_zero(self):
+        assert self.filter("01") == []
+
+
+class TestPrefixIndex:
+
+    def setup_method(self):
+        self.index = search.PrefixIndex([
+            (1, "find_1", ""),
+            (2, "a part to find", "bolt"),
+            (3, "Café Olé", ""),
+        ])
+
+    def test_word_prefix(self):
+        assert self.index.search("FIND") == [1, 2]
+
+    def test_second_field(self):
+        assert self.index.search("bol") == [2]
+
+    def test_normalized(self):
+        assert self.index.search("cafe  ole") == [3]
+
+    def test_empty(self):
+        assert self.index.search("") == [1, 2, 3]
+
+    def test_limit(self):
+        assert self.index.search("find", limit=1) == [1]
+
+    def test_no_match(self):
+        assert self.index.search("zz") == []
+
+    def test_long_query(self):
+        prefix = "word " * 10
+        index = search.PrefixIndex([(1, prefix + "alpha"), (2, prefix + "beta")])
+        assert index.search(prefix + "al") == [1]
+
+
+class TestAutocompleteIndex(TestCase):
+
+    def test_rebuilt_on_save(self):
+        ft = FaultType.objects.create(code="abc")
+        assert fault_type_search.search("ab") == [ft.pk]
+        ft.code = "xyz"
+        ft.save()
+        assert fault_type_search.search("ab") == []
+        assert fault_type_search.search("xy") == [ft.pk]
+
+    def test_rebuilt_on_delete(self):
+        ft = FaultType.objects.create(code="abc")
+        assert fault_type_search.search("ab") == [ft.pk]
+        ft.delete()
+        assert fault_type_search.search("ab") == []
+
+    def test_ordered(self):
+        fts = [FaultType.objects.create(code=code) for code in ["b", "c", "a"]]
+        assert fault_type_search.search("") == [fts[2].pk, fts[0].pk, fts[1].pk]
@@ -17,3 +17,5 @@ class ReportsConfig(AppConfig):
 
     def ready(self):
         post_migrate.connect(do_scheduling, sender=self)
+
+        from qatrack.reports import signals  # noqa: F401
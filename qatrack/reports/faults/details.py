@@ -107,9 +107,9 @@ class FaultDetailsReport(FaultReportMixin, BaseReport):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         header = [
             _("Fault ID"),
@@ -128,7 +128,7 @@ class FaultDetailsReport(FaultReportMixin, BaseReport):
             _("Link"),
         ]
 
-        rows.append(header)
+        yield header
 
         for site, faults in context['sites_data']:
             for fault in faults:
@@ -158,6 +158,4 @@ class FaultDetailsReport(FaultReportMixin, BaseReport):
                     fault['link'],
                 ]
 
-                rows.append(row)
-
-        return rows
+                yield row
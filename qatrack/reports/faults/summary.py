@@ -141,9 +141,9 @@ class FaultSummaryReport(FaultReportMixin, BaseReport):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         header = [
             _("Fault ID"),
@@ -155,7 +155,7 @@ class FaultSummaryReport(FaultReportMixin, BaseReport):
             _("Link"),
         ]
 
-        rows.append(header)
+        yield header
 
         for site, faults in context['sites_data']:
             for fault in faults:
@@ -169,6 +169,4 @@ class FaultSummaryReport(FaultReportMixin, BaseReport):
                     fault['link'],
                 ]
 
-                rows.append(row)
-
-        return rows
+                yield row
@@ -0,0 +1,130 @@
+"""
+Background report generation.
+
+:func:`start_job` records a :class:`~qatrack.reports.models.ReportJob` for a
+validated report and queues :func:`qatrack.reports.tasks.run_report_job` on
+the django-q cluster. Jobs are keyed by the report type, format, options,
+user and a data version stamp (see :func:`data_version`) so that requesting an
+identical report while its data is unchanged reuses the previously generated
+file rather than rendering it again.
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone, translation
+from django.utils.module_loading import import_string
+from django_q.tasks import async_task
+
+from qatrack.reports import models
+
+logger = logging.getLogger('qatrack')
+
+
+def data_version():
+    """Return a stamp which changes whenever the data reports are generated
+    from may have changed. This includes the QC overview version which is
+    updated when units, assignments or frequencies change or due dates are
+    recalculated in bulk, and the local date since
+    relative date ranges (e.g. "Last 30 days") change daily."""
+
+    version = cache.get(settings.CACHE_REPORT_DATA_VERSION)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(settings.CACHE_REPORT_DATA_VERSION, version, None):
+            version = cache.get(settings.CACHE_REPORT_DATA_VERSION, version)
+
+    qc_version = cache.get(settings.CACHE_QC_OVERVIEW_VERSION, "")
+    today = timezone.localtime(timezone.now()).date().isoformat()
+    return "%s-%s-%s" % (version, qc_version, today)
+
+
+def clear_report_cache():
+    """Invalidate all previously generated report files. Called by the
+    receivers in :mod:`qatrack.reports.signals` when report data changes"""
+    cache.set(settings.CACHE_REPORT_DATA_VERSION, uuid.uuid4().hex, None)
+
+
+def job_cache_key(report_type, report_format, base_opts, filters, notes, user):
+    """Return a hash of all the options which determine a reports content"""
+
+    opts = {
+        'report_type': report_type,
+        'report_format': report_format,
+        'base_opts': base_opts,
+        'filters': filters,
+        'notes': notes,
+        'user': user.pk,
+        'version': data_version(),
+        'language': translation.get_language(),
+    }
+    return hashlib.sha256(json.dumps(opts, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def start_job(report, report_format, filters, user):
+    """Return a ReportJob for rendering report in report_format. If an
+    identical report is already available or being generated, that job is
+    returned rather than starting a new one. filters is the serialized filter
+    form data for the report."""
+
+    base_opts = {k: report.base_opts.get(k) for k in ("title", "include_signature", "report_id")}
+    notes = [
+        {'heading': n.get('heading', ""), 'content': n.get('content', "")}
+        for n in report.notes if n and not n.get("DELETE")
+    ]
+    filters = json.loads(filters) if isinstance(filters, str) else filters
+
+    key = job_cache_key(report.report_type, report_format, base_opts, filters, notes, user)
+    existing = models.ReportJob.objects.reusable().filter(cache_key=key, created_by=user).order_by("-created").first()
+    if existing:
+        return existing
+
+    delete_expired_jobs()
+
+    job = models.ReportJob.objects.create(
+        report_type=report.report_type,
+        report_format=report_format,
+        base_opts=base_opts,
+        filters=filters,
+        notes=json.dumps(notes),
+        cache_key=key,
+        created_by=user,
+    )
+    enqueue(job)
+    return job
+
+
+def enqueue(job):
+    """Run the job either in a django-q worker or immediately depending on
+    settings.REPORT_JOBS_ASYNC"""
+
+    func = "qatrack.reports.tasks.run_report_job"
+    if not settings.REPORT_JOBS_ASYNC:
+        import_string(func)(job.pk)
+        return
+
+    def queue():
+        try:
+            async_task(func, job.pk, group="reports", timeout=settings.REPORT_JOB_TIMEOUT)
+        except Exception:  # pragma: nocover
+            logger.exception("Unable to queue report job %s" % job.pk)
+            models.ReportJob.objects.filter(pk=job.pk).update(
+                status=models.ReportJob.FAILED,
+                message="Unable to queue report",
+            )
+
+    transaction.on_commit(queue)
+
+
+def delete_expired_jobs():
+    """Delete report jobs (and their files) older than settings.REPORT_JOB_CACHE_TIMEOUT"""
+
+    for job in models.ReportJob.objects.expired():
+        job.artifact.delete(save=False)
+        job.delete()
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.18 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+import qatrack.qatrack_core.fields
+import qatrack.reports.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0008_auto_20200722_1707'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(max_length=128)),
+                ('report_format', models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel'), ('csv', 'CSV')], max_length=8)),
+                ('base_opts', qatrack.qatrack_core.fields.JSONField(blank=True)),
+                ('filters', qatrack.qatrack_core.fields.JSONField(blank=True)),
+                ('notes', qatrack.qatrack_core.fields.JSONField(blank=True)),
+                ('cache_key', models.CharField(db_index=True, editable=False, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('complete', 'Complete'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Percent complete')),
+                ('message', models.CharField(blank=True, max_length=255)),
+                ('artifact', models.FileField(blank=True, max_length=255, upload_to=qatrack.reports.models.get_job_upload_path)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('completed', models.DateTimeField(editable=False, null=True)),
+                ('created_by', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+from qatrack.qatrack_core.scheduling import calc_next_run
+
+
+def set_next_run(apps, schema):
+
+    ReportSchedule = apps.get_model("reports", "ReportSchedule")
+    for s in ReportSchedule.objects.all():
+        ReportSchedule.objects.filter(pk=s.pk).update(next_run=calc_next_run(s.schedule, s.time))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0009_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportschedule',
+            name='next_run',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_next_run, reverse_code=lambda a, s: None),
+    ]
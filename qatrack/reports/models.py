@@ -1,12 +1,16 @@
 from datetime import time as dt_time
+import os
+import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import Group, User
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _l
 from recurrence.fields import RecurrenceField
 
 from qatrack.qatrack_core.fields import JSONField
-from qatrack.qatrack_core.scheduling import RecurrenceFieldMixin
+from qatrack.qatrack_core.scheduling import NextRunMixin
 
 # ensure Django-Q can pick up all report types on Windows
 from qatrack.reports import (  # noqa: F401
@@ -117,7 +121,7 @@ class ReportNote(models.Model):
     )
 
 
-class ReportSchedule(RecurrenceFieldMixin, models.Model):
+class ReportSchedule(NextRunMixin, models.Model):
 
     recurrence_field_name = "schedule"
 
@@ -162,6 +166,7 @@ class ReportSchedule(RecurrenceFieldMixin, models.Model):
     )
 
     last_sent = models.DateTimeField(null=True, editable=False)
+    next_run = models.DateTimeField(null=True, editable=False, db_index=True)
 
     created = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
@@ -196,3 +201,87 @@ class ReportSchedule(RecurrenceFieldMixin, models.Model):
                 recipients.append(e)
 
         return recipients
+
+
+def get_job_upload_path(instance, filename):
+    return os.path.join("reports", "jobs", uuid.uuid4().hex, filename)
+
+
+class ReportJobManager(models.Manager):
+
+    def reusable(self):
+        """Jobs that are still running or which have completed recently enough
+        that their files can be reused"""
+
+        now = timezone.now()
+        running = models.Q(
+            status__in=[ReportJob.PENDING, ReportJob.RUNNING],
+            created__gte=now - timezone.timedelta(seconds=settings.REPORT_JOB_TIMEOUT),
+        )
+        complete = models.Q(
+            status=ReportJob.COMPLETE,
+            completed__gte=now - timezone.timedelta(seconds=settings.REPORT_JOB_CACHE_TIMEOUT),
+        )
+        return self.get_queryset().filter(running | complete)
+
+    def expired(self):
+        """Jobs which can no longer be running or reused"""
+        age = settings.REPORT_JOB_TIMEOUT + settings.REPORT_JOB_CACHE_TIMEOUT
+        return self.get_queryset().filter(created__lt=timezone.now() - timezone.timedelta(seconds=age))
+
+
+class ReportJob(models.Model):
+    """A report being generated (or already generated) by a django-q worker"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+    STATUSES = [
+        (PENDING, _l("Pending")),
+        (RUNNING, _l("Running")),
+        (COMPLETE, _l("Complete")),
+        (FAILED, _l("Failed")),
+    ]
+
+    report_type = models.CharField(max_length=128)
+    report_format = models.CharField(max_length=8, choices=SavedReport.FORMATS)
+
+    base_opts = JSONField(blank=True)
+    filters = JSONField(blank=True)
+    notes = JSONField(blank=True)
+
+    cache_key = models.CharField(max_length=64, db_index=True, editable=False)
+
+    status = models.CharField(max_length=16, choices=STATUSES, default=PENDING)
+    progress = models.PositiveSmallIntegerField(default=0, help_text=_l("Percent complete"))
+    message = models.CharField(max_length=255, blank=True)
+
+    artifact = models.FileField(upload_to=get_job_upload_path, max_length=255, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+
+    created = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, editable=False, related_name="report_jobs")
+    completed = models.DateTimeField(null=True, editable=False)
+
+    objects = ReportJobManager()
+
+    class Meta:
+        ordering = ("-created",)
+
+    def get_report(self):
+        ReportClass = report_class(self.report_type)
+        return ReportClass(
+            base_opts=self.base_opts or {},
+            report_opts=self.filters or {},
+            notes=self.notes or [],
+            user=self.created_by,
+        )
+
+    @property
+    def done(self):
+        return self.status in [self.COMPLETE, self.FAILED]
+
+    def __str__(self):
+        return "#%d. %s - %s - %s" % (self.pk, self.report_type, self.report_format, self.get_status_display())
@@ -82,31 +82,29 @@ class AssignedQCReport(filters.UnitTestCollectionFilterDetailsMixin, BaseReport)
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
-        rows.append([
+        yield [
             _("Site"),
             _("Unit"),
             _("Test list (Cycle)"),
             _("Frequency"),
             _("Assigned To"),
             _("Link"),
-        ])
+        ]
 
         for site, utcs in context['sites_data']:
             for utc in utcs:
-                rows.append([
+                yield [
                     site,
                     utc['unit_name'],
                     utc['name'],
                     utc['frequency'],
                     utc['assigned_to'],
                     utc['link'],
-                ])
-
-        return rows
+                ]
 
 
 class AssignedQCDetailsReport(filters.UnitTestCollectionFilterDetailsMixin, BaseReport):
@@ -238,33 +236,31 @@ class AssignedQCDetailsReport(filters.UnitTestCollectionFilterDetailsMixin, Base
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         for site, utcs in context['sites_data']:
             for utc in utcs:
-                rows.extend([
+                yield from [
                     (_("Site"), site or _("Other")),
                     (_("Unit"), utc['unit_name']),
                     (_("Test list (Cycle)"), utc['name']),
                     (_("Frequency"), utc['frequency']),
                     (_("Assigned To"), utc['assigned_to']),
                     (_("Link"), utc['link']),
-                ])
+                ]
                 is_cycle = len(utc['all_lists']) > 0
                 for idx, test_list in enumerate(utc['all_lists']):
-                    rows.append((_("Test List"), test_list.name))
+                    yield (_("Test List"), test_list.name)
                     if is_cycle:
-                        rows.append((_("Cycle Day"), idx + 1))
-
-                    rows.append((_("Test"), _("Category"), _("Reference"), _("Tolerance")))
-                    rows.extend(test_list.utis)
-                    rows.append([])
+                        yield (_("Cycle Day"), idx + 1)
 
-                rows.append([])
+                    yield (_("Test"), _("Category"), _("Reference"), _("Tolerance"))
+                    yield from test_list.utis
+                    yield []
 
-        return rows
+                yield []
 
 
 class PaperBackupForms(AssignedQCDetailsReport):
@@ -68,12 +68,12 @@ class DueDatesReportMixin(filters.UnitTestCollectionFilterDetailsMixin):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         for site, site_rows in context['sites_data']:
-            rows.extend([
+            yield from [
                 [],
                 [],
                 [site if site else _("Other")],
@@ -84,19 +84,17 @@ class DueDatesReportMixin(filters.UnitTestCollectionFilterDetailsMixin):
                  _("Window"),
                  _("Assigned To"),
                  _("Perform")],
-            ])
+            ]
 
             for row in site_rows:
-                rows.append([
+                yield [
                     row['unit_name'],
                     row['name'],
                     row['frequency'],
                     format_as_date(row['utc'].due_date),
                     row['window'],
                     row['assigned_to'],
-                ])
-
-        return rows
+                ]
 
 
 class NextDueDatesReport(DueDatesReportMixin, BaseReport):
@@ -25,6 +25,9 @@ class TestInstanceDetailsReport(BaseReport):
 
     MAX_TIS = getattr(settings, "REPORT_TESTDATAREPORT_MAX_TIS", 365 * 3)
 
+    # number of test instances fetched from the database at a time
+    CHUNK_SIZE = 2000
+
     template = "reports/qc/testinstance_details.html"
     formats = ORDERED_CONTENT_TYPES
 
@@ -81,20 +84,20 @@ class TestInstanceDetailsReport(BaseReport):
                     "Switch to Excel or CSV format, or use 'One Test Instance Per Row'"
                 ).format(organization=org)
             ]]
-        else:
-            context['test_data'] = self.data_rows()
+        elif self.html:
+            # xlsx & csv reports get their rows directly from to_table
+            context['test_data'] = list(self.data_rows())
 
         return context
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         test_data = self.data_rows()
-        rows.extend(test_data)
-        return rows
+        yield from test_data
 
     def data_rows(self):
         org = self.filter_set.form.cleaned_data['organization']
@@ -130,12 +133,12 @@ class TestInstanceDetailsReport(BaseReport):
             _("Comment"),
         ]]
 
-        table = headers
-        for ti in qs:
+        yield from headers
+        for ti in qs.iterator(chunk_size=self.CHUNK_SIZE):
 
             uti = ti.unit_test_info
 
-            table.append([
+            yield [
                 ti.test_list_instance.work_completed,
                 uti.test.name,
                 uti.unit.name,
@@ -146,9 +149,7 @@ class TestInstanceDetailsReport(BaseReport):
                 ti.skipped,
                 format_user(ti.created_by),
                 ti.comment,
-            ])
-
-        return table
+            ]
 
     def organize_by_unit_test_date(self):
 
@@ -132,7 +132,7 @@ class TestListInstanceSummaryReport(BaseReport):
                 self._pass_fail_t = get_template("qa/pass_fail_status.html")
             return self._pass_fail_t.render({'instance': tli, 'show_icons': True})
 
-        return ", ".join("%d %s" % (len(t), d) for s, d, t in tli.pass_fail_status())
+        return ", ".join("%d %s" % (n, d) for s, d, n in tli.pass_fail_totals())
 
     def get_work_completed(self, tli):
         """Format work completed as link to instance if html report otherwise just return formatted date"""
@@ -146,11 +146,11 @@ class TestListInstanceSummaryReport(BaseReport):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
-        rows.append([
+        yield [
             _("Site"),
             _("Unit"),
             _("Test list"),
@@ -158,11 +158,11 @@ class TestListInstanceSummaryReport(BaseReport):
             _("Work Completed"),
             _("Pass/Fail Status"),
             _("Link"),
-        ])
+        ]
 
         for site, tlis in context['sites_data']:
             for tli in tlis:
-                rows.append([
+                yield [
                     site,
                     tli['unit_name'],
                     tli['test_list_name'],
@@ -170,9 +170,7 @@ class TestListInstanceSummaryReport(BaseReport):
                     tli['work_completed'],
                     tli['pass_fail'],
                     tli['link'],
-                ])
-
-        return rows
+                ]
 
 
 class TestListInstanceDetailsReport(BaseReport):
@@ -291,7 +289,7 @@ class TestListInstanceDetailsReport(BaseReport):
 
     def to_table(self, context):
 
-        rows = [
+        yield from [
             [_("Report Title:"), context['report_title']],
             [_("View On Site:"), self.get_report_url()],
             [_("Report Type:"), context['report_name']],
@@ -302,11 +300,11 @@ class TestListInstanceDetailsReport(BaseReport):
         ]
 
         for label, criteria in context['report_details']:
-            rows.append([label + ":", criteria])
+            yield [label + ":", criteria]
 
         for tli in context['queryset']:
 
-            rows.extend([
+            yield from [
                 [],
                 [],
                 ["Test List Instance:", self.make_url(tli.get_absolute_url())],
@@ -316,25 +314,25 @@ class TestListInstanceDetailsReport(BaseReport):
                 [_("Duration") + ":", _("In Progress") if tli.in_progress else as_time_delta(tli.duration())],
                 [_("Modified") + ":", format_as_date(tli.modified)],
                 [_("Mofified By") + ":", format_user(tli.modified_by)],
-            ])
+            ]
             if tli.all_reviewed and not tli.reviewed_by:
-                rows.extend([
+                yield from [
                     [_("Reviewed") + ":", format_as_date(tli.modified)],
                     [_("Reviewed By") + ":", _("Auto Reviewed")],
-                ])
+                ]
             else:
-                rows.extend([
+                yield from [
                     [_("Reviewed") + ":", format_as_date(tli.reviewed)],
                     [_("Reviewed By") + ":", format_user(tli.reviewed_by)],
-                ])
+                ]
 
             for c in context['comments'].get(tli.pk, []):
-                rows.append([_("Comment") + ":", format_datetime(c[0]), c[1], c[2]])
+                yield [_("Comment") + ":", format_datetime(c[0]), c[1], c[2]]
 
             for a in tli.attachment_set.all():
-                rows.append([_("Attachment") + ":", a.label, self.make_url(a.attachment.url, plain=True)])
+                yield [_("Attachment") + ":", a.label, self.make_url(a.attachment.url, plain=True)]
 
-            rows.append([])
+            yield []
             headers = [
                 _("Test"),
                 _("Value"),
@@ -349,7 +347,7 @@ class TestListInstanceDetailsReport(BaseReport):
                 _("Comment"),
                 _("Attachments"),
             ])
-            rows.append(headers)
+            yield headers
 
             for ti, history in tli.history()[0]:
                 row = [
@@ -368,6 +366,4 @@ class TestListInstanceDetailsReport(BaseReport):
                 for a in ti.attachment_set.all():
                     row.append(self.make_url(a.attachment.url, plain=True))
 
-                rows.append(row)
-
-        return rows
+                yield row
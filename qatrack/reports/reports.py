@@ -1,12 +1,18 @@
 import csv
 import datetime
-from io import BytesIO, StringIO
+from io import StringIO
 import json
+from tempfile import SpooledTemporaryFile
 from urllib.parse import quote_plus
 
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.http import Http404, HttpResponse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import reverse
 from django.template.loader import get_template
 from django.utils import timezone
@@ -16,8 +22,9 @@ from django.utils.translation import gettext as _
 from django.utils.translation import gettext_lazy as _l
 import xlsxwriter
 
+from qatrack.qatrack_core.chrome import html_to_pdf
 from qatrack.qatrack_core.dates import format_as_date, format_datetime
-from qatrack.qatrack_core.utils import chrometopdf, relative_dates
+from qatrack.qatrack_core.utils import relative_dates
 
 CSV = "csv"
 XLS = "xlsx"
@@ -31,6 +38,13 @@ CONTENT_TYPES = {
 }
 ORDERED_CONTENT_TYPES = [CSV, PDF, XLS]
 
+# number of csv rows per chunk when streaming csv reports
+CSV_CHUNK_ROWS = 500
+
+# csv & xlsx reports larger than this many bytes are written to a temporary
+# file rather than kept in memory
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
 
 def register_class(target_class):
     if target_class.__name__ in REPORT_REGISTRY:  # pragma: nocover
@@ -79,6 +93,18 @@ class BaseReport(object, metaclass=ReportMeta):
     extra_form = None
     formats = [PDF, XLS, CSV]
 
+    # set to a callable accepting (percent_complete, message) to monitor the
+    # progress of a report being rendered
+    progress_callback = None
+
+    # True when the report is being rendered for a waiting web request. PDF
+    # conversion then raises ChromeBusy (rather than launching a new browser)
+    # when the browser pool is busy so the user can be asked to try again
+    interactive = False
+
+    # how often (in rows) progress is reported when writing tabular reports
+    progress_rows = 1000
+
     def __init__(self, base_opts=None, report_opts=None, notes=None, user=None):
         """base_opts is dict of form:
             {'report_id': <rid|None>, 'include_signature': <bool>, 'title': str} """
@@ -106,6 +132,9 @@ class BaseReport(object, metaclass=ReportMeta):
         the number of objects is too large, you would do:
             filter_form.add_error("__all__", "reduce the number of objects!")
             return False
+
+        Reports run in the background are not subject to web request timeouts
+        and this method is not called for them.
         """
         return True
 
@@ -127,9 +156,22 @@ class BaseReport(object, metaclass=ReportMeta):
                 raise
         return self.get_filename(report_format), content
 
+    def set_progress(self, progress, message=""):
+        if self.progress_callback:
+            self.progress_callback(progress, message)
+
     def render_to_response(self, report_format):
-        fname, content = self.render(report_format)
-        response = HttpResponse(content, content_type=CONTENT_TYPES[report_format])
+        if report_format == CSV:
+            self.report_format = report_format
+            fname = self.get_filename(report_format)
+            response = StreamingHttpResponse(self.csv_chunks(), content_type=CONTENT_TYPES[report_format])
+        else:
+            self.interactive = True
+            fname, content = self.render(report_format)
+            if hasattr(content, "read"):
+                response = FileResponse(content, content_type=CONTENT_TYPES[report_format])
+            else:
+                response = HttpResponse(content, content_type=CONTENT_TYPES[report_format])
         response['Content-Disposition'] = 'attachment; filename="%s"' % fname
         return response
 
@@ -259,22 +301,40 @@ class BaseReport(object, metaclass=ReportMeta):
         context = self.get_context()
         context['base_template'] = "reports/pdf_report.html"
         template = self.get_template(using=None)
+        self.set_progress(30, _("Rendering report"))
         content = template.render(context)
-        return chrometopdf(content, name=fname)
+        self.set_progress(60, _("Converting report to PDF"))
+        return html_to_pdf(content, name=fname, fallback_when_busy=not self.interactive)
+
+    def csv_chunks(self):
+        """Generate the csv report as a series of strings so it can be
+        streamed without building the whole report in memory"""
 
-    def to_csv(self):
         context = self.get_context()
         f = StringIO()
         writer = csv.writer(f)
-        for row in self.to_table(context):
+        for idx, row in enumerate(self.to_table(context)):
             writer.writerow(row)
+            self._table_progress(idx)
+            if (idx + 1) % CSV_CHUNK_ROWS == 0:
+                yield f.getvalue()
+                f.seek(0)
+                f.truncate()
+        yield f.getvalue()
+
+    def to_csv(self):
+        f = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        for chunk in self.csv_chunks():
+            f.write(chunk.encode("utf-8"))
         f.seek(0)
         return f
 
     def to_xlsx(self):
         context = self.get_context()
-        f = BytesIO()
-        wb = xlsxwriter.Workbook(f, {'in_memory': True})
+        f = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        # constant_memory flushes each row to a temp file once the next row is
+        # started, so rows must be written in order
+        wb = xlsxwriter.Workbook(f, {'constant_memory': True, 'tmpdir': settings.TMP_REPORT_ROOT})
         ws = wb.add_worksheet(name="Report")
         row = 0
         col = 0
@@ -295,6 +355,7 @@ class BaseReport(object, metaclass=ReportMeta):
                         ws.write(row, col, str(data))
 
                 col += 1
+            self._table_progress(row)
             row += 1
             col = 0
 
@@ -302,23 +363,30 @@ class BaseReport(object, metaclass=ReportMeta):
         f.seek(0)
         return f
 
+    def _table_progress(self, row):
+        if row and row % self.progress_rows == 0:
+            self.set_progress(50, _("%(nrows)d rows written") % {'nrows': row})
+
     def to_table(self, context):
-        """This function should be overridden in subclasses and then used like
+        """Generate the rows of a report for csv & xlsx output.  This function
+        should be overridden in subclasses and then used like
 
             class FooReport(BaseReport):
                 ...
                 def to_table(self, context):
 
                     # get default rows including description/filters etc
-                    rows = super().to_table()
+                    yield from super().to_table(context)
 
                     # report specific data
-                    rows += [
-                        [...],
-                    ]
+                    for obj in objects:
+                        yield [...]
+
+        Rows are written as they are generated so large reports should
+        avoid building a list of all their rows.
         """
 
-        rows = [
+        yield from [
             [_("Report Title:"), context['report_title']],
             [_("View On Site:"), self.get_report_url()],
             [_("Report Type:"), context['report_name']],
@@ -329,14 +397,12 @@ class BaseReport(object, metaclass=ReportMeta):
         ]
 
         for label, criteria in context['report_details']:
-            rows.append([label + ":", criteria])
+            yield [label + ":", criteria]
 
         if context.get("notes"):
-            rows.append(["Notes:"])
+            yield ["Notes:"]
             for note in context['notes']:
-                rows.append([note['heading'], note['content']])
-
-        return rows
+                yield [note['heading'], note['content']]
 
 
 def report_types():
@@ -87,11 +87,11 @@ class ScheduledTemplatesReport(filters.ServiceEventScheduleFilterDetailsMixin, B
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
-        rows.append([
+        yield [
             _("Site"),
             _("Unit"),
             _("Service Area"),
@@ -99,11 +99,11 @@ class ScheduledTemplatesReport(filters.ServiceEventScheduleFilterDetailsMixin, B
             _("Frequency"),
             _("Assigned To"),
             _("Link"),
-        ])
+        ]
 
         for site, utcs in context['sites_data']:
             for utc in utcs:
-                rows.append([
+                yield [
                     site,
                     utc['unit_name'],
                     utc['service_area_name'],
@@ -111,6 +111,4 @@ class ScheduledTemplatesReport(filters.ServiceEventScheduleFilterDetailsMixin, B
                     utc['frequency'],
                     utc['assigned_to'],
                     utc['link'],
-                ])
-
-        return rows
+                ]
@@ -133,9 +133,9 @@ class ServiceEventDetailsReport(ServiceEventReportMixin, BaseReport):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         header = [
             _("Service Event ID"),
@@ -165,7 +165,7 @@ class ServiceEventDetailsReport(ServiceEventReportMixin, BaseReport):
             _("Link"),
         ]
 
-        rows.append(header)
+        yield header
 
         for site, ses in context['sites_data']:
             for se in ses:
@@ -223,6 +223,4 @@ class ServiceEventDetailsReport(ServiceEventReportMixin, BaseReport):
                     se['link'],
                 ]
 
-                rows.append(row)
-
-        return rows
+                yield row
@@ -73,12 +73,12 @@ class DueDatesReportMixin(filters.ServiceEventScheduleFilterDetailsMixin):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         for site, site_rows in context['sites_data']:
-            rows.extend([
+            yield from [
                 [],
                 [],
                 [site if site else _("Other")],
@@ -90,10 +90,10 @@ class DueDatesReportMixin(filters.ServiceEventScheduleFilterDetailsMixin):
                  _("Window"),
                  _("Assigned To"),
                  _("Perform")],
-            ])
+            ]
 
             for row in site_rows:
-                rows.append([
+                yield [
                     row['unit_name'],
                     row['service_area_name'],
                     row['service_event_template_name'],
@@ -101,9 +101,7 @@ class DueDatesReportMixin(filters.ServiceEventScheduleFilterDetailsMixin):
                     format_as_date(row['schedule'].due_date),
                     row['window'],
                     row['assigned_to'],
-                ])
-
-        return rows
+                ]
 
 
 class NextScheduledServiceEventsDueDatesReport(DueDatesReportMixin, BaseReport):
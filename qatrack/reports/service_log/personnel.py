@@ -137,31 +137,29 @@ class ServiceEventPersonnelSummaryReport(BaseReport):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
-        rows.append([_("Group Members Involved Summary")])
-        rows.append([_("User"), _("Linked Group Name"), _("# of Service Events")])
+        yield [_("Group Members Involved Summary")]
+        yield [_("User"), _("Linked Group Name"), _("# of Service Events")]
         for user, num_rows, linker_counts in context['group_linkers']:
             for group, count in linker_counts:
-                rows.append([user, group, count])
+                yield [user, group, count]
 
-        rows.append([])
-        rows.append([_("QATrack+ User Hours Summary")])
-        rows.append([_("User"), _("Total Time (HH:MM)"), _("# of Service Events")])
+        yield []
+        yield [_("QATrack+ User Hours Summary")]
+        yield [_("User"), _("Total Time (HH:MM)"), _("# of Service Events")]
         for user, total_ses, total_hours in context['user_hours']:
-            rows.append([user, hour_min(total_hours), total_ses])
+            yield [user, hour_min(total_hours), total_ses]
 
-        rows.append([])
-        rows.append([_("Third Party Hours Summary")])
-        rows.append([_("Name"), _("Vendor"), _("Total Time (HH:MM)"), _("# of Service Events")])
+        yield []
+        yield [_("Third Party Hours Summary")]
+        yield [_("Name"), _("Vendor"), _("Total Time (HH:MM)"), _("# of Service Events")]
         for tp in context['tp_hours']:
-            rows.append([
+            yield [
                 ', '.join(x for x in [tp['third_party__last_name'], tp['third_party__first_name']] if x),
                 tp['third_party__vendor__name'],
                 hour_min(tp['total_hours']),
                 tp['total_ses'],
-            ])
-
-        return rows
+            ]
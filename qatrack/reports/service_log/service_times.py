@@ -1,6 +1,3 @@
-from collections import defaultdict
-
-from django.conf import settings
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.utils.text import slugify
@@ -76,6 +73,8 @@ class ServiceTimesReport(ServiceEventReportMixin, BaseReport):
 
         sites_data = []
 
+        unit_totals = models.service_totals(self.filter_set.qs)
+
         for site in sites:
 
             if site:  # site can be None here since not all units may have a site
@@ -83,14 +82,12 @@ class ServiceTimesReport(ServiceEventReportMixin, BaseReport):
 
             sites_data.append((site.name if site else "", []))
 
-            ses = self.get_ses_for_site(self.filter_set.qs, site)
-            unit_ses = defaultdict(list)
-            for se in ses:
-                unit_ses[se.unit_service_area.unit_id].append(se)
+            site_units = list(units.filter(site=site))
+            potential_times = umodels.potential_times(site_units, start_date.date(), end_date.date())
 
-            for unit in units.filter(site=site):
+            for unit in site_units:
 
-                available = timezone.timedelta(hours=unit.get_potential_time(start_date.date(), end_date.date()))
+                available = timezone.timedelta(hours=potential_times[unit.pk])
                 total_lost_time = timezone.timedelta()
                 total_service_time = timezone.timedelta()
                 total_events = 0
@@ -104,18 +101,14 @@ class ServiceTimesReport(ServiceEventReportMixin, BaseReport):
                         'lost_time': timezone.timedelta(),
                     }
 
-                for se in unit_ses[unit.id]:
-
-                    service_type_info[se.service_type_id]['n_service_events'] += 1
-                    total_events += 1
+                for st_id, totals in unit_totals[unit.id].items():
+                    if st_id not in service_type_info:
+                        continue
 
-                    st = se.duration_service_time or timezone.timedelta()
-                    service_type_info[se.service_type_id]['service_time'] += st
-                    total_service_time += st
-
-                    lt = se.duration_lost_time or timezone.timedelta()
-                    service_type_info[se.service_type_id]['lost_time'] += lt
-                    total_lost_time += lt
+                    service_type_info[st_id].update(totals)
+                    total_events += totals['n_service_events']
+                    total_service_time += totals['service_time']
+                    total_lost_time += totals['lost_time']
 
                 for st in service_types:
                     service_type_info[st.pk]['service_time'] = hour_min(service_type_info[st.pk]['service_time'])
@@ -143,25 +136,11 @@ class ServiceTimesReport(ServiceEventReportMixin, BaseReport):
 
         return context
 
-    def get_ses_for_site(self, qs, site):
-        """Get Test List Instances from filtered queryset for input site"""
-
-        ses = qs.filter(unit_service_area__unit__site=site)
-
-        ses = ses.order_by(
-            "unit_service_area__unit__%s" % settings.ORDER_UNITS_BY,
-        ).select_related(
-            "unit_service_area",
-            "service_type",
-        )
-
-        return ses
-
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         header = [
             _("Site"),
@@ -175,7 +154,7 @@ class ServiceTimesReport(ServiceEventReportMixin, BaseReport):
             _("Uptime (%)"),
         ]
 
-        rows.append(header)
+        yield header
 
         for site, unit_infos in context['sites_data']:
             for unit_info in unit_infos:
@@ -195,9 +174,9 @@ class ServiceTimesReport(ServiceEventReportMixin, BaseReport):
                         unit_info['uptime'] if first and self.calc_uptime else "",
                     ]
 
-                    rows.append(row)
+                    yield row
 
-                rows.append([
+                yield [
                     "",
                     "",
                     _("Totals:"),
@@ -205,6 +184,4 @@ class ServiceTimesReport(ServiceEventReportMixin, BaseReport):
                     unit_info['service_time'],
                     unit_info['lost_time'],
                     unit_info['downtime'],
-                ])
-
-        return rows
+                ]
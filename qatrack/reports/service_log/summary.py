@@ -158,9 +158,9 @@ class ServiceEventSummaryReport(ServiceEventReportMixin, BaseReport):
 
     def to_table(self, context):
 
-        rows = super().to_table(context)
+        yield from super().to_table(context)
 
-        rows.append([])
+        yield []
 
         header = [
             _("Service Event ID"),
@@ -178,7 +178,7 @@ class ServiceEventSummaryReport(ServiceEventReportMixin, BaseReport):
 
         header.append(_("Link"))
 
-        rows.append(header)
+        yield header
 
         for site, ses in context['sites_data']:
             for se in ses:
@@ -201,6 +201,4 @@ class ServiceEventSummaryReport(ServiceEventReportMixin, BaseReport):
                     ])
 
                 row.append(se['link'])
-                rows.append(row)
-
-        return rows
+                yield row
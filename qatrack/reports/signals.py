@@ -0,0 +1,62 @@
+"""
+Receivers which invalidate previously generated report files (see
+:func:`qatrack.reports.jobs.clear_report_cache`) whenever the data reports
+are generated from is changed.  Connected by
+:class:`qatrack.reports.apps.ReportsConfig`.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django_comments.models import Comment
+
+from qatrack.attachments.models import Attachment
+from qatrack.faults.models import Fault, FaultReviewInstance
+from qatrack.parts.models import PartUsed
+from qatrack.qa.models import TestListInstance, summary_counts_updated
+from qatrack.reports.jobs import clear_report_cache
+from qatrack.service_log.models import Hours, ReturnToServiceQA, ServiceEvent
+from qatrack.units.models import UnitAvailableTime, UnitAvailableTimeEdit
+
+
+@receiver(post_save, sender=TestListInstance)
+@receiver(post_delete, sender=TestListInstance)
+@receiver(post_save, sender=ServiceEvent)
+@receiver(post_delete, sender=ServiceEvent)
+@receiver(post_save, sender=Hours)
+@receiver(post_delete, sender=Hours)
+@receiver(post_save, sender=PartUsed)
+@receiver(post_delete, sender=PartUsed)
+@receiver(post_save, sender=ReturnToServiceQA)
+@receiver(post_delete, sender=ReturnToServiceQA)
+@receiver(post_save, sender=Fault)
+@receiver(post_delete, sender=Fault)
+@receiver(post_save, sender=FaultReviewInstance)
+@receiver(post_delete, sender=FaultReviewInstance)
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=Attachment)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=UnitAvailableTime)
+@receiver(post_delete, sender=UnitAvailableTime)
+@receiver(post_save, sender=UnitAvailableTimeEdit)
+@receiver(post_delete, sender=UnitAvailableTimeEdit)
+def on_report_data_changed(*args, **kwargs):
+    """Report data was saved or deleted"""
+    if not kwargs.get("raw", False):
+        clear_report_cache()
+
+
+@receiver(m2m_changed, sender=ServiceEvent.service_event_related.through)
+@receiver(m2m_changed, sender=Fault.fault_types.through)
+@receiver(m2m_changed, sender=Fault.related_service_events.through)
+def on_report_relations_changed(*args, **kwargs):
+    """Relations included in reports were changed"""
+    if kwargs['action'] in ("post_add", "post_remove", "post_clear"):
+        clear_report_cache()
+
+
+@receiver(summary_counts_updated, sender=TestListInstance)
+def on_test_list_instance_reviewed(*args, **kwargs):
+    """Review statuses or comments of a test list instance were changed
+    (test instance statuses are updated in bulk so don't send post_save)"""
+    clear_report_cache()
@@ -155,6 +155,10 @@ require(['jquery', 'lodash', 'moment', 'datatables.net-bs'], function ($, _, mom
 
     var $addNote = $("#add-note");
 
+    var $runJob = $("#run-job");
+    var $jobProgress = $("#job-progress");
+    var jobPollInterval = 2000;
+
     var date_range_locale = {
         "format": siteConfig.DATERANGEPICKER_DATE_FMT,
         "separator": " - ",
@@ -665,6 +669,74 @@ require(['jquery', 'lodash', 'moment', 'datatables.net-bs'], function ($, _, mom
         });
     }
 
+    function reportFormData(){
+        /* serialize the report form as a new (unsaved) report */
+        return $form.find(':input').not(
+            "[name^=reportnote_set-][name$=-report]"
+        ).not(
+            "[name^=reportnote_set-][name$=-id]"
+        ).serialize().replace(/INITIAL_FORMS=\d+/,"INITIAL_FORMS=0");
+    }
+
+    function showJob(job){
+        /* update the progress bar for a background report job */
+        var $message = $jobProgress.find(".job-message");
+        $jobProgress.removeClass("hidden");
+        $jobProgress.find(".progress").toggleClass("active", !job.done);
+        $jobProgress.find(".progress-bar").css("width", job.progress + "%");
+        if (job.download_url){
+            $message.html('<a href="' + job.download_url + '"><i class="fa fa-download"></i> Download Report</a>');
+        } else {
+            $message.text(job.status_display + (job.message ? ": " + job.message : ""));
+        }
+    }
+
+    function pollJob(job){
+        /* check the status of a background report job until it is done */
+        showJob(job);
+        if (job.done){
+            $runJob.prop("disabled", false);
+            if (job.download_url){
+                window.location = job.download_url;
+            }
+            return;
+        }
+        setTimeout(function(){
+            $.ajax({
+                type: "GET",
+                url: job.status_url,
+                success: pollJob,
+                error: function(e){
+                    $runJob.prop("disabled", false);
+                    formErrors({'save_errors': ["Unable to check report status. Please try again later."]});
+                }
+            });
+        }, jobPollInterval);
+    }
+
+    function runJob(){
+        /* start generating the report in the background */
+        clearErrors();
+        $runJob.prop("disabled", true);
+        $.ajax({
+            type: "POST",
+            url: $form.data("job"),
+            data: reportFormData(),
+            success: function(data){
+                if (data.errors){
+                    $runJob.prop("disabled", false);
+                    formErrors(data);
+                } else {
+                    pollJob(data.job);
+                }
+            },
+            error: function(e){
+                $runJob.prop("disabled", false);
+                formErrors({'save_errors': ["Unable to start report. Please try again later."]});
+            }
+        });
+    }
+
     $(document).ready(function(){
 
 
@@ -716,11 +788,7 @@ require(['jquery', 'lodash', 'moment', 'datatables.net-bs'], function ($, _, mom
 
             var url = $form.data("preview");
 
-            var form_data = $form.find(':input').not(
-                "[name^=reportnote_set-][name$=-report]"
-            ).not(
-                "[name^=reportnote_set-][name$=-id]"
-            ).serialize().replace(/INITIAL_FORMS=\d+/,"INITIAL_FORMS=0");
+            var form_data = reportFormData();
 
             $.ajax({
                 type: "POST",
@@ -829,6 +897,8 @@ require(['jquery', 'lodash', 'moment', 'datatables.net-bs'], function ($, _, mom
 
         $addNote.click(addNote);
 
+        $runJob.click(runJob);
+
         prepareForm();
         setupToolTips();
         loadFromUrl();
@@ -1,7 +1,9 @@
 import logging
 
 from django.conf import settings
+from django.core.files.base import ContentFile, File
 from django.utils import timezone
+from django.utils.translation import gettext as _
 from django_q.models import Schedule
 from django_q.tasks import schedule
 
@@ -10,7 +12,7 @@ from qatrack.qatrack_core.tasks import (
     qatrack_task_wrapper,
     run_periodic_scheduler,
 )
-from qatrack.reports.models import ReportSchedule
+from qatrack.reports.models import ReportJob, ReportSchedule
 from qatrack.reports.reports import CONTENT_TYPES
 
 logger = logging.getLogger('django-q')
@@ -21,7 +23,7 @@ def run_reports():
     """Should run every 15 minutes at HH:07:30, HH:22:30, HH:37:30, HH:52:30"""
 
     run_periodic_scheduler(
-        ReportSchedule, "run_reports", schedule_report, time_field="time", recurrence_field="schedule"
+        ReportSchedule, "run_reports", schedule_report
     )
 
 
@@ -83,3 +85,46 @@ def send_report(schedule_id, task_name=""):
     finally:
         s.last_sent = timezone.now()
         s.save()
+
+
+@qatrack_task_wrapper
+def run_report_job(job_id):
+    """Render the report for a ReportJob and save the generated file"""
+
+    # only one worker may pick up a job (the broker may present a long running
+    # task to a second worker)
+    started = ReportJob.objects.filter(pk=job_id, status=ReportJob.PENDING).update(
+        status=ReportJob.RUNNING,
+        progress=5,
+        message=_("Collecting data"),
+    )
+    if not started:
+        logger.info("ReportJob %s requested, but it does not exist or is not pending" % job_id)
+        return
+
+    job = ReportJob.objects.select_related("created_by").get(pk=job_id)
+
+    def set_progress(progress, message=""):
+        ReportJob.objects.filter(pk=job_id).update(progress=progress, message=message[:255])
+
+    try:
+        report = job.get_report()
+        report.progress_callback = set_progress
+        fname, content = report.render(job.report_format)
+        # csv & xlsx reports are returned as (possibly on disk) files which
+        # are copied to storage in chunks
+        content = File(content) if hasattr(content, "read") else ContentFile(content)
+        job.artifact.save(fname, content, save=False)
+        job.filename = fname
+        job.status = ReportJob.COMPLETE
+        job.progress = 100
+        job.message = ""
+        job.completed = timezone.now()
+        job.save()
+        logger.info("Generated ReportJob %s (%s)" % (job_id, fname))
+    except Exception:
+        logger.exception("Error generating ReportJob %s" % job_id)
+        ReportJob.objects.filter(pk=job_id).update(
+            status=ReportJob.FAILED,
+            message=_("Sorry, an error occurred while generating your report"),
+        )
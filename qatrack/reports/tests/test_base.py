@@ -1,8 +1,9 @@
-import io
 import json
 import time
 from unittest import mock
+import zipfile
 
+from django.conf import settings
 from django.contrib.admin.sites import AdminSite
 from django.contrib.sites.models import Site
 from django.core import mail
@@ -11,6 +12,7 @@ from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils import timezone
+from django_comments.models import Comment
 from django_q.models import Schedule
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as e_c
@@ -19,10 +21,12 @@ from selenium.webdriver.support import expected_conditions as e_c
 from qatrack.qa.models import Group, TestInstance, User, UnitTestCollection
 from qatrack.qa.tests import utils
 from qatrack.qa.tests.test_selenium import BaseQATests
+from qatrack.qatrack_core.chrome import ChromeBusy
 from qatrack.reports import (
     admin,
     filters,
     forms,
+    jobs,
     models,
     qc,
     reports,
@@ -105,6 +109,21 @@ class TestSelectReport(TestCase):
         # everything valid, so this should be report rendering context now, rather than forms
         assert 'report_details' in resp.context
 
+    @mock.patch("qatrack.reports.reports.html_to_pdf", side_effect=ChromeBusy("busy"))
+    def test_pdf_renderer_busy(self, html_to_pdf):
+        data = {
+            'root-report_type': 'testlistinstance_summary',
+            'root-title': 'Title',
+            'root-report_format': 'pdf',
+            'work_completed': '01 Jan 2000 - 01 Feb 2000',
+            'reportnote_set-INITIAL_FORMS': 0,
+            'reportnote_set-TOTAL_FORMS': 0,
+        }
+        resp = self.client.post(self.url, data)
+        assert resp.status_code == 200
+        assert resp.context['report_form'].non_field_errors() == ["busy"]
+        assert html_to_pdf.call_args[1]['fallback_when_busy'] is False
+
     def test_no_perms(self):
         user = User.objects.create_user("reg_user", "a@b.com", "password")
         self.client.force_login(user)
@@ -275,6 +294,148 @@ class TestSaveReport(TestCase):
         assert resp.status_code == 403
 
 
+class TestReportJob(TestCase):
+
+    def setUp(self):
+        self.url = reverse("reports-job-start")
+        self.user = User.objects.create_superuser("user", "a@b.com", "password")
+        self.client.force_login(self.user)
+        self.data = {
+            'root-report_type': 'testlistinstance_summary',
+            'root-title': 'Title',
+            'root-report_format': 'csv',
+            'root-include_signature': True,
+            'work_completed': '01 Jan 2000 - 01 Feb 2000',
+            'reportnote_set-INITIAL_FORMS': 0,
+            'reportnote_set-TOTAL_FORMS': 0,
+        }
+
+    def tearDown(self):
+        for job in models.ReportJob.objects.all():
+            job.artifact.delete(save=False)
+
+    def test_form_invalid(self):
+        self.data['work_completed'] = '01 Jan 2000'
+        payload = self.client.post(self.url, self.data).json()
+        assert payload['errors']
+        assert 'work_completed' in payload['report_errors']
+        assert payload['job'] is None
+        assert models.ReportJob.objects.count() == 0
+
+    def test_job_complete(self):
+        payload = self.client.post(self.url, self.data).json()
+        assert not payload['errors']
+        job = models.ReportJob.objects.get(pk=payload['job']['id'])
+        assert job.status == models.ReportJob.COMPLETE
+        assert job.progress == 100
+        assert payload['job']['done']
+        assert payload['job']['download_url'] == reverse("reports-job-download", kwargs={'job_id': job.pk})
+
+    def test_download(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        resp = self.client.get(reverse("reports-job-download", kwargs={'job_id': job_id}))
+        assert resp['Content-Type'] == reports.CONTENT_TYPES['csv']
+        assert 'attachment; filename="test-list-instance-summary.csv"' == resp['Content-Disposition']
+        assert b"Title" in b"".join(resp.streaming_content)
+
+    def test_status(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        payload = self.client.get(reverse("reports-job-status", kwargs={'job_id': job_id})).json()
+        assert payload['status'] == models.ReportJob.COMPLETE
+
+    def test_other_users_job(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        self.client.force_login(User.objects.create_superuser("other", "b@b.com", "password"))
+        assert self.client.get(reverse("reports-job-status", kwargs={'job_id': job_id})).status_code == 404
+        assert self.client.get(reverse("reports-job-download", kwargs={'job_id': job_id})).status_code == 404
+
+    def test_identical_report_reused(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        assert self.client.post(self.url, self.data).json()['job']['id'] == job_id
+        assert models.ReportJob.objects.count() == 1
+
+    def test_different_filters_not_reused(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        self.data['work_completed'] = '01 Jan 2000 - 01 Mar 2000'
+        assert self.client.post(self.url, self.data).json()['job']['id'] != job_id
+
+    def test_data_changed_not_reused(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        utils.create_unit()
+        assert self.client.post(self.url, self.data).json()['job']['id'] != job_id
+
+    def test_tli_changed_not_reused(self):
+        tli = utils.create_test_list_instance(work_completed=timezone.datetime(2000, 1, 15, tzinfo=timezone.utc))
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        tli.comment = "changed"
+        tli.save()
+        assert self.client.post(self.url, self.data).json()['job']['id'] != job_id
+
+    def test_review_not_reused(self):
+        tli = utils.create_test_list_instance(work_completed=timezone.datetime(2000, 1, 15, tzinfo=timezone.utc))
+        status = utils.create_status(name="reviewed", is_default=False, requires_review=False)
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        TestInstance.objects.filter(test_list_instance=tli).update(status=status)
+        tli.update_all_reviewed()
+        assert self.client.post(self.url, self.data).json()['job']['id'] != job_id
+
+    def test_comment_not_reused(self):
+        tli = utils.create_test_list_instance(work_completed=timezone.datetime(2000, 1, 15, tzinfo=timezone.utc))
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        Comment.objects.create(
+            content_object=tli,
+            user=self.user,
+            comment="comment",
+            site=Site.objects.get_current(),
+            submit_date=timezone.now(),
+        )
+        assert self.client.post(self.url, self.data).json()['job']['id'] != job_id
+
+    def test_expired_jobs_deleted(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        models.ReportJob.objects.filter(pk=job_id).update(created=timezone.now() - timezone.timedelta(days=30))
+        jobs.clear_report_cache()
+        self.client.post(self.url, self.data)
+        assert not models.ReportJob.objects.filter(pk=job_id).exists()
+
+    def test_size_limit_not_applied(self):
+        utils.create_test_list_instance(work_completed=timezone.datetime(2000, 1, 15, tzinfo=timezone.utc))
+        with mock.patch.object(qc.TestListInstanceSummaryReport, "MAX_TLIS", 0):
+            payload = self.client.post(self.url, self.data).json()
+        assert not payload['errors']
+
+    def test_failed(self):
+        with mock.patch.object(qc.TestListInstanceSummaryReport, "to_csv", side_effect=ValueError):
+            payload = self.client.post(self.url, self.data).json()
+        assert payload['job']['status'] == models.ReportJob.FAILED
+        assert payload['job']['download_url'] is None
+
+    def test_not_pending(self):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        models.ReportJob.objects.filter(pk=job_id).update(status=models.ReportJob.RUNNING, progress=50)
+        tasks.run_report_job(job_id)
+        assert models.ReportJob.objects.get(pk=job_id).progress == 50
+
+    @override_settings(REPORT_JOBS_ASYNC=True)
+    @mock.patch("qatrack.reports.jobs.transaction.on_commit", lambda func: func())
+    @mock.patch("qatrack.reports.jobs.async_task")
+    def test_job_queued(self, async_task):
+        job_id = self.client.post(self.url, self.data).json()['job']['id']
+        async_task.assert_called_once_with(
+            "qatrack.reports.tasks.run_report_job",
+            job_id,
+            group="reports",
+            timeout=settings.REPORT_JOB_TIMEOUT,
+        )
+        assert models.ReportJob.objects.get(pk=job_id).status == models.ReportJob.PENDING
+
+    def test_no_perms(self):
+        user = User.objects.create_user("reg_user", "a@b.com", "password")
+        self.client.force_login(user)
+        resp = self.client.post(self.url, {})
+        assert resp.status_code == 403
+
+
 class TestLoadReport(TestCase):
 
     def setUp(self):
@@ -814,17 +975,40 @@ class TestBaseReport(TestCase):
     def test_to_html(self):
         assert 'class="container-fluid"' in reports.BaseReport().to_html()
 
-    @mock.patch("qatrack.reports.reports.chrometopdf")
-    def test_to_pdf(self, chrometopdf):
+    @mock.patch("qatrack.reports.reports.html_to_pdf")
+    def test_to_pdf(self, html_to_pdf):
         reports.BaseReport().to_pdf()
-        assert 'class="container-fluid"' in chrometopdf.call_args[0][0]
+        assert 'class="container-fluid"' in html_to_pdf.call_args[0][0]
+        # reports rendered in the background don't wait for the browser pool
+        assert html_to_pdf.call_args[1]['fallback_when_busy'] is True
 
     def test_to_csv(self):
         rep = reports.BaseReport()
         rep.to_table = lambda x: [[1]]
         csv = rep.to_csv()
-        assert isinstance(csv, io.StringIO)
         assert csv.tell() == 0
+        assert csv.read() == b"1\r\n"
+
+    def test_csv_chunks(self):
+        rep = reports.BaseReport()
+        rep.to_table = lambda x: ([i] for i in range(reports.CSV_CHUNK_ROWS + 1))
+        chunks = list(rep.csv_chunks())
+        assert len(chunks) == 2
+        assert chunks[1] == "%d\r\n" % reports.CSV_CHUNK_ROWS
+
+    def test_csv_response_streamed(self):
+        rep = reports.BaseReport()
+        rep.to_table = lambda x: [[1], [2]]
+        resp = rep.render_to_response(reports.CSV)
+        assert resp.streaming
+        assert b"".join(resp.streaming_content) == b"1\r\n2\r\n"
+        assert resp['Content-Disposition'] == 'attachment; filename="qatrack-report.csv"'
+
+    def test_to_table_generator(self):
+        rep = reports.BaseReport()
+        rep.report_format = reports.CSV
+        table = rep.to_table(rep.get_context())
+        assert next(table)[0] == "Report Title:"
 
     def test_to_xslx(self):
         rep = reports.BaseReport()
@@ -840,8 +1024,8 @@ class TestBaseReport(TestCase):
 
         rep.to_table = to_table
         xls = rep.to_xlsx()
-        assert isinstance(xls, io.BytesIO)
         assert xls.tell() == 0
+        assert "xl/worksheets/sheet1.xml" in zipfile.ZipFile(xls).namelist()
 
 
 class TestReportInterface(BaseQATests):
@@ -1199,3 +1383,25 @@ class TestReportTasks(TestCase):
         assert Schedule.objects.count() == 0
         tasks.run_reports()
         assert Schedule.objects.count() == 0
+
+    def test_run_reports_advances_next_run(self):
+        """once a report is scheduled its next run should move to the next occurrence"""
+        now = timezone.localtime(timezone.now())
+        self.schedule.time = (now + timezone.timedelta(minutes=5)).strftime("%H:%M")
+        self.schedule.save()
+        next_run = self.schedule.next_run
+        tasks.run_reports()
+        self.schedule.refresh_from_db()
+        tomorrow = timezone.localtime(next_run).date() + timezone.timedelta(days=1)
+        assert timezone.localtime(self.schedule.next_run).date() == tomorrow
+        tasks.run_reports()
+        assert Schedule.objects.count() == 1
+
+    def test_run_reports_missed(self):
+        """reports whose run time was missed should not be sent late"""
+        now = timezone.now()
+        models.ReportSchedule.objects.filter(pk=self.schedule.pk).update(next_run=now - timezone.timedelta(hours=1))
+        tasks.run_reports()
+        assert Schedule.objects.count() == 0
+        self.schedule.refresh_from_db()
+        assert self.schedule.next_run > now
@@ -106,7 +106,7 @@ class TestFaultSummaryReport(TestCase):
         rep = faults.FaultSummaryReport(report_opts={'review_status': "reviewed"})
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_row = table.index([
             _("Fault ID"),
@@ -176,7 +176,7 @@ class TestFaultDetailsReport(TestCase):
         rep = faults.FaultDetailsReport(report_opts={'review_status': 'unreviewed'})
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_row = table.index([
             _("Fault ID"),
@@ -121,7 +121,7 @@ class TestTestListInstanceSummaryReport(TestCase):
         rep = qc.TestListInstanceSummaryReport()
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_row = table.index([
             'Site',
@@ -231,7 +231,7 @@ class TestTestListInstanceDetailsReport(TestCase):
         rep = qc.TestListInstanceDetailsReport(report_opts={'unit_test_collection': [utc.pk, utc2.pk]})
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         ntlis = table.count([
             _('Test'),
@@ -328,7 +328,7 @@ class TestTestInstanceDetailsReport(TestCase):
         )
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
         header_row = table.index([
             _("Work Completed"),
             _("Test"),
@@ -369,7 +369,7 @@ class TestTestInstanceDetailsReport(TestCase):
         )
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
         org_row = table.index(['Organization:', 'Group by Unit/Test/Date'])
 
         # should be two rows after blank row
@@ -436,7 +436,7 @@ class TestDueDateReport(TestCase):
         rep = qc.NextDueDatesReport()
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_count = table.count([
             _("Unit"), _("Name"),
@@ -490,7 +490,7 @@ class TestAssignedQCReport(TestCase):
         rep = qc.AssignedQCReport(report_opts={'active': True})
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_row = table.index([
             _("Site"),
@@ -543,4 +543,4 @@ class TestAssignedQCDetailsReport(TestCase):
         rep = qc.AssignedQCDetailsReport(report_opts={'active': True})
         rep.report_format = "csv"
         context = rep.get_context()
-        rep.to_table(context)
+        list(rep.to_table(context))
@@ -102,7 +102,7 @@ class TestServiceEventSummaryReport(TestCase):
         rep = sl.ServiceEventSummaryReport(report_opts={'include_description': True})
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_row = table.index([
             _("Service Event ID"),
@@ -172,7 +172,7 @@ class TestServiceEventDetailsReport(TestCase):
         rep = sl.ServiceEventDetailsReport(report_opts={'include_description': True})
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_row = table.index([
             _("Service Event ID"),
@@ -256,7 +256,7 @@ class TestServiceEventPersonnelSummaryReport(TestCase):
         rep = sl.ServiceEventPersonnelSummaryReport()
         rep.report_format = "xlsx"
         context = rep.get_context()
-        rep.to_table(context)
+        list(rep.to_table(context))
 
     def test_format(self):
         assert sl.ServiceEventPersonnelSummaryReport().format_user("foo", "bar", "baz") == "foo (baz, bar)"
@@ -307,7 +307,7 @@ class TestServiceTimesReport(TestCase):
         rep = sl.ServiceTimesReport()
         rep.report_format = "xlsx"
         context = rep.get_context()
-        rep.to_table(context)
+        list(rep.to_table(context))
 
 
 class TestDueDateReport(TestCase):
@@ -380,7 +380,7 @@ class TestDueDateReport(TestCase):
         rep = sl.NextScheduledServiceEventsDueDatesReport()
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_count = table.count([
             _("Unit"),
@@ -462,7 +462,7 @@ class TestAssignedTemplatesReport(TestCase):
         rep = sl.ScheduledTemplatesReport(report_opts={'active': True})
         rep.report_format = "csv"
         context = rep.get_context()
-        table = rep.to_table(context)
+        table = list(rep.to_table(context))
 
         header_row = table.index([
             _("Site"),
@@ -7,6 +7,9 @@ urlpatterns = [
     path('filter/', views.get_filter, name="reports-filter"),
     path('preview/', views.report_preview, name="reports-preview"),
     path('save/', views.save_report, name="reports-save"),
+    path('jobs/', views.start_report_job, name="reports-job-start"),
+    path('jobs/<int:job_id>/', views.report_job_status, name="reports-job-status"),
+    path('jobs/<int:job_id>/download/', views.report_job_download, name="reports-job-download"),
     path('load/', views.load_report, name="reports-load"),
     path('delete/', views.delete_report, name="reports-delete"),
     path('saved-reports/', views.saved_reports_datatable, name="reports-saved"),
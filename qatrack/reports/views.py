@@ -1,13 +1,21 @@
 from django.db.models import Q
-from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseForbidden,
+    JsonResponse,
+)
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.template.loader import get_template
 from django.utils.translation import gettext as _
 from django.views.decorators.http import require_POST
 
+from qatrack.qatrack_core.chrome import ChromeBusy
 from qatrack.qatrack_core.dates import format_as_date
 from qatrack.reports import (  # noqa: F401
     faults,
+    jobs,
     models,
     qc,
     reports,
@@ -23,8 +31,9 @@ from qatrack.reports.forms import (
 )
 
 
-def process_form_post(post_data, user, instance):
-    """Handle validing form and filter form for views"""
+def process_form_post(post_data, user, instance, background=False):
+    """Handle validing form and filter form for views. Reports being run in
+    the background skip the report's filter_form_valid size checks"""
 
     form = ReportForm(post_data, instance=instance)
     form.is_valid()
@@ -49,11 +58,28 @@ def process_form_post(post_data, user, instance):
         report = ReportClass(base_opts=base_opts, report_opts=post_data, notes=notes, user=user)
         filter_form = report.get_filter_form()
         if filter_form.is_valid() and notes_formset.is_valid():
-            all_valid = report.filter_form_valid(filter_form)
+            all_valid = background or report.filter_form_valid(filter_form)
 
     return all_valid, report, form, filter_form, notes_formset
 
 
+def new_report_data(post_data):
+    """Filter out any report note meta data so the notes formset can be
+    treated like a new report rather than a saved report"""
+
+    def dont_include(k):
+        return (
+            (k.startswith("reportnote_set-") and k.endswith("-report")) or
+            (k.startswith("reportnote_set-") and k.endswith("-id"))
+        )
+
+    data = post_data.copy()
+    for k in [k for k in post_data if dont_include(k)]:
+        del data[k]
+    data['reportnote_set-INITIAL_FORMS'] = '0'
+    return data
+
+
 def select_report(request):
     """Handle initial loading of page, as well as the downloading of the report
     in the requested format"""
@@ -66,25 +92,13 @@ def select_report(request):
         form = ReportForm()
         notes_formset = ReportNoteFormSet()
     else:
-
-        # need to filter out any report note meta data so the formset
-        # can be treated like a new report rather than a saved report
-        def dont_include(k):
-            return (
-                (k.startswith("reportnote_set-") and k.endswith("-report")) or
-                (k.startswith("reportnote_set-") and k.endswith("-id"))
-            )
-
-        delete = [k for k in request.POST if dont_include(k)]
-
-        data = request.POST.copy()
-        for k in delete:
-            del data[k]
-        data['reportnote_set-INITIAL_FORMS'] = '0'
-
+        data = new_report_data(request.POST)
         all_valid, report, form, filter_form, notes_formset = process_form_post(data, request.user, None)
         if all_valid:
-            return report.render_to_response(form.cleaned_data['report_format'])
+            try:
+                return report.render_to_response(form.cleaned_data['report_format'])
+            except ChromeBusy as e:
+                form.add_error(None, str(e))
 
     context = {
         "report_form": form,
@@ -138,6 +152,73 @@ def report_preview(request):
     return JsonResponse(resp)
 
 
+def serialize_job(job):
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'message': job.message,
+        'done': job.done,
+        'status_url': reverse("reports-job-status", kwargs={'job_id': job.pk}),
+        'download_url': (
+            reverse("reports-job-download", kwargs={'job_id': job.pk}) if job.status == job.COMPLETE else None
+        ),
+    }
+
+
+@require_POST
+def start_report_job(request):
+    """Validate the ReportForm & filter form and then start generating the
+    report in the background"""
+
+    if not request.user.has_perm("reports.can_run_reports"):
+        return HttpResponseForbidden()
+
+    resp = {
+        'errors': False,
+        'base_errors': {},
+        'report_errors': {},
+        'notes_formset_errors': [],
+        'job': None,
+    }
+
+    data = new_report_data(request.POST)
+    all_valid, report, form, filter_form, notes_formset = process_form_post(
+        data, request.user, None, background=True
+    )
+    if all_valid:
+        filters = serialize_form_data(filter_form.cleaned_data)
+        job = jobs.start_job(report, form.cleaned_data['report_format'], filters, request.user)
+        resp['job'] = serialize_job(job)
+        return JsonResponse(resp)
+
+    resp['errors'] = True
+    resp['base_errors'] = form.errors
+    resp['report_errors'] = filter_form.errors if filter_form else {}
+    resp['notes_formset_errors'] = notes_formset.errors
+
+    return JsonResponse(resp)
+
+
+def report_job_status(request, job_id):
+    """Return the status & progress of a background report"""
+
+    job = get_object_or_404(models.ReportJob, pk=job_id, created_by=request.user)
+    return JsonResponse(serialize_job(job))
+
+
+def report_job_download(request, job_id):
+    """Download a report generated in the background"""
+
+    job = get_object_or_404(models.ReportJob, pk=job_id, created_by=request.user, status=models.ReportJob.COMPLETE)
+    if not job.artifact:
+        raise Http404(_("Report file not found"))
+
+    content_type = reports.CONTENT_TYPES[job.report_format]
+    return FileResponse(job.artifact.open("rb"), as_attachment=True, filename=job.filename, content_type=content_type)
+
+
 @require_POST
 def save_report(request):
 
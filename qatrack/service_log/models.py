@@ -1,3 +1,4 @@
+from collections import defaultdict
 import json
 import re
 
@@ -435,6 +436,33 @@ class ServiceEvent(models.Model):
         return reverse("sl_details", kwargs={"pk": self.pk})
 
 
+def service_totals(service_events):
+    """Return a dict of the form {unit_id: {service_type_id: totals}} where
+    totals is a dict with the number of service events and the total service
+    & lost times for the input ServiceEvent queryset.  All totals are
+    calculated in a single grouped query."""
+
+    totals = defaultdict(dict)
+
+    grouped = service_events.order_by().values(
+        "unit_service_area__unit_id",
+        "service_type_id",
+    ).annotate(
+        n=models.Count("id"),
+        service_time=models.Sum("duration_service_time"),
+        lost_time=models.Sum("duration_lost_time"),
+    )
+
+    for row in grouped:
+        totals[row['unit_service_area__unit_id']][row['service_type_id']] = {
+            'n_service_events': row['n'],
+            'service_time': row['service_time'] or timezone.timedelta(),
+            'lost_time': row['lost_time'] or timezone.timedelta(),
+        }
+
+    return totals
+
+
 class ThirdPartyManager(models.Manager):
 
     def get_queryset(self):
@@ -962,6 +990,20 @@ class ServiceEventSchedule(SchedulingMixin, models.Model):
         except ServiceEvent.DoesNotExist:
             pass
 
+    @classmethod
+    def last_scheduling_dates(cls, pks):
+        """Return a dict mapping ServiceEventSchedule pk -> datetime_service of
+        its last active service event"""
+
+        return dict(
+            ServiceEvent.objects.filter(
+                service_event_schedule_id__in=pks,
+                include_for_scheduling=True,
+            ).exclude(
+                is_active=False,
+            ).values_list("service_event_schedule_id").annotate(last=models.Max("datetime_service")).order_by()
+        )
+
     def get_absolute_url(self):
         return "%s?se_schedule=%s" % (reverse("sl_new"), self.pk)
 
@@ -140,6 +140,43 @@ class TestServiceEventAndRelated(TransactionTestCase):
         self.assertTrue(str(self.se.id) in str(self.se))
 
 
+class TestServiceTotals(TestCase):
+
+    def setUp(self):
+        self.usa1 = sl_utils.create_unit_service_area()
+        self.usa2 = sl_utils.create_unit_service_area()
+        self.st1 = sl_utils.create_service_type()
+        self.st2 = sl_utils.create_service_type()
+        hour = timezone.timedelta(hours=1)
+        sl_utils.create_service_event(
+            unit_service_area=self.usa1, service_type=self.st1, problem_description="1",
+            service_time=hour, lost_time=2 * hour,
+        )
+        sl_utils.create_service_event(
+            unit_service_area=self.usa1, service_type=self.st1, problem_description="2",
+            service_time=3 * hour,
+        )
+        sl_utils.create_service_event(unit_service_area=self.usa2, service_type=self.st2, problem_description="3")
+
+    def test_totals(self):
+        totals = sl_models.service_totals(sl_models.ServiceEvent.objects.all())
+        hour = timezone.timedelta(hours=1)
+        assert totals[self.usa1.unit_id] == {
+            self.st1.pk: {'n_service_events': 2, 'service_time': 4 * hour, 'lost_time': 2 * hour},
+        }
+        assert totals[self.usa2.unit_id] == {
+            self.st2.pk: {
+                'n_service_events': 1,
+                'service_time': timezone.timedelta(),
+                'lost_time': timezone.timedelta(),
+            },
+        }
+
+    def test_filtered(self):
+        totals = sl_models.service_totals(sl_models.ServiceEvent.objects.filter(service_type=self.st2))
+        assert list(totals) == [self.usa2.unit_id]
+
+
 class TestDeletions(TransactionTestCase):
 
     def test_delete_grouplinkerinstance_variables(self):
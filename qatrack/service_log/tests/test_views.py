@@ -810,7 +810,10 @@ class TestServiceLogViews(TestCase):
     def test_se_searcher(self):
 
         q = models.ServiceEvent.objects.filter(unit_service_area=self.usa3).first().id
-        se_to_find = models.ServiceEvent.objects.filter(id__icontains=q, unit_service_area__unit=self.usa3.unit)
+        se_to_find = [
+            se for se in models.ServiceEvent.objects.filter(unit_service_area__unit=self.usa3.unit)
+            if str(se.id).startswith(str(q))
+        ]
 
         data = {'q': q, 'unit_id': self.usa3.unit.id}
         response = self.client.get(reverse('se_searcher'), data=data)
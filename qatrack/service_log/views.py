@@ -18,7 +18,7 @@ from django.contrib.sites.shortcuts import get_current_site
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
-from django.db.models import Q, Sum
+from django.db.models import Max, Q
 from django.forms.utils import timezone
 from django.http import (
     Http404,
@@ -72,12 +72,14 @@ from qatrack.qa.templatetags import qa_tags
 from qatrack.qa.views.base import generate_review_status_context
 from qatrack.qa.views.perform import ChooseUnit
 from qatrack.qa.views.review import UTCInstances
+from qatrack.qatrack_core.chrome import ChromeBusy
 from qatrack.qatrack_core.dates import (
     format_as_date,
     format_as_time,
     format_datetime,
     parse_date,
 )
+from qatrack.qatrack_core.search import id_prefix_filter
 from qatrack.qatrack_core.serializers import QATrackJSONEncoder
 from qatrack.reports.service_log import ServiceEventDetailsReport
 from qatrack.service_log import forms
@@ -126,8 +128,9 @@ def se_searcher(request):
         return JsonResponse({'error': True}, status=404)
 
     omit_id = request.GET.get('self_id', 'false')
+    max_id = sl_models.ServiceEvent.objects.aggregate(max_id=Max('id'))['max_id'] or 0
     service_events = sl_models.ServiceEvent.objects \
-        .filter(id__icontains=se_search, unit_service_area__unit=unit_id)
+        .filter(id_prefix_filter(se_search, max_id, 'id'), unit_service_area__unit=unit_id)
 
     if omit_id != 'false':
         service_events = service_events.exclude(id=omit_id)
@@ -1479,13 +1482,9 @@ def handle_unit_down_time(request):
     units = request.GET.getlist('unit', False)
     if units:
         se_qs = se_qs.filter(unit_service_area__unit__name__in=units)
-        units = u_models.Unit.objects.filter(name__in=units).prefetch_related(
-            'unitavailabletime_set', 'unitavailabletimeedit_set'
-        ).select_related('type')
+        units = u_models.Unit.objects.filter(name__in=units).select_related('type')
     else:
-        units = u_models.Unit.objects.all().prefetch_related(
-            'unitavailabletime_set', 'unitavailabletimeedit_set'
-        ).select_related('type')
+        units = u_models.Unit.objects.select_related('type')
 
     units = units.filter(id__in=se_qs.values_list('unit_service_area__unit', flat=True).distinct())
 
@@ -1538,10 +1537,14 @@ def handle_unit_down_time(request):
     if problem_description:
         rows[2] = ['Service Events with Problem Description containing: ', '', '', '', '', '', problem_description]
 
+    units = list(units)
+    unit_potential = u_models.potential_times(units, date_from, date_to)
+    unit_totals = sl_models.service_totals(se_qs)
+    no_events = {'n_service_events': 0, 'service_time': timezone.timedelta(), 'lost_time': timezone.timedelta()}
+
     for u in units:
 
-        service_events_unit_qs = se_qs.filter(unit_service_area__unit=u)
-        potential_time = u.get_potential_time(date_from, date_to)
+        potential_time = unit_potential[u.pk]
         unit_vals = [
             u.name,
             u.type.name,
@@ -1549,14 +1552,15 @@ def handle_unit_down_time(request):
         ]
         totals['potential'] += potential_time
 
-        for t in all_service_types:
-            seu_type_q = service_events_unit_qs.filter(service_type=t)
-            repairs = len(seu_type_q)
-            service = seu_type_q.aggregate(Sum('duration_service_time'))['duration_service_time__sum']
-            lost = seu_type_q.aggregate(Sum('duration_lost_time'))['duration_lost_time__sum']
+        total_service_time = 0
+        total_lost_time = 0
+        total_num = 0
 
-            service = service.total_seconds() / 3600 if service else 0
-            lost = lost.total_seconds() / 3600 if lost else 0
+        for t in all_service_types:
+            type_totals = unit_totals[u.pk].get(t.pk, no_events)
+            repairs = type_totals['n_service_events']
+            service = type_totals['service_time'].total_seconds() / 3600
+            lost = type_totals['lost_time'].total_seconds() / 3600
 
             unit_vals.append(repairs)
             unit_vals.append('{:.2f}'.format(service))
@@ -1566,13 +1570,9 @@ def handle_unit_down_time(request):
             totals[t.name + '-service'] += service
             totals[t.name + '-lost'] += lost
 
-        total_lost_time = service_events_unit_qs.aggregate(Sum('duration_lost_time'))['duration_lost_time__sum']
-        total_lost_time = total_lost_time.total_seconds() / 3600 if total_lost_time else 0
-
-        total_service_time = service_events_unit_qs.aggregate(Sum('duration_service_time'))['duration_service_time__sum']
-        total_service_time = total_service_time.total_seconds() / 3600 if total_service_time else 0
-
-        total_num = len(service_events_unit_qs)
+            total_service_time += service
+            total_lost_time += lost
+            total_num += repairs
 
         unit_vals += ['{:.2f}'.format(total_service_time), '{:.2f}'.format(total_lost_time), total_num]
 
@@ -2007,4 +2007,8 @@ def service_log_report(request, pk):
     }
     report = ServiceEventDetailsReport(base_opts=base_opts, report_opts=report_opts, user=request.user)
 
-    return report.render_to_response(base_opts['report_format'])
+    try:
+        return report.render_to_response(base_opts['report_format'])
+    except ChromeBusy as e:
+        messages.error(request, str(e))
+        return HttpResponseRedirect(se.get_absolute_url())
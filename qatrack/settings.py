@@ -306,13 +306,12 @@ AUTH_PASSWORD_VALIDATORS = [
 # -----------------------------------------------------------------------------
 # Cache settings
 
-CACHE_UNREVIEWED_COUNT = 'unreviewed-count'
-CACHE_UNREVIEWED_COUNT_USER = 'unreviewed-count-user'
+CACHE_UNREVIEWED_COUNT_ = 'unreviewed-count-{}'
+CACHE_UNREVIEWED_COUNT_USER_ = 'unreviewed-count-user-{}-{}'
 CACHE_QA_FREQUENCIES = 'qa-frequencies'
 CACHE_RTS_QA_COUNT = 'unreviewed-rts-qa'
 CACHE_RTS_INCOMPLETE_QA_COUNT = 'incomplete-rts-qa'
-CACHE_IN_PROGRESS_COUNT_USER = 'in-progress-count-users'
-CACHE_UNREVIEWED_COUNT_USER_DICT = 'unreviewed-count-users'
+CACHE_IN_PROGRESS_COUNT_USER_ = 'in-progress-count-user-{}-{}'
 CACHE_DEFAULT_SE_STATUS = 'default-se-status'
 CACHE_SE_NEEDING_REVIEW_COUNT = 'se_needing_review_count'
 CACHE_SL_NOTIFICATION_TOTAL = 'sl-notification-total'
@@ -320,9 +319,24 @@ CACHE_SERVICE_STATUS_COLOURS = 'service-status-colours'
 CACHE_ACTIVE_UTCS_FOR_UNIT_ = 'active_utcs_for_unit_{}'
 CACHE_AUTOREVIEW_RULESETS = "autoreviewrulesets"
 CACHE_UNREVIEWED_FAULT_COUNT = "unreviewed-fault-count"
+CACHE_TEST_LIST_DEPENDENCIES_ = "test_list_dependencies_{}_{}"
+CACHE_CONTROL_CHART_ = "control_chart_{}"
+CACHE_QC_OVERVIEW_VERSION = "qc-overview-version"
+CACHE_QC_OVERVIEW_ = "qc-overview-{}-{}-{}-{}"
+CACHE_NOTIFICATION_RATE_ = "notification-rate-{}-{}-{}-{}"
+CACHE_REPORT_DATA_VERSION = "report-data-version"
+CACHE_UNIT_AVAILABLE_TIME_ = "unit-available-time-{}"
+CACHE_AUTOCOMPLETE_VERSION_ = "autocomplete-version-{}"
 
 MAX_CACHE_TIMEOUT = None
 
+# Unreviewed & in progress counts are updated incrementally as test lists are
+# performed & reviewed and recalculated from scratch every
+# COUNT_CACHE_RECONCILE_INTERVAL seconds.  Incremental updates require a cache
+# backend with atomic increments (memcached, Redis or local memory). With the
+# default database cache counts are recalculated after every change instead.
+COUNT_CACHE_RECONCILE_INTERVAL = 15 * 60
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
@@ -362,6 +376,15 @@ EMAIL_HOST_PASSWORD = 'your_password_here'
 EMAIL_USE_TLS = True
 EMAIL_PORT = 587
 
+# Send notification emails from a django-q worker rather than in the web
+# request that triggered them.  Set to False to send emails immediately.
+NOTIFICATIONS_ASYNC = True
+
+# Maximum number of emails a single notice may send per
+# NOTIFICATION_RATE_LIMIT_PERIOD seconds (None for no limit)
+NOTIFICATION_RATE_LIMIT = None
+NOTIFICATION_RATE_LIMIT_PERIOD = 60 * 60
+
 
 # -----------------------------------------------------------------------------
 # Account settings
@@ -685,6 +708,33 @@ COMPOSITE_MAX_LINE_LENGTH = 88
 AUTOSAVE_DAYS_TO_KEEP = 30
 
 MAX_TESTS_PER_TESTLIST = 250
+
+# Number of worker processes used for running composite & upload calculations
+# outside of the web server process. Set to 0 to run calculations in process.
+CALCULATION_POOL_SIZE = 0
+CALCULATION_POOL_TIMEOUT = 30  # max seconds a single calculation may run for
+CALCULATION_POOL_MEMORY_LIMIT = None  # max MB of memory per worker process (None for no limit)
+
+# Number of seconds rendered control chart images are cached for. Cached
+# images are invalidated automatically when the charted data changes.
+CONTROL_CHART_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Number of seconds the QC program overview data is cached for. The cached
+# data is invalidated automatically when any assignment's due date or last
+# instance changes.
+QC_OVERVIEW_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Generate reports requested with "Run in Background" on the django-q cluster.
+# Set to False to generate them in the web request instead.
+REPORT_JOBS_ASYNC = True
+
+# Max number of seconds a background report may take to generate
+REPORT_JOB_TIMEOUT = 30 * 60
+
+# Number of seconds a generated report file is reused for (and kept) when the
+# same report is requested again and its data has not changed.
+REPORT_JOB_CACHE_TIMEOUT = 24 * 60 * 60
+
 # SQL Explorer Settings
 
 USE_SQL_REPORTS = False
@@ -734,6 +784,12 @@ for path in chrome_paths:
     if os.path.exists(path):
         CHROME_PATH = path
 
+# Number of persistent headless Chrome instances (per process) used for
+# generating PDF reports. Set to 0 to launch a new Chrome process for every PDF.
+CHROME_POOL_SIZE = 0
+CHROME_POOL_QUEUE_SIZE = 10  # max PDFs waiting for a free Chrome instance
+CHROME_PDF_TIMEOUT = 60  # max seconds to wait for a free Chrome instance & render a PDF
+
 
 # ------------------------------------------------------------------------------
 # local_settings contains anything that should be overridden
@@ -1,6 +1,8 @@
 from django.contrib.auth.hashers import BasePasswordHasher
 
 NOTIFICATIONS_ON = False
+NOTIFICATIONS_ASYNC = False
+REPORT_JOBS_ASYNC = False
 DEFAULT_NUMBER_FORMAT = None
 DEBUG = False
 SELENIUM_VIRTUAL_DISPLAY = True
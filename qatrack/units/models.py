@@ -1,12 +1,16 @@
-import calendar
 from collections import defaultdict
+import datetime
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.db.models.aggregates import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.timezone import timedelta
 from django.utils.translation import gettext as _
 from django.utils.translation import gettext_lazy as _l
+import numpy as np
 
 from qatrack.qatrack_core.dates import format_as_date as fmt_date
 
@@ -205,14 +209,36 @@ class Modality(models.Model):
         return self.name
 
 
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def weekday_counts(start_date, end_date):
+    """Return a list of the number of Mondays, Tuesdays, ... Sundays between
+    start_date and end_date (inclusive) without iterating over every day"""
+
+    n_days = (end_date - start_date).days + 1
+    if n_days <= 0:
+        return [0] * 7
+
+    full_weeks, extra_days = divmod(n_days, 7)
+    counts = [full_weeks] * 7
+    first = start_date.weekday()
+    for i in range(extra_days):
+        counts[(first + i) % 7] += 1
+    return counts
+
+
 def weekday_count(start_date, end_date, uate_list):
-    week = {}
-    for i in range((end_date - start_date).days + 1):
-        day = start_date + timedelta(days=i)
-        if str(day) not in uate_list:
-            day_name = calendar.day_name[day.weekday()].lower()
-            week[day_name] = week[day_name] + 1 if day_name in week else 1
-    return week
+    """Return a dict of weekday name -> number of those weekdays between
+    start_date and end_date (inclusive) excluding dates in uate_list"""
+
+    counts = weekday_counts(start_date, end_date)
+    for day in uate_list:
+        day = datetime.datetime.strptime(str(day), "%Y-%m-%d").date()
+        if start_date <= day <= end_date:
+            counts[day.weekday()] -= 1
+
+    return {day: count for day, count in zip(WEEKDAYS, counts) if count > 0}
 
 
 class Unit(models.Model):
@@ -256,50 +282,8 @@ class Unit(models.Model):
         return "%s :: %s" % (_("Other") if not self.site else self.site.name, self.name)
 
     def get_potential_time(self, date_from, date_to):
-
-        if date_from is None:
-            date_from = self.date_acceptance
-
-        elif date_from < self.date_acceptance:
-            if date_to < self.date_acceptance:
-                return 0
-            date_from = self.date_acceptance
-
-        self_uat_set = self.unitavailabletime_set.filter(
-            date_changed__range=[date_from, date_to]
-        ).order_by('date_changed')
-        self_uate_set = self.unitavailabletimeedit_set.filter(
-            date__range=[date_from, date_to]
-        ).order_by('date')
-
-        # add latest uat where available
-        latest_uat = self.unitavailabletime_set.filter(date_changed__lte=date_from).order_by("-date_changed")[:1]
-        self_uat_set = self_uat_set | latest_uat
-
-        potential_time = 0
-
-        uate_list = {str(uate.date): uate.hours for uate in self_uate_set}
-
-        val_list = self_uat_set.values(
-            'date_changed', 'hours_sunday', 'hours_monday', 'hours_tuesday',
-            'hours_wednesday', 'hours_thursday', 'hours_friday',
-            'hours_saturday',
-        )
-
-        val_list_len = len(val_list)
-        for i in range(val_list_len):
-            next_date = val_list[i + 1]['date_changed'] - timedelta(days=1) if i < val_list_len - 1 else date_to
-            this_date = date_from if val_list[i]['date_changed'] < date_from else val_list[i]['date_changed']
-
-            days_nums = weekday_count(this_date, next_date, uate_list)
-
-            for day in days_nums:
-                potential_time += days_nums[day] * val_list[i]['hours_' + day].total_seconds()
-
-        for uate in uate_list:
-            potential_time += uate_list[uate].total_seconds()
-
-        return potential_time / 3600
+        """Return the number of available hours between date_from and date_to (inclusive)"""
+        return potential_times([self], date_from, date_to)[self.pk]
 
     def save(self, *args, **kwargs):
         if self.number in ("", None):
@@ -410,3 +394,124 @@ def get_unit_info(unit_ids=None, active_only=True, serviceable_only=False):
             unit_info[unit]['modalities'].add(modality)
 
     return unit_info
+
+
+class AvailableTimeCalendar:
+    """Daily available time for a unit from its acceptance date until its
+    last schedule change or edit, stored as cumulative seconds so that the
+    available time over any range is found with a couple of lookups. Days
+    after the calendar ends repeat the final weekly schedule."""
+
+    def __init__(self, start, uats, edits):
+        """uats is a date_changed ordered list of (date_changed, weekly
+        seconds) tuples where weekly seconds are Monday first and edits is a
+        dict of date -> seconds"""
+
+        self.start = start
+        self.end = max([start] + [date for date, __ in uats] + list(edits))
+
+        days = np.arange((self.end - start).days + 1)
+        weekdays = (start.weekday() + days) % 7
+
+        if uats:
+            changes = np.array([(date - start).days for date, __ in uats])
+            weekly = np.array([seconds for __, seconds in uats], dtype=float)
+            # index of the schedule in effect on each day (-1 if none yet)
+            in_effect = np.searchsorted(changes, days, side="right") - 1
+            daily = np.where(in_effect >= 0, weekly[np.maximum(in_effect, 0), weekdays], 0.)
+            self.weekly = weekly[-1]
+        else:
+            daily = np.zeros(len(days))
+            self.weekly = np.zeros(7)
+
+        for date, seconds in edits.items():
+            if date >= start:
+                daily[(date - start).days] = seconds
+
+        self.cumulative = np.concatenate(([0.], np.cumsum(daily)))
+
+    def hours(self, date_from, date_to):
+        """Return the available hours between date_from and date_to (inclusive)"""
+
+        if date_from is None or date_from < self.start:
+            date_from = self.start
+
+        if date_to < date_from:
+            return 0
+
+        seconds = 0
+        if date_from <= self.end:
+            first = (date_from - self.start).days
+            last = (min(date_to, self.end) - self.start).days
+            seconds += self.cumulative[last + 1] - self.cumulative[first]
+
+        if date_to > self.end:
+            counts = weekday_counts(max(date_from, self.end + timedelta(days=1)), date_to)
+            seconds += np.dot(counts, self.weekly)
+
+        return float(seconds) / 3600
+
+
+def available_time_calendars(units):
+    """Return a dict of unit pk -> AvailableTimeCalendar for all units.
+    Calendars are cached until the units available times are changed."""
+
+    units = list(units)
+    keys = {settings.CACHE_UNIT_AVAILABLE_TIME_.format(u.pk): u for u in units}
+
+    calendars = {}
+    for key, cal in cache.get_many(list(keys)).items():
+        unit = keys[key]
+        if cal.start == unit.date_acceptance:
+            calendars[unit.pk] = cal
+
+    missing = {u.pk: u for u in units if u.pk not in calendars}
+    if not missing:
+        return calendars
+
+    uats = defaultdict(list)
+    uat_qs = UnitAvailableTime.objects.filter(
+        unit_id__in=list(missing),
+    ).order_by(
+        "unit_id",
+        "date_changed",
+    ).values_list(
+        "unit_id", "date_changed", *["hours_%s" % day for day in WEEKDAYS]
+    )
+    for unit_id, date_changed, *hours in uat_qs:
+        uats[unit_id].append((date_changed, [h.total_seconds() for h in hours]))
+
+    edits = defaultdict(dict)
+    uate_qs = UnitAvailableTimeEdit.objects.filter(unit_id__in=list(missing)).values_list("unit_id", "date", "hours")
+    for unit_id, date, hours in uate_qs:
+        edits[unit_id][date] = hours.total_seconds()
+
+    to_cache = {}
+    for unit_id, unit in missing.items():
+        calendars[unit_id] = AvailableTimeCalendar(unit.date_acceptance, uats[unit_id], edits[unit_id])
+        to_cache[settings.CACHE_UNIT_AVAILABLE_TIME_.format(unit_id)] = calendars[unit_id]
+
+    cache.set_many(to_cache, settings.MAX_CACHE_TIMEOUT)
+
+    return calendars
+
+
+def potential_times(units, date_from, date_to):
+    """Return a dict of unit pk -> available hours between date_from and
+    date_to (inclusive) for all units. date_from may be None to include
+    all time since the units were accepted."""
+
+    calendars = available_time_calendars(units)
+    return {pk: cal.hours(date_from, date_to) for pk, cal in calendars.items()}
+
+
+@receiver(post_save, sender=Unit, dispatch_uid="qatrack.units.models.unit_available_time_changed_save")
+@receiver(post_delete, sender=Unit, dispatch_uid="qatrack.units.models.unit_available_time_changed_delete")
+@receiver(post_save, sender=UnitAvailableTime, dispatch_uid="qatrack.units.models.uat_changed_save")
+@receiver(post_delete, sender=UnitAvailableTime, dispatch_uid="qatrack.units.models.uat_changed_delete")
+@receiver(post_save, sender=UnitAvailableTimeEdit, dispatch_uid="qatrack.units.models.uate_changed_save")
+@receiver(post_delete, sender=UnitAvailableTimeEdit, dispatch_uid="qatrack.units.models.uate_changed_delete")
+def available_time_changed(sender, instance, **kwargs):
+    """Invalidate the cached calendar for the unit whose available time changed"""
+    unit_id = instance.pk if sender is Unit else instance.unit_id
+    cache.delete(settings.CACHE_UNIT_AVAILABLE_TIME_.format(unit_id))
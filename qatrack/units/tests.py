@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -84,6 +86,121 @@ class TestWeekDayCount:
         }
 
 
+class TestWeekDayCounts:
+
+    def test_one_week(self):
+        start = timezone.datetime(2019, 12, 9).date()
+        end = timezone.datetime(2019, 12, 15).date()
+        assert models.weekday_counts(start, end) == [1] * 7
+
+    def test_partial_weeks(self):
+        # Friday Dec 13 2019 to Tuesday Dec 24 2019
+        start = timezone.datetime(2019, 12, 13).date()
+        end = timezone.datetime(2019, 12, 24).date()
+        assert models.weekday_counts(start, end) == [2, 2, 1, 1, 2, 2, 2]
+
+    def test_matches_weekday_count(self):
+        start = timezone.datetime(2019, 1, 3).date()
+        end = timezone.datetime(2020, 3, 17).date()
+        week = models.weekday_count(start, end, {})
+        assert models.weekday_counts(start, end) == [week[day] for day in models.WEEKDAYS]
+
+    def test_end_before_start(self):
+        start = timezone.datetime(2019, 12, 9).date()
+        assert models.weekday_counts(start, start - timezone.timedelta(days=1)) == [0] * 7
+
+
+class TestAvailableTimeCalendar:
+
+    def setup_method(self):
+        date = timezone.datetime
+        weekly = [3600 * (i + 1) for i in range(7)]  # 1 hr Monday ... 7 hrs Sunday
+        weekdays = [8 * 3600] * 5 + [0, 0]
+        uats = [(date(2019, 1, 1).date(), weekly), (date(2019, 1, 14).date(), weekdays)]
+        edits = {date(2019, 1, 8).date(): 0, date(2019, 1, 20).date(): 4 * 3600}
+        # accepted Tuesday Jan 1 2019
+        self.cal = models.AvailableTimeCalendar(date(2019, 1, 1).date(), uats, edits)
+
+    def hours(self, date_from, date_to):
+        date_from = date_from and timezone.datetime(*date_from).date()
+        return self.cal.hours(date_from, timezone.datetime(*date_to).date())
+
+    def test_since_acceptance(self):
+        assert self.hours(None, (2019, 1, 6)) == 2 + 3 + 4 + 5 + 6 + 7
+
+    def test_edit(self):
+        assert self.hours((2019, 1, 7), (2019, 1, 13)) == 28 - 2
+
+    def test_schedule_change(self):
+        assert self.hours((2019, 1, 14), (2019, 1, 20)) == 40 + 4
+
+    def test_after_calendar_end(self):
+        assert self.hours((2019, 1, 21), (2019, 3, 3)) == 6 * 40
+
+    def test_spans_calendar_end(self):
+        assert self.hours((2019, 1, 19), (2019, 1, 22)) == 4 + 16
+
+    def test_before_acceptance(self):
+        assert self.hours((2018, 1, 1), (2018, 12, 31)) == 0
+
+    def test_empty_range(self):
+        assert self.hours((2019, 1, 10), (2019, 1, 9)) == 0
+
+
+class TestPotentialTimes(TestCase):
+
+    def setUp(self):
+        self.u1 = utils.create_unit()
+        self.u2 = utils.create_unit()
+        models.Unit.objects.update(date_acceptance=timezone.datetime(2019, 1, 7).date())
+        self.u1.refresh_from_db()
+        self.u2.refresh_from_db()
+
+        hours = {'hours_%s' % day: timezone.timedelta(hours=8) for day in models.WEEKDAYS}
+        for unit in [self.u1, self.u2]:
+            models.UnitAvailableTime.objects.create(unit=unit, date_changed=unit.date_acceptance, **hours)
+
+        self.date_from = timezone.datetime(2019, 1, 7).date()
+        self.date_to = timezone.datetime(2019, 1, 13).date()
+
+    def test_potential_times(self):
+        times = models.potential_times(models.Unit.objects.all(), self.date_from, self.date_to)
+        assert times == {self.u1.pk: 56, self.u2.pk: 56}
+
+    def test_get_potential_time(self):
+        assert self.u1.get_potential_time(self.date_from, self.date_to) == 56
+
+    def test_cached(self):
+        models.potential_times([self.u1, self.u2], self.date_from, self.date_to)
+        with mock.patch.object(models.UnitAvailableTime.objects, "filter") as uats, \
+                mock.patch.object(models.UnitAvailableTimeEdit.objects, "filter") as edits:
+            times = models.potential_times([self.u1, self.u2], self.date_from, self.date_to)
+        assert not uats.called
+        assert not edits.called
+        assert times == {self.u1.pk: 56, self.u2.pk: 56}
+
+    def test_edit_invalidates(self):
+        models.potential_times([self.u1, self.u2], self.date_from, self.date_to)
+        models.UnitAvailableTimeEdit.objects.create(unit=self.u1, date=self.date_from, hours=timezone.timedelta())
+        times = models.potential_times([self.u1, self.u2], self.date_from, self.date_to)
+        assert times == {self.u1.pk: 48, self.u2.pk: 56}
+
+    def test_schedule_change_invalidates(self):
+        models.potential_times([self.u1], self.date_from, self.date_to)
+        uat = models.UnitAvailableTime.objects.get(unit=self.u1)
+        uat.hours_monday = timezone.timedelta()
+        uat.save()
+        assert self.u1.get_potential_time(self.date_from, self.date_to) == 48
+        uat.delete()
+        assert self.u1.get_potential_time(self.date_from, self.date_to) == 0
+
+    def test_acceptance_change_invalidates(self):
+        models.potential_times([self.u1], self.date_from, self.date_to)
+        self.u1.date_acceptance = timezone.datetime(2019, 1, 12).date()
+        self.u1.save()
+        assert self.u1.get_potential_time(self.date_from, self.date_to) == 16
+
+
 class TestUnitAvailableTime(TestCase):
 
     def setUp(self):
@@ -23,6 +23,10 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "qatrack.settings")
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
 
+# start calculation worker processes (if enabled) before the first request
+from qatrack.qa import calculation_pool  # noqa: E402
+calculation_pool.start()
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)